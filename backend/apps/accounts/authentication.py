@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from apps.core.cache import LocalCache
+from .tokens import ROLE_CLAIM, is_revoked
+
+_users = LocalCache(settings.AUTH_LOCAL_CACHE_MAX_ENTRIES)
+
+
+def cached_user(user_id):
+    user = _users.get(user_id)
+    if user is not None:
+        return user
+    user = get_user_model().objects.filter(pk=user_id, is_active=True).first()
+    if user is None:
+        raise AuthenticationFailed("User not found", code="user_not_found")
+    _users.set(user_id, user, settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+def forget_user(user_id) -> None:
+    _users.delete(user_id)
+
+
+# Request user built from token claims; anything beyond id and role falls through to the cached full user.
+class ClaimsUser:
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.id = self.pk = token[api_settings.USER_ID_CLAIM]
+        self.role = token[ROLE_CLAIM]
+
+    @cached_property
+    def user(self):
+        return cached_user(self.id)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __eq__(self, other) -> bool:
+        return getattr(other, "pk", None) == self.pk
+
+    def __hash__(self) -> int:
+        return hash(self.pk)
+
+    def __str__(self) -> str:
+        return str(self.user)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    # Role and id are trusted for the token lifetime; role, activation and password changes revoke tokens.
+    def get_user(self, validated_token):
+        if is_revoked(validated_token):
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+        if ROLE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
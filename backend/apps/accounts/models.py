@@ -48,3 +48,9 @@ class CustomerProfile(models.Model):
 
     def __str__(self) -> str:
         return f"{self.user.full_name}"
+
+
+class TokenRevocation(models.Model):
+    # Tokens of the user issued before revoked_at are rejected; see apps.accounts.tokens.
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="token_revocation")
+    revoked_at = models.DateTimeField()
@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from .authentication import forget_user
+from .tokens import revoke_tokens
+
+User = get_user_model()
+
+CLAIM_FIELDS = ("role", "is_active", "password")
+
+
+@receiver(pre_save, sender=User)
+def on_user_saved(sender, instance, update_fields=None, **kwargs):
+    forget_user(instance.pk)
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(CLAIM_FIELDS)):
+        return
+    previous = User.objects.filter(pk=instance.pk).values(*CLAIM_FIELDS).first()
+    if previous and any(previous[field] != getattr(instance, field) for field in CLAIM_FIELDS):
+        transaction.on_commit(lambda: revoke_tokens(instance.pk))
@@ -0,0 +1,59 @@
+import time
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.core.cache import LocalCache
+from .models import TokenRevocation
+
+ROLE_CLAIM = "role"
+# The login time with sub-second precision. iat is whole seconds, so a token issued just after a revocation in the
+# same second would otherwise compare as older than it. Access tokens copy it from their refresh token.
+ISSUED_AT_CLAIM = "issued_at"
+
+
+# Revocation times per user id (0.0 for none), read from TokenRevocation at most once per AUTH_REVOCATION_CACHE_TTL.
+_revocations = LocalCache(settings.AUTH_LOCAL_CACHE_MAX_ENTRIES)
+
+
+def revoke_tokens(user_id) -> None:
+    # Every token issued before now is rejected. The row lives in the database, so no cache eviction can undo it.
+    revoked_at = timezone.now()
+    TokenRevocation.objects.bulk_create(
+        [TokenRevocation(user_id=user_id, revoked_at=revoked_at)],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["revoked_at"],
+    )
+    _revocations.set(user_id, revoked_at.timestamp(), settings.AUTH_REVOCATION_CACHE_TTL)
+
+
+def revoked_at(user_id) -> float:
+    value = _revocations.get(user_id)
+    if value is None:
+        revocation = TokenRevocation.objects.filter(user_id=user_id).values_list("revoked_at", flat=True).first()
+        value = revocation.timestamp() if revocation else 0.0
+        _revocations.set(user_id, value, settings.AUTH_REVOCATION_CACHE_TTL)
+    return value
+
+
+def is_revoked(token) -> bool:
+    return token.get(ISSUED_AT_CLAIM, token.get("iat", 0)) < revoked_at(token[api_settings.USER_ID_CLAIM])
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[ROLE_CLAIM] = user.role
+        token[ISSUED_AT_CLAIM] = time.time()
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        if is_revoked(RefreshToken(attrs["refresh"])):
+            raise InvalidToken("Token has been revoked")
+        return super().validate(attrs)
@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import RegisterView, LoginView, RefreshView, MeView
+from .views import RegisterView, LoginView, RefreshView, MeView, LogoutView
 
 urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
     path("login/", LoginView.as_view(), name="login"),
     path("refresh/", RefreshView.as_view(), name="refresh"),
     path("me/", MeView.as_view(), name="me"),
+    path("logout/", LogoutView.as_view(), name="logout"),
 ]
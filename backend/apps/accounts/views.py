@@ -1,7 +1,9 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .serializers import RegisterSerializer, UserSerializer
+from .tokens import revoke_tokens
 
 
 class RegisterView(generics.CreateAPIView):
@@ -22,3 +24,9 @@ class LoginView(TokenObtainPairView):
 
 class RefreshView(TokenRefreshView):
     permission_classes = [permissions.AllowAny]
+
+
+class LogoutView(APIView):
+    def post(self, request):
+        revoke_tokens(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,60 @@
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .db import primary_reads, read_from_replica, replica_allowed
+
+
+def json_response(data, status: int = 200) -> JsonResponse:
+    return JsonResponse(data, status=status, safe=False, encoder=DjangoJSONEncoder)
+
+
+# DRF 3.15 views are synchronous, so read-only endpoints that can await the ORM are plain Django async views
+# that reuse DRF's authentication and permission classes. Like ReplicaReadMixin, `replica_reads` opts a view into
+# reading from a replica, unless the user is pinned to the primary or a cache namespace it fills was just bumped.
+class AsyncAPIView(View):
+    http_method_names = ["get", "head", "options"]
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+    replica_reads = False
+    replica_cache_namespaces: tuple[str, ...] = ()
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        method = request.method.lower()
+        if method not in self.http_method_names or method == "options":
+            return await super().dispatch(request._request, *args, **kwargs)
+        with primary_reads():
+            try:
+                # Authentication may read the cache or load a legacy token's user, both blocking calls.
+                await sync_to_async(self.check_permissions)(request)
+                # Set here rather than on the thread: the async ORM copies this context into its query threads.
+                if self.replica_reads and await sync_to_async(replica_allowed)(request, self.replica_cache_namespaces):
+                    read_from_replica()
+                return await getattr(self, method)(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return self.handle_exception(request, exc)
+
+    def check_permissions(self, request) -> None:
+        for permission in (permission_class() for permission_class in self.permission_classes):
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    def handle_exception(self, request, exc: exceptions.APIException) -> JsonResponse:
+        authenticate_header = None
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticate_header = (
+                request.authenticators[0].authenticate_header(request) if request.authenticators else None
+            )
+            if authenticate_header is None:
+                exc.status_code = 403
+        detail = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        response = json_response(detail, status=exc.status_code)
+        if authenticate_header:
+            response["WWW-Authenticate"] = authenticate_header
+        return response
@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from apps.core.services.synthetic import SyntheticConfig, generate_synthetic_data
+from apps.fleet.models import Car
+
+User = get_user_model()
+
+# Fixed so the same seed produces the same dataset regardless of when the suite runs.
+DATASET_END_DATE = date(2025, 1, 1)
+
+
+@dataclass
+class Dataset:
+    staff: User
+    customers: list[User]
+    cars: list[Car]
+    start: date
+    end: date
+
+    def __post_init__(self):
+        self.booked_until = self.end
+
+    def next_booking(self, days: int) -> tuple[date, date]:
+        # Scenario bookings are laid out one after another past the historical data, so they never overlap.
+        issue_date = self.booked_until + timedelta(days=1)
+        self.booked_until = issue_date + timedelta(days=days)
+        return issue_date, self.booked_until
+
+
+def build_dataset(rentals: int, seed: int = 42) -> Dataset:
+    summary = generate_synthetic_data(
+        SyntheticConfig(
+            cars=max(rentals // 10, 1),
+            customers=max(rentals // 20, 1),
+            rentals=rentals,
+            years=1,
+            seed=seed,
+            end_date=DATASET_END_DATE,
+        )
+    )
+    staff = User.objects.create(email=f"bench-staff-{seed}@example.com", full_name="Bench Staff", role="STAFF")
+    return Dataset(
+        staff=staff,
+        customers=list(User.objects.filter(id__in=summary.customer_ids).order_by("id")),
+        cars=list(Car.objects.filter(id__in=summary.car_ids).order_by("id")),
+        start=summary.date_from,
+        end=summary.date_to,
+    )
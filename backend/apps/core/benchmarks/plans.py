@@ -0,0 +1,167 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from typing import Callable
+from django.db import connection
+from apps.core.repositories.cars import CarRepository
+from apps.core.repositories.rentals import RentalRepository
+from apps.core.repositories.reports import ReportRepository
+from apps.fleet.models import Car, CarStatus
+from .dataset import Dataset
+
+EXPLAINED_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+@dataclass(frozen=True)
+class PlanCheck:
+    # `run` evaluates one repository call; tables in `full_scans` are read whole by design (e.g. every car).
+    name: str
+    run: Callable[[Dataset], object]
+    full_scans: frozenset[str] = field(default_factory=frozenset)
+
+
+@dataclass
+class PlanRegression:
+    check: str
+    table: str
+    sql: str
+
+
+def _middle(dataset: Dataset):
+    return dataset.start + (dataset.end - dataset.start) / 2
+
+
+CARS = frozenset({Car._meta.db_table})
+
+PLAN_CHECKS = [
+    PlanCheck(
+        "CarRepository.with_current_rental",
+        lambda dataset: list(CarRepository.with_current_rental(_middle(dataset))),
+        CARS,
+    ),
+    PlanCheck(
+        "CarRepository.available",
+        lambda dataset: list(
+            CarRepository.available(_middle(dataset), _middle(dataset) + timedelta(days=7)).filter(
+                car_class__iexact=dataset.cars[0].car_class
+            )
+        ),
+    ),
+    PlanCheck("CarRepository.set_status", lambda dataset: CarRepository.set_status(dataset.cars[0], CarStatus.RENTED)),
+    PlanCheck(
+        "CarRepository.set_status_many",
+        lambda dataset: CarRepository.set_status_many([car.id for car in dataset.cars[:5]], CarStatus.RENTED),
+    ),
+    PlanCheck("RentalRepository.for_user", lambda dataset: list(RentalRepository.for_user(dataset.customers[0]))),
+    PlanCheck("RentalRepository.listing", lambda dataset: list(RentalRepository.listing(dataset.staff)[:50])),
+    PlanCheck("RentalRepository.active", lambda dataset: list(RentalRepository.active())),
+    PlanCheck(
+        "RentalRepository.overlapping",
+        lambda dataset: list(RentalRepository.overlapping(_middle(dataset), _middle(dataset) + timedelta(days=7))),
+    ),
+    PlanCheck(
+        "RentalRepository.accrue_overdue",
+        lambda dataset: RentalRepository.accrue_overdue(_middle(dataset), Decimal("50.00")),
+    ),
+    PlanCheck(
+        "RentalRepository.for_return",
+        lambda dataset: RentalRepository.for_return(
+            RentalRepository.active().values_list("id", flat=True)[:5], lock=True
+        ),
+    ),
+    PlanCheck(
+        "RentalRepository.clear_overdue",
+        lambda dataset: RentalRepository.clear_overdue(list(RentalRepository.active().values_list("id", flat=True))),
+    ),
+    PlanCheck(
+        "ReportRepository.financial",
+        lambda dataset: list(ReportRepository.financial(_middle(dataset), _middle(dataset) + timedelta(days=30))),
+    ),
+    PlanCheck(
+        "ReportRepository.occupancy_timeline",
+        lambda dataset: list(
+            ReportRepository.occupancy_timeline(_middle(dataset), _middle(dataset) + timedelta(days=30))
+        ),
+        CARS,
+    ),
+    PlanCheck(
+        "ReportRepository.returned_rental_columns",
+        lambda dataset: list(
+            ReportRepository.returned_rental_columns(_middle(dataset), _middle(dataset) + timedelta(days=30))
+        ),
+        CARS,
+    ),
+    PlanCheck("ReportRepository.overdue", lambda dataset: list(ReportRepository.overdue())),
+    PlanCheck("ReportRepository.overdue_totals", lambda dataset: ReportRepository.overdue_totals()),
+]
+
+
+INDEX_SCANS = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+INDEXES_SQL = """
+    SELECT index_class.relname, table_class.relname, index.indpred IS NOT NULL
+    FROM pg_index index
+    JOIN pg_class index_class ON index_class.oid = index.indexrelid
+    JOIN pg_class table_class ON table_class.oid = index.indrelid
+    JOIN pg_namespace namespace ON namespace.oid = table_class.relnamespace
+    WHERE namespace.nspname = current_schema()
+"""
+
+
+def indexes() -> dict[str, tuple[str, bool]]:
+    with connection.cursor() as cursor:
+        cursor.execute(INDEXES_SQL)
+        return {name: (table, partial) for name, table, partial in cursor.fetchall()}
+
+
+def full_scans(plan: dict, index_tables: dict[str, tuple[str, bool]], limited: bool = False) -> list[str]:
+    # An index scan without an Index Cond walks the whole index, which is what the planner falls back to when
+    # sequential scans are off. It is fine on a partial index, whose predicate is the condition, and under a
+    # Limit, where it is an ordered read of the first rows.
+    limited = limited or plan["Node Type"] == "Limit"
+    tables = []
+    if plan["Node Type"] == "Seq Scan":
+        tables.append(plan["Relation Name"])
+    elif plan["Node Type"] in INDEX_SCANS and "Index Cond" not in plan and not limited:
+        table, partial = index_tables[plan["Index Name"]]
+        if not partial:
+            tables.append(table)
+    for child in plan.get("Plans", []):
+        tables.extend(full_scans(child, index_tables, limited))
+    return tables
+
+
+def capture_plans(run: Callable[[], object]) -> list[tuple[str, dict]]:
+    plans = []
+
+    def explain(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            # A plain cursor on the raw connection: server-side cursors cannot run EXPLAIN, and Django's
+            # cursor would come back through this wrapper.
+            with context["connection"].connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plans.append((sql, cursor.fetchone()[0][0]["Plan"]))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(explain):
+        run()
+    return plans
+
+
+def check_plans(dataset: Dataset, checks: list[PlanCheck] = PLAN_CHECKS) -> list[PlanRegression]:
+    # With sequential scans, hash joins and merge joins priced out the planner still reads a whole table only where
+    # no index condition applies (joins included), so any full scan left in a plan is a query the index set does
+    # not serve, whatever the table sizes. Materialization goes too: on small tables a nested loop would otherwise
+    # walk a whole index once and filter it against a materialized inner side instead of probing it.
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        for setting in ("enable_seqscan", "enable_hashjoin", "enable_mergejoin", "enable_material"):
+            cursor.execute(f"SET LOCAL {setting} = off")
+    index_tables = indexes()
+    regressions = []
+    for check in checks:
+        for sql, plan in capture_plans(lambda: check.run(dataset)):
+            for table in full_scans(plan, index_tables):
+                if table not in check.full_scans:
+                    regressions.append(PlanRegression(check.name, table, sql))
+    return regressions
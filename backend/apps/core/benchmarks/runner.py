@@ -0,0 +1,118 @@
+import math
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .dataset import build_dataset
+from .scenarios import SCENARIOS
+
+DEFAULT_SIZES = (100, 1000)
+# Metrics compared against a baseline; query counts are deterministic so any increase is flagged.
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "peak_memory_kb")
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    size: int
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    queries: int
+    peak_memory_kb: float
+
+
+@dataclass
+class Regression:
+    scenario: str
+    size: int
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return f"{self.scenario}[{self.size}] {self.metric}: {self.baseline} -> {self.current}"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure(scenario: str, dataset, size: int, iterations: int) -> BenchmarkResult:
+    prepare = SCENARIOS[scenario]
+    # Warm-up iteration also primes caches (pricing engine, content types) outside the measurements.
+    prepare(dataset, 0)()
+    timings, queries = [], []
+    for iteration in range(1, iterations + 1):
+        call = prepare(dataset, iteration)
+        # The query log is a bounded deque; once full, CaptureQueriesContext would count nothing.
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+
+    # tracemalloc slows allocation-heavy code down, so peak memory comes from a separate run.
+    call = prepare(dataset, iterations + 1)
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        scenario=scenario,
+        size=size,
+        iterations=iterations,
+        p50_ms=round(percentile(timings, 50), 3),
+        p95_ms=round(percentile(timings, 95), 3),
+        p99_ms=round(percentile(timings, 99), 3),
+        mean_ms=round(sum(timings) / len(timings), 3),
+        queries=max(queries),
+        peak_memory_kb=round(peak / 1024, 1),
+    )
+
+
+def run_suite(sizes=DEFAULT_SIZES, iterations: int = 30, scenarios=None, seed: int = 42) -> dict:
+    results = []
+    for size in sizes:
+        # Each size is built and measured inside a transaction that is rolled back afterwards.
+        with transaction.atomic():
+            dataset = build_dataset(size, seed=seed)
+            for scenario in scenarios or SCENARIOS:
+                results.append(measure(scenario, dataset, size, iterations))
+            transaction.set_rollback(True)
+    return {
+        "meta": {
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "seed": seed,
+            "iterations": iterations,
+        },
+        "results": [asdict(result) for result in results],
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> list[Regression]:
+    previous = {(row["scenario"], row["size"]): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        before = previous.get((row["scenario"], row["size"]))
+        if before is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if row[metric] > before[metric] * (1 + tolerance):
+                regressions.append(Regression(row["scenario"], row["size"], metric, before[metric], row[metric]))
+        if row["queries"] > before["queries"]:
+            regressions.append(Regression(row["scenario"], row["size"], "queries", before["queries"], row["queries"]))
+    return regressions
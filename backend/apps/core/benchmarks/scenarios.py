@@ -0,0 +1,112 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+from typing import Callable
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.core.cache import FINANCIAL_REPORTS, OCCUPANCY_REPORTS, bump_version
+from apps.core.services.factory import PricingStrategyFactory
+from apps.fleet.models import Car
+from apps.rentals.models import RentalAgreement, RentalStatus
+from apps.rentals.services import accrue_overdue, create_rental, return_rental
+from apps.rentals.views import RentalViewSet
+from apps.reports.views import FinancialReportView, OccupancyReportView
+from .dataset import Dataset
+
+# A scenario prepares one iteration outside the timed section and returns the call to measure.
+Scenario = Callable[[Dataset, int], Callable[[], object]]
+
+factory = APIRequestFactory()
+
+
+def _new_rental(dataset: Dataset, iteration: int) -> RentalAgreement:
+    issue_date, expected_return_date = dataset.next_booking(days=3)
+    return RentalAgreement.objects.create(
+        customer=dataset.customers[iteration % len(dataset.customers)],
+        # Read afresh: create_rental's status write is a compare-and-swap on the car version it carries.
+        car=Car.objects.get(pk=dataset.cars[iteration % len(dataset.cars)].pk),
+        issue_date=issue_date,
+        expected_return_date=expected_return_date,
+        status=RentalStatus.DRAFT,
+    )
+
+
+def _render(view, request):
+    response = view(request)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+def create_rental_scenario(dataset: Dataset, iteration: int):
+    rental = _new_rental(dataset, iteration)
+    return lambda: create_rental(rental, Decimal("200.00"))
+
+
+def return_rental_scenario(dataset: Dataset, iteration: int):
+    rental = _new_rental(dataset, iteration)
+    create_rental(rental, Decimal("200.00"))
+    return_date = rental.expected_return_date + timedelta(days=iteration % 3)
+    return lambda: return_rental(rental, return_date, bad_condition=iteration % 4 == 0)
+
+
+def pricing_scenario(dataset: Dataset, iteration: int):
+    pricing = PricingStrategyFactory.build()
+    rng = random.Random(iteration)
+    car = rng.choice(dataset.cars)
+    days = rng.randint(1, 30)
+    issue_date = dataset.start + timedelta(days=rng.randint(0, (dataset.end - dataset.start).days))
+    return lambda: pricing.calculate(car.base_daily_price, days, car.year, issue_date)
+
+
+def rental_list_scenario(dataset: Dataset, iteration: int):
+    view = RentalViewSet.as_view({"get": "list"})
+    request = factory.get("/api/rentals/")
+    force_authenticate(request, user=dataset.staff)
+    return lambda: _render(view, request)
+
+
+def occupancy_report_scenario(dataset: Dataset, iteration: int):
+    # Report scenarios measure a rebuild; the cached path is measured by financial_report_cached.
+    bump_version(OCCUPANCY_REPORTS)
+    view = OccupancyReportView.as_view()
+    target_date = dataset.start + (dataset.end - dataset.start) / 2
+    request = factory.get("/api/reports/occupancy/", {"date": target_date.isoformat()})
+    force_authenticate(request, user=dataset.staff)
+    return lambda: _render(view, request)
+
+
+def _financial_report_request(dataset: Dataset):
+    params = {"date_from": dataset.start.isoformat(), "date_to": dataset.end.isoformat()}
+    request = factory.get("/api/reports/financial/", params)
+    force_authenticate(request, user=dataset.staff)
+    return request
+
+
+def financial_report_scenario(dataset: Dataset, iteration: int):
+    bump_version(FINANCIAL_REPORTS)
+    view, request = FinancialReportView.as_view(), _financial_report_request(dataset)
+    return lambda: _render(view, request)
+
+
+def financial_report_cached_scenario(dataset: Dataset, iteration: int):
+    view, request = FinancialReportView.as_view(), _financial_report_request(dataset)
+    _render(view, request)
+    return lambda: _render(view, request)
+
+
+def overdue_accrual_scenario(dataset: Dataset, iteration: int):
+    # A later day each iteration, so every provisional fee is rewritten: the nightly worst case.
+    as_of = dataset.end + timedelta(days=iteration + 1)
+    return lambda: accrue_overdue(as_of)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "create_rental": create_rental_scenario,
+    "return_rental": return_rental_scenario,
+    "pricing_calculate": pricing_scenario,
+    "rental_list": rental_list_scenario,
+    "occupancy_report": occupancy_report_scenario,
+    "financial_report": financial_report_scenario,
+    "financial_report_cached": financial_report_cached_scenario,
+    "overdue_accrual": overdue_accrual_scenario,
+}
@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+CATALOGUE = "catalogue"
+FINANCIAL_REPORTS = "reports:financial"
+OCCUPANCY_REPORTS = "reports:occupancy"
+
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+
+class LocalCache:
+    # Per-process entries that expire after their timeout, bounded to the `max_entries` most recently used.
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, timeout: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _version_key(namespace: str) -> str:
+    return f"version:{namespace}"
+
+
+def _new_version() -> tuple[str, float]:
+    return uuid.uuid4().hex, time.time()
+
+
+def get_version(namespace: str) -> tuple[str, float]:
+    # A random token instead of a counter: bumps are plain sets, safe on backends without atomic incr.
+    return cache.get_or_set(_version_key(namespace), _new_version, timeout=None)
+
+
+async def aget_version(namespace: str) -> tuple[str, float]:
+    return await cache.aget_or_set(_version_key(namespace), _new_version, timeout=None)
+
+
+def bump_version(namespace: str) -> None:
+    cache.set(_version_key(namespace), _new_version(), timeout=None)
+
+
+def bump_version_on_commit(namespace: str) -> None:
+    # Readers must not cache pre-commit data under the new version, so bump once the write is visible.
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def _digest(parts: tuple) -> str:
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def request_parts(request) -> tuple:
+    return request.path, tuple(sorted(request.query_params.lists()))
+
+
+def _validators(request, namespace: str, version: tuple[str, float]) -> tuple[str, str, int]:
+    token, modified = version
+    digest = _digest(request_parts(request))
+    return f"{namespace}:{token}:{digest}", f'"{token[:16]}{digest[:16]}"', int(modified)
+
+
+def _with_validators(response, etag: str, last_modified: int):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    return response
+
+
+def conditional_cached_response(request, namespace: str, build: Callable[[], object], timeout: int):
+    key, etag, last_modified = _validators(request, namespace, get_version(namespace))
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        data = cache.get(key)
+        if data is None:
+            data = build()
+            cache.set(key, data, timeout)
+        response = Response(data)
+    return _with_validators(response, etag, last_modified)
+
+
+async def aconditional_cached_response(
+    request, namespace: str, build: Callable[[], Awaitable], timeout: int, respond: Callable[[object], object]
+):
+    key, etag, last_modified = _validators(request, namespace, await aget_version(namespace))
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        data = await cache.aget(key)
+        if data is None:
+            data = await build()
+            await cache.aset(key, data, timeout)
+        response = respond(data)
+    return _with_validators(response, etag, last_modified)
+
+
+def _lock_id(lock_key: str) -> int:
+    return int.from_bytes(hashlib.sha1(lock_key.encode()).digest()[:8], "big", signed=True)
+
+
+def _try_lock(lock_key: str) -> bool:
+    # A Postgres advisory lock on the primary: the file-based cache's add() is a check then a write, so two workers
+    # could both take a cache lock. The server also drops the lock if the holder's connection dies mid-build.
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [_lock_id(lock_key)])
+        return cursor.fetchone()[0]
+
+
+def _unlock(lock_key: str) -> None:
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", [_lock_id(lock_key)])
+
+
+def single_flight(namespace: str, parts: tuple, build: Callable[[], object], timeout: int):
+    # Entries keep the version they were built for under a stable key, so after a bump the previous
+    # result is still there to serve while a single worker, holding the lock, rebuilds it.
+    token, _ = get_version(namespace)
+    key = f"{namespace}:{_digest(parts)}"
+    entry = cache.get(key)
+    if entry is not None and entry[0] == token:
+        return entry[1]
+
+    lock_key = f"lock:{key}"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not _try_lock(lock_key):
+        if entry is not None:
+            return entry[1]
+        # Nothing to serve yet: wait for the builder rather than piling onto the database.
+        if time.monotonic() > deadline:
+            return build()
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry[0] == token:
+            return entry[1]
+    try:
+        # The previous holder may have stored this version between our read and taking the lock.
+        entry = cache.get(key)
+        if entry is not None and entry[0] == token:
+            return entry[1]
+        data = build()
+        cache.set(key, (token, data), timeout)
+    finally:
+        _unlock(lock_key)
+    return data
+
+
+async def asingle_flight(namespace: str, parts: tuple, build: Callable[[], Awaitable], timeout: int):
+    token, _ = await aget_version(namespace)
+    key = f"{namespace}:{_digest(parts)}"
+    entry = await cache.aget(key)
+    if entry is not None and entry[0] == token:
+        return entry[1]
+
+    lock_key = f"lock:{key}"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    # Thread-sensitive, so the lock is taken and released on the same connection.
+    while not await sync_to_async(_try_lock)(lock_key):
+        if entry is not None:
+            return entry[1]
+        if time.monotonic() > deadline:
+            return await build()
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        entry = await cache.aget(key)
+        if entry is not None and entry[0] == token:
+            return entry[1]
+    try:
+        entry = await cache.aget(key)
+        if entry is not None and entry[0] == token:
+            return entry[1]
+        data = await build()
+        await cache.aset(key, (token, data), timeout)
+    finally:
+        await sync_to_async(_unlock)(lock_key)
+    return data
@@ -0,0 +1,90 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import permissions
+from .cache import get_version
+
+# Reads go to the primary unless a view opted the current request into a replica.
+_read_alias: ContextVar[str | None] = ContextVar("read_alias", default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _pin_key(user_id) -> str:
+    return f"db:primary:{user_id}"
+
+
+def pin_to_primary(user_id) -> None:
+    cache.set(_pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+async def apin_to_primary(user_id) -> None:
+    await cache.aset(_pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(user_id) -> bool:
+    return cache.get(_pin_key(user_id), False)
+
+
+def recently_bumped(namespace: str) -> bool:
+    # A replica may not have the write behind a fresh version yet, and a result built from it would be cached
+    # under that version until the next bump.
+    return time.time() - get_version(namespace)[1] < settings.REPLICA_STICKY_SECONDS
+
+
+def replica_allowed(request, cache_namespaces: tuple[str, ...]) -> bool:
+    if not settings.REPLICA_DATABASES or request.method not in permissions.SAFE_METHODS:
+        return False
+    if request.user.is_authenticated and is_pinned(request.user.id):
+        return False
+    return not any(recently_bumped(namespace) for namespace in cache_namespaces)
+
+
+def read_from_replica() -> None:
+    _read_alias.set(random.choice(settings.REPLICA_DATABASES))
+
+
+@contextmanager
+def primary_reads():
+    # The alias a request chose must not outlive it, nor leak into the next request on the same thread.
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaReadMixin:
+    replica_actions = ("list", "retrieve")
+    replica_cache_namespaces: tuple[str, ...] = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        with primary_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.reads_from_replica(request):
+            read_from_replica()
+
+    def reads_from_replica(self, request) -> bool:
+        action = getattr(self, "action", None)
+        if action is not None and action not in self.replica_actions:
+            return False
+        return replica_allowed(request, self.replica_cache_namespaces)
@@ -0,0 +1,26 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+
+class Conflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The resource was modified concurrently, retry the request."
+    default_code = "conflict"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was already used for a different request."
+    default_code = "idempotency_key_reused"
+
+
+class ConcurrentUpdate(Exception):
+    # A compare-and-swap write found the row at a newer version than the one it was read at.
+    pass
+
+
+def exception_handler(exc, context):
+    if isinstance(exc, ConcurrentUpdate):
+        exc = Conflict()
+    return drf_exception_handler(exc, context)
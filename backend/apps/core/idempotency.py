@@ -0,0 +1,41 @@
+import hashlib
+import json
+from datetime import timedelta
+from typing import Callable
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from .exceptions import IdempotencyKeyReused
+from .repositories.idempotency import IdempotencyRepository
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(request) -> str:
+    payload = json.dumps([request.method, request.path, request.data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def idempotent_response(request, build: Callable[[], Response]) -> Response:
+    # The key is claimed in the same transaction as the work, so a failed request leaves no key behind and its retry
+    # runs again; raised errors are never stored.
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return build()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise ValidationError({IDEMPOTENCY_HEADER: [f"Must be 1 to {MAX_KEY_LENGTH} characters."]})
+    fingerprint = _fingerprint(request)
+    expires_at = timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    with transaction.atomic():
+        key_id = IdempotencyRepository.claim(request.user.id, key, fingerprint, expires_at)
+        if key_id is not None:
+            response = build()
+            IdempotencyRepository.complete(key_id, response.status_code, response.data)
+            return response
+    stored = IdempotencyRepository.stored(request.user.id, key)
+    if stored.fingerprint != fingerprint:
+        raise IdempotencyKeyReused()
+    return Response(stored.response_body, status=stored.response_status, headers={"Idempotent-Replayed": "true"})
@@ -0,0 +1,26 @@
+from datetime import date, datetime
+from django.core.management.base import BaseCommand, CommandError
+from apps.rentals.services import accrue_overdue
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD") from exc
+
+
+class Command(BaseCommand):
+    help = "Accrue provisional late fees for ACTIVE rentals past their expected return date (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=_parse_date, help="Accrue as of this date (YYYY-MM-DD, default today)")
+
+    def handle(self, *args, **options):
+        result = accrue_overdue(options["date"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.overdue} overdue rental(s), {result.exposure} accrued: {result.accrued} fee(s) written, "
+                f"{result.flagged} flagged, {result.cleared} unflagged, {result.released} provisional fee(s) released"
+            )
+        )
@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from apps.core.benchmarks.runner import DEFAULT_SIZES, compare, run_suite
+from apps.core.benchmarks.scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = "Benchmark the API hot paths on a throwaway database and compare the results against a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Rental counts")
+        parser.add_argument("--iterations", type=int, default=30, help="Measured iterations per scenario")
+        parser.add_argument("--scenario", choices=list(SCENARIOS), action="append", help="Only run these")
+        parser.add_argument("--seed", type=int, default=42, help="Dataset random seed")
+        parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+        parser.add_argument("--baseline", type=Path, help="Previous results JSON to compare against")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown (0.2 = 20%%)")
+        parser.add_argument("--keepdb", action="store_true", help="Reuse the benchmark database between runs")
+
+    def handle(self, *args, **options):
+        baseline = json.loads(options["baseline"].read_text()) if options["baseline"] else None
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            report = run_suite(options["sizes"], options["iterations"], options["scenario"], options["seed"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        self.stdout.write(
+            f"{'scenario':<20} {'size':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'peak KiB':>10}"
+        )
+        for row in report["results"]:
+            self.stdout.write(
+                f"{row['scenario']:<20} {row['size']:>7} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+                f"{row['p99_ms']:>9} {row['queries']:>8} {row['peak_memory_kb']:>10}"
+            )
+        if options["output"]:
+            options["output"].write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+        if baseline is None:
+            return
+        regressions = compare(report, baseline, options["tolerance"])
+        for regression in regressions:
+            self.stdout.write(self.style.WARNING(f"Regression: {regression}"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
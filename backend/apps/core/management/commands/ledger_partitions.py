@@ -0,0 +1,41 @@
+from datetime import date, datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.repositories.ledger import LedgerRepository
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD") from exc
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly payment ledger partitions and detach old ones (run monthly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.LEDGER_PARTITIONS_AHEAD,
+            help="Months to create past the current one",
+        )
+        parser.add_argument(
+            "--detach-before",
+            type=_parse_date,
+            help="Detach partitions of months that end on or before this date (YYYY-MM-DD)",
+        )
+
+    def handle(self, *args, **options):
+        if not LedgerRepository.is_partitioned():
+            raise CommandError("The payment ledger is not partitioned; run migrate first")
+        if options["ahead"] < 0:
+            raise CommandError("--ahead must not be negative")
+        created = LedgerRepository.ensure_partitions(options["ahead"])
+        detached = LedgerRepository.detach_partitions(options["detach_before"]) if options["detach_before"] else []
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        for name in detached:
+            self.stdout.write(f"Detached {name}")
+        self.stdout.write(self.style.SUCCESS(f"{len(created)} partition(s) created, {len(detached)} detached"))
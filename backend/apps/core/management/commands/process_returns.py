@@ -0,0 +1,42 @@
+import csv
+import sys
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from apps.rentals.services import ReturnRequest, return_rentals
+
+TRUE_VALUES = {"1", "true", "yes", "y"}
+
+
+def _parse_row(line: int, row: dict) -> ReturnRequest:
+    try:
+        return_date = (row.get("return_date") or "").strip()
+        return ReturnRequest(
+            rental_id=int(row["rental_id"]),
+            return_date=datetime.strptime(return_date, "%Y-%m-%d").date() if return_date else None,
+            bad_condition=(row.get("bad_condition") or "").strip().lower() in TRUE_VALUES,
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        raise CommandError(f"Line {line}: invalid row {row}") from exc
+
+
+class Command(BaseCommand):
+    help = "Process end-of-day returns from a CSV file with columns rental_id,return_date,bad_condition"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to read, or - for stdin")
+
+    def handle(self, *args, **options):
+        source = sys.stdin if options["path"] == "-" else open(options["path"], newline="")
+        with source:
+            requests = [_parse_row(line, row) for line, row in enumerate(csv.DictReader(source), start=2)]
+        if not requests:
+            raise CommandError("No returns to process")
+        results = return_rentals(requests)
+        failed = 0
+        for result in results:
+            if result.error:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"Rental {result.rental_id}: {result.error}"))
+            else:
+                self.stdout.write(f"Rental {result.rental_id}: invoice total {result.invoice.total}")
+        self.stdout.write(self.style.SUCCESS(f"Processed {len(results) - failed} return(s), {failed} failed"))
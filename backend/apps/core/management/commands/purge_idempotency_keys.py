@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.core.repositories.idempotency import IdempotencyRepository
+
+
+class Command(BaseCommand):
+    help = "Delete expired Idempotency-Key responses (run daily)"
+
+    def handle(self, *args, **options):
+        deleted = IdempotencyRepository.purge(timezone.now())
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency key(s)"))
@@ -0,0 +1,28 @@
+from datetime import date, datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.core.repositories.ledger import LedgerRepository
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD") from exc
+
+
+class Command(BaseCommand):
+    help = "Rebuild or backfill the daily revenue rollup from the payment ledger"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date-from", type=_parse_date, default=date.min, help="First rental issue date (YYYY-MM-DD)"
+        )
+        parser.add_argument("--date-to", type=_parse_date, default=date.max, help="Last rental issue date (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        if options["date_from"] > options["date_to"]:
+            raise CommandError("--date-from must not be after --date-to")
+        with transaction.atomic():
+            rows = LedgerRepository.rebuild_rollup(options["date_from"], options["date_to"])
+        self.stdout.write(self.style.SUCCESS(f"Revenue rollup rebuilt ({rows} rows)"))
@@ -0,0 +1,45 @@
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from apps.core.services.jobs import work, worker_name
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs, claiming them with SELECT ... FOR UPDATE SKIP LOCKED"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=settings.JOBS_CONCURRENCY, help="Worker threads")
+        parser.add_argument("--batch-size", type=int, default=settings.JOBS_BATCH_SIZE, help="Jobs claimed at once")
+        parser.add_argument(
+            "--poll-interval", type=float, default=settings.JOBS_POLL_INTERVAL, help="Seconds to sleep when idle"
+        )
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is ready instead of polling")
+
+    def handle(self, *args, **options):
+        concurrency, batch_size = options["concurrency"], options["batch_size"]
+        if concurrency < 1 or batch_size < 1:
+            raise CommandError("--concurrency and --batch-size must be at least 1")
+        stop = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                # Finish the jobs in hand, then exit; unfinished claims would otherwise wait for the lock timeout.
+                signal.signal(signum, lambda *_: stop.set())
+
+        def run(index: int, counts: list[int]) -> None:
+            try:
+                counts[index] = work(worker_name(index), batch_size, options["poll_interval"], stop, options["burst"])
+            finally:
+                if index:
+                    connection.close()
+
+        counts = [0] * concurrency
+        # Thread 0 is this thread; every extra thread gets its own database connection.
+        threads = [threading.Thread(target=run, args=(index, counts)) for index in range(1, concurrency)]
+        for thread in threads:
+            thread.start()
+        run(0, counts)
+        for thread in threads:
+            thread.join()
+        self.stdout.write(self.style.SUCCESS(f"Processed {sum(counts)} job(s)"))
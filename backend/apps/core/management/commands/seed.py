@@ -1,13 +1,25 @@
-from django.core.management.base import BaseCommand
+from datetime import date, datetime
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from decimal import Decimal
+from apps.core.services.synthetic import SyntheticConfig, generate_synthetic_data
 from apps.fleet.models import Car
 
 User = get_user_model()
 
 
 class Command(BaseCommand):
-    help = "Seed initial data"
+    help = "Seed initial data, optionally followed by a deterministic synthetic rental history"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cars", type=int, help="Synthetic cars to generate")
+        parser.add_argument("--customers", type=int, help="Synthetic customers to generate")
+        parser.add_argument("--rentals", type=int, help="Synthetic rentals to generate")
+        parser.add_argument("--years", type=int, default=2, help="Years of rental history")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed")
+        parser.add_argument("--end-date", type=date.fromisoformat, help="Last day of history (default: today)")
+        parser.add_argument("--batch-size", type=int, default=50000, help="Rentals per COPY batch")
 
     def handle(self, *args, **options):
         if not User.objects.filter(email="admin@example.com").exists():
@@ -42,3 +54,30 @@ class Command(BaseCommand):
                 status="AVAILABLE",
             )
         self.stdout.write(self.style.SUCCESS("Seed data ready"))
+        if any(options[name] is not None for name in ("cars", "customers", "rentals")):
+            self.generate(options)
+
+    def generate(self, options):
+        defaults = SyntheticConfig()
+        config = SyntheticConfig(
+            cars=options["cars"] or defaults.cars,
+            customers=options["customers"] or defaults.customers,
+            rentals=options["rentals"] if options["rentals"] is not None else defaults.rentals,
+            years=options["years"],
+            seed=options["seed"],
+            end_date=options["end_date"] or defaults.end_date,
+            batch_size=options["batch_size"],
+        )
+        started = datetime.now()
+        try:
+            with transaction.atomic():
+                summary = generate_synthetic_data(config)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {len(summary.car_ids)} cars, {len(summary.customer_ids)} customers, "
+                f"{summary.rentals} rentals, {summary.penalties} penalties and {summary.transactions} transactions "
+                f"({summary.date_from} to {summary.date_to}) in {(datetime.now() - started).total_seconds():.1f}s"
+            )
+        )
@@ -0,0 +1,73 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.services.simulation import PricingConfig, simulate_repricing
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD") from exc
+
+
+def _parse_decimal(value: str) -> Decimal:
+    try:
+        return Decimal(value)
+    except InvalidOperation as exc:
+        raise CommandError(f"Invalid amount '{value}'") from exc
+
+
+def _parse_tier(value: str) -> tuple[int, Decimal]:
+    try:
+        min_days, discount = value.split(":")
+        return int(min_days), Decimal(discount)
+    except (ValueError, InvalidOperation) as exc:
+        raise CommandError(f"Invalid tier '{value}', expected MIN_DAYS:DISCOUNT (e.g. 7:0.05)") from exc
+
+
+class Command(BaseCommand):
+    help = "Replay a proposed pricing config over returned rentals and report revenue deltas by car class and month"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tier", type=_parse_tier, action="append", help="Discount tier MIN_DAYS:DISCOUNT")
+        parser.add_argument("--late-fee", type=_parse_decimal, help="Late fee per day")
+        parser.add_argument("--bad-condition-fee", type=_parse_decimal, help="Bad condition fee")
+        parser.add_argument("--date-from", type=_parse_date, default=date.min, help="First rental issue date")
+        parser.add_argument("--date-to", type=_parse_date, default=date.max, help="Last rental issue date")
+        parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+
+    def handle(self, *args, **options):
+        current = PricingConfig.current()
+        proposed = PricingConfig(
+            discount_tiers=dict(options["tier"]) if options["tier"] else current.discount_tiers,
+            late_fee_per_day=options["late_fee"] if options["late_fee"] is not None else current.late_fee_per_day,
+            bad_condition_fee=(
+                options["bad_condition_fee"] if options["bad_condition_fee"] is not None else current.bad_condition_fee
+            ),
+        )
+        rows = simulate_repricing(proposed, options["date_from"], options["date_to"], current=current)
+        if options["json"]:
+            data = [
+                {
+                    "car_class": row.car_class,
+                    "month": row.month,
+                    "rentals": row.rentals,
+                    "current": str(row.current),
+                    "proposed": str(row.proposed),
+                    "delta": str(row.delta),
+                }
+                for row in rows
+            ]
+            self.stdout.write(json.dumps(data, indent=2))
+            return
+        self.stdout.write(
+            f"{'car_class':<20} {'month':<8} {'rentals':>8} {'current':>14} {'proposed':>14} {'delta':>12}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row.car_class:<20} {row.month:<8} {row.rentals:>8} {row.current:>14} {row.proposed:>14} {row.delta:>12}"
+            )
+        total_delta = sum((row.delta for row in rows), Decimal("0.00"))
+        self.stdout.write(self.style.SUCCESS(f"Total revenue delta: {total_delta}"))
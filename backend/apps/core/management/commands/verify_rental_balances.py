@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.core.repositories.ledger import LedgerRepository
+
+SHOWN_IDS = 20
+
+
+class Command(BaseCommand):
+    help = "Check every rental balance against the payment ledger and optionally rebuild the ones that drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repair", action="store_true", help="Rebuild drifted balances from the ledger")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = LedgerRepository.balance_drift()
+            if not drifted:
+                self.stdout.write(self.style.SUCCESS("All rental balances match the ledger"))
+                return
+            shown = ", ".join(str(rental_id) for rental_id in drifted[:SHOWN_IDS])
+            more = f" and {len(drifted) - SHOWN_IDS} more" if len(drifted) > SHOWN_IDS else ""
+            message = f"{len(drifted)} rental balance(s) drifted from the ledger: {shown}{more}"
+            if not options["repair"]:
+                raise CommandError(f"{message}; rerun with --repair")
+            self.stdout.write(message)
+            LedgerRepository.rebuild_balances(drifted)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(drifted)} rental balance(s)"))
@@ -0,0 +1,105 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+LABEL_NAMES = ("view", "action", "method", "status")
+
+# Parameters are sent separately, so only IN lists of varying length distinguish otherwise identical SQL.
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+
+
+def sql_shape(sql: str) -> str:
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            label_text = _labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.series: dict[tuple, int] = defaultdict(int)
+
+    def inc(self, labels: tuple, amount: int = 1) -> None:
+        self.series[labels] += amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{{{_labels(labels)}}} {value}")
+        return lines
+
+
+def _labels(values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(LABEL_NAMES, values))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.duration = Histogram("http_request_duration_seconds", "Wall time per request.", DURATION_BUCKETS)
+        self.sql_duration = Histogram(
+            "http_request_sql_duration_seconds", "Total SQL time per request.", DURATION_BUCKETS
+        )
+        self.queries = Histogram("http_request_queries", "SQL queries per request.", QUERY_COUNT_BUCKETS)
+        self.response_size = Histogram("http_response_size_bytes", "Response body size.", SIZE_BUCKETS)
+        self.n_plus_one = Counter(
+            "http_request_n_plus_one_total", "Requests that repeated one SQL shape past the N+1 threshold."
+        )
+
+    def record(self, labels: tuple, duration: float, sql_duration: float, queries: int, size, n_plus_one: bool):
+        with self.lock:
+            self.duration.observe(labels, duration)
+            self.sql_duration.observe(labels, sql_duration)
+            self.queries.observe(labels, queries)
+            if size is not None:
+                self.response_size.observe(labels, size)
+            if n_plus_one:
+                self.n_plus_one.inc(labels)
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = (self.duration, self.sql_duration, self.queries, self.response_size, self.n_plus_one)
+            return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,135 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+from .db import apin_to_primary, pin_to_primary
+from .metrics import registry, sql_shape
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCollector:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql] += 1
+
+    def repeated_shape(self, threshold: int) -> tuple[str, int] | None:
+        # Shapes are normalised only here, so the per-query cost stays a dict increment.
+        repeated = Counter()
+        for sql, count in self.shapes.items():
+            repeated[sql_shape(sql)] += count
+        shape, count = repeated.most_common(1)[0] if repeated else ("", 0)
+        return (shape, count) if count >= threshold else None
+
+
+def _watch_connections(stack: ExitStack, collector: QueryCollector) -> None:
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(collector))
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.METRICS_N_PLUS_ONE_THRESHOLD
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        collector = QueryCollector()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            _watch_connections(stack, collector)
+            response = self.get_response(request)
+        self._record(request, response, collector, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        collector = QueryCollector()
+        started = time.perf_counter()
+        # Under ASGI the request's sync work, ORM calls included, runs on one thread-sensitive executor thread,
+        # so the wrappers go on that thread's connections.
+        stack = ExitStack()
+        await sync_to_async(_watch_connections)(stack, collector)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self._record(request, response, collector, time.perf_counter() - started)
+        return response
+
+    def _record(self, request, response, collector: QueryCollector, duration: float) -> None:
+        view, action = getattr(request, "metrics_view", ("unresolved", ""))
+        labels = (view, action, request.method, response.status_code)
+        size = None if response.streaming else len(response.content)
+        repeated = collector.repeated_shape(self.threshold)
+        if repeated:
+            logger.warning("Possible N+1 in %s %s: %d x %s", view, action, repeated[1], repeated[0])
+        registry.record(labels, duration, collector.duration, collector.count, size, repeated is not None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+        if view_class is None:
+            request.metrics_view = (f"{view_func.__module__}.{view_func.__name__}", "")
+            return None
+        actions = getattr(view_func, "actions", None) or {}
+        request.metrics_view = (view_class.__name__, actions.get(request.method.lower(), request.method.lower()))
+        return None
+
+
+def _wrote(request, response) -> bool:
+    # DRF authenticates inside the view and copies the user onto the Django request.
+    user = getattr(request, "user", None)
+    return (
+        bool(settings.REPLICA_DATABASES)
+        and request.method not in SAFE_METHODS
+        and response.status_code < 400
+        and user is not None
+        and user.is_authenticated
+    )
+
+
+# Pins a user's reads to the primary for REPLICA_STICKY_SECONDS after each successful write request.
+class ReadYourWritesMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if _wrote(request, response):
+            pin_to_primary(request.user.id)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if _wrote(request, response):
+            await apin_to_primary(request.user.id)
+        return response
@@ -0,0 +1,84 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+from apps.accounts.models import User
+from .exceptions import ConcurrentUpdate
+
+
+class VersionedModel(models.Model):
+    # Every UPDATE that save() issues is a compare-and-swap: it matches the row only at the version this instance
+    # was read at and bumps it, so a writer that lost a race gets ConcurrentUpdate instead of overwriting the
+    # winner. Like an IntegrityError, it breaks the atomic block it is raised in.
+    version = models.PositiveIntegerField(default=1, db_default=1)
+
+    class Meta:
+        abstract = True
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        if self._state.adding:
+            # A new instance with an explicit pk (loaddata, re-saving a deleted row) has no version it was read at;
+            # Django tries an UPDATE first and falls through to INSERT when no row matches.
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        field = self._meta.get_field("version")
+        values = [value for value in values if value[0] is not field] + [(field, None, F("version") + 1)]
+        if not super()._do_update(
+            base_qs.filter(version=self.version), using, pk_val, values, update_fields, forced_update
+        ):
+            raise ConcurrentUpdate(f"{self._meta.label} {pk_val} changed since version {self.version}")
+        self.version += 1
+        return True
+
+
+class JobStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    RUNNING = "RUNNING", "Running"
+    FAILED = "FAILED", "Failed"
+
+
+class Job(models.Model):
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=JobStatus.choices, default=JobStatus.PENDING)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers only ever scan claimable jobs; finished jobs are deleted and failed ones are excluded.
+            models.Index(
+                fields=["run_at", "id"],
+                name="job_pending_run_at_idx",
+                condition=models.Q(status=JobStatus.PENDING),
+            ),
+            models.Index(
+                fields=["locked_at"],
+                name="job_running_locked_at_idx",
+                condition=models.Q(status=JobStatus.RUNNING),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.id}"
+
+
+class IdempotencyKey(models.Model):
+    # The stored response to a POST sent with an Idempotency-Key header, replayed to retries until expires_at.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+", db_index=False)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["user", "key"], name="idempotency_user_key_uniq")]
+        indexes = [models.Index(fields=["expires_at"], name="idempotency_expires_at_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.key} ({self.user_id})"
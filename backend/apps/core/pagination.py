@@ -0,0 +1,148 @@
+import base64
+import json
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q, QuerySet
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _ordering_field(model, name: str):
+    *relations, last = name.split(LOOKUP_SEP)
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(last)
+
+
+# Seek pagination over a unique ordering: every page is one indexed range scan, however deep it is. Ordering fields
+# may follow relations, which the paginated queryset should select_related.
+class KeysetPagination(BasePagination):
+    ordering: tuple[str, ...] = ("-id",)
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        queryset, position, backwards = self._window(queryset, request)
+        return self._page(list(queryset), position, backwards)
+
+    async def apaginate_queryset(self, queryset: QuerySet, request, view=None):
+        queryset, position, backwards = self._window(queryset, request)
+        return self._page([row async for row in queryset], position, backwards)
+
+    def _window(self, queryset: QuerySet, request) -> tuple[QuerySet, list | None, bool]:
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_page_size(request)
+        self.fields = [name.lstrip("-") for name in self.ordering]
+        self.descending = self.ordering[0].startswith("-")
+        position, backwards = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering if not backwards else [self._flip(name) for name in self.ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(position, less_than=self.descending != backwards))
+        return queryset[: self.limit + 1], position, backwards
+
+    def _page(self, rows: list, position: list | None, backwards: bool) -> list:
+        has_more = len(rows) > self.limit
+        rows = rows[: self.limit]
+        if backwards:
+            rows.reverse()
+
+        # Arriving through a cursor means there are rows on the side we came from.
+        more_after, more_before = (position is not None, has_more) if backwards else (has_more, position is not None)
+        self.next_position = self._position(rows[-1]) if rows and more_after else None
+        self.previous_position = self._position(rows[0]) if rows and more_before else None
+        return rows
+
+    def get_paginated_data(self, data) -> dict:
+        return {"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        link = {"type": "string", "nullable": True, "format": "uri"}
+        return {"type": "object", "properties": {"next": link, "previous": link, "results": schema}}
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        cursor = self.encode_cursor(self.previous_position, backwards=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, position: list, backwards: bool = False) -> str:
+        payload = json.dumps({"p": position, "r": backwards}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request, model) -> tuple[list | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = payload["p"]
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [_ordering_field(model, name).to_python(value) for name, value in zip(self.fields, values)]
+            return position, bool(payload.get("r"))
+        except (DjangoValidationError, KeyError, TypeError, ValueError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    def _position(self, row) -> list:
+        values = []
+        for name in self.fields:
+            value = row
+            for attribute in name.split(LOOKUP_SEP):
+                value = getattr(value, attribute)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return values
+
+    def _after(self, position: list, less_than: bool) -> Q:
+        # Rows strictly past the position: the leading bound keeps the scan on the index, the OR of equal
+        # prefixes breaks ties.
+        op = "lt" if less_than else "gt"
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            prefix = {field: value for field, value in zip(self.fields[:index], position)}
+            condition |= Q(**prefix, **{f"{name}__{op}": position[index]})
+        return Q(**{f"{self.fields[0]}__{op}e": position[0]}) & condition
+
+    @staticmethod
+    def _flip(name: str) -> str:
+        return name[1:] if name.startswith("-") else f"-{name}"
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor from a previous page's next/previous link.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Rows per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -1,7 +1,10 @@
 from datetime import date
-from django.db.models import Prefetch
+from django.db.models import Exists, F, OuterRef, Prefetch, QuerySet
+from apps.core.cache import CATALOGUE, OCCUPANCY_REPORTS, bump_version_on_commit
 from apps.fleet.models import Car, CarStatus
 from apps.rentals.models import RentalAgreement, RentalStatus
+from .rentals import RentalRepository
+from .unit_of_work import UnitOfWork
 
 
 class CarRepository:
@@ -19,7 +22,24 @@ class CarRepository:
         )
 
     @staticmethod
-    def set_status(car: Car, status: str) -> Car:
+    def available(date_from: date, date_to: date) -> QuerySet[Car]:
+        booked = RentalRepository.overlapping(date_from, date_to).filter(car=OuterRef("pk"))
+        return Car.objects.exclude(status=CarStatus.MAINTENANCE).exclude(Exists(booked))
+
+    @staticmethod
+    def set_status(car: Car, status: str, uow: UnitOfWork | None = None) -> Car:
         car.status = status
-        car.save(update_fields=["status"])
+        if uow is None:
+            car.save(update_fields=["status"])
+        else:
+            uow.register_dirty(car, "status")
         return car
+
+    @staticmethod
+    def set_status_many(car_ids, status: str) -> int:
+        # QuerySet.update sends no post_save, so the catalogue is invalidated here.
+        updated = Car.objects.filter(id__in=car_ids).update(status=status, version=F("version") + 1)
+        if updated:
+            bump_version_on_commit(CATALOGUE)
+            bump_version_on_commit(OCCUPANCY_REPORTS)
+        return updated
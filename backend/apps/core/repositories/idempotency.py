@@ -0,0 +1,46 @@
+from datetime import datetime
+from django.db import connection
+from django.utils import timezone
+from apps.core.models import IdempotencyKey
+
+# Takes the key, or takes over an expired one. A live key yields no row. While another transaction holds the key it
+# inserted, Postgres makes this INSERT wait on the unique index until that transaction ends, so a duplicate queues
+# behind the request in flight and then reads its stored response.
+CLAIM_SQL = """
+    INSERT INTO {table} AS k (user_id, key, fingerprint, expires_at)
+    VALUES (%(user_id)s, %(key)s, %(fingerprint)s, %(expires_at)s)
+    ON CONFLICT (user_id, key) DO UPDATE
+        SET fingerprint = EXCLUDED.fingerprint, expires_at = EXCLUDED.expires_at,
+            response_status = NULL, response_body = NULL
+        WHERE k.expires_at <= %(now)s
+    RETURNING id
+"""
+
+
+class IdempotencyRepository:
+    @staticmethod
+    def claim(user_id: int, key: str, fingerprint: str, expires_at: datetime) -> int | None:
+        params = {
+            "user_id": user_id,
+            "key": key,
+            "fingerprint": fingerprint,
+            "expires_at": expires_at,
+            "now": timezone.now(),
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(CLAIM_SQL.format(table=IdempotencyKey._meta.db_table), params)
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def stored(user_id: int, key: str) -> IdempotencyKey:
+        return IdempotencyKey.objects.get(user_id=user_id, key=key)
+
+    @staticmethod
+    def complete(key_id: int, status: int, body) -> None:
+        IdempotencyKey.objects.filter(id=key_id).update(response_status=status, response_body=body)
+
+    @staticmethod
+    def purge(now: datetime) -> int:
+        deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=now).delete()
+        return deleted
@@ -0,0 +1,48 @@
+from datetime import datetime
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.core.models import Job, JobStatus
+
+
+class JobRepository:
+    @staticmethod
+    def enqueue(jobs: list[Job]) -> list[Job]:
+        return Job.objects.bulk_create(jobs)
+
+    @staticmethod
+    def claim(worker: str, limit: int, stale_before: datetime) -> list[Job]:
+        now = timezone.now()
+        # SKIP LOCKED lets concurrent workers take disjoint batches instead of queueing on the same rows. Jobs left
+        # RUNNING past the lock timeout belong to a worker that died mid-job and are claimed again.
+        with transaction.atomic():
+            jobs = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=JobStatus.PENDING, run_at__lte=now)
+                    | Q(status=JobStatus.RUNNING, locked_at__lt=stale_before)
+                )
+                .order_by("run_at", "id")[:limit]
+            )
+            if jobs:
+                for job in jobs:
+                    job.status, job.locked_at, job.locked_by = JobStatus.RUNNING, now, worker
+                    job.attempts += 1
+                Job.objects.bulk_update(jobs, ["status", "locked_at", "locked_by", "attempts"])
+        return jobs
+
+    @staticmethod
+    def complete(job: Job) -> None:
+        Job.objects.filter(id=job.id, locked_by=job.locked_by).delete()
+
+    @staticmethod
+    def retry(job: Job, run_at: datetime, error: str) -> None:
+        Job.objects.filter(id=job.id, locked_by=job.locked_by).update(
+            status=JobStatus.PENDING, run_at=run_at, locked_at=None, locked_by="", last_error=error
+        )
+
+    @staticmethod
+    def fail(job: Job, error: str) -> None:
+        Job.objects.filter(id=job.id, locked_by=job.locked_by).update(
+            status=JobStatus.FAILED, locked_at=None, last_error=error
+        )
@@ -0,0 +1,326 @@
+import re
+from collections import defaultdict
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.core.cache import FINANCIAL_REPORTS, bump_version_on_commit
+from apps.rentals.models import PaymentTransaction, DailyRevenueRollup, RentalAgreement, RentalBalance, TransactionType
+
+
+ROLLUP_UPSERT_SQL = """
+    INSERT INTO {rollup} (issue_date, car_id, transaction_type, amount, transactions_count)
+    VALUES {values}
+    ON CONFLICT (issue_date, car_id, transaction_type) DO UPDATE SET
+        amount = {rollup}.amount + EXCLUDED.amount,
+        transactions_count = {rollup}.transactions_count + EXCLUDED.transactions_count
+"""
+
+# One statement for both running totals of a ledger write: the revenue rollup in a CTE, then the rental balances.
+TOTALS_UPSERT_SQL = """
+    WITH rollup AS ({rollup_upsert} RETURNING 1)
+    INSERT INTO {balances} AS b (rental_id, rental_charged, penalties_total, deposit_held, deposit_refunded)
+    VALUES {balance_values}
+    ON CONFLICT (rental_id) DO UPDATE SET
+        rental_charged = b.rental_charged + EXCLUDED.rental_charged,
+        penalties_total = b.penalties_total + EXCLUDED.penalties_total,
+        deposit_held = b.deposit_held + EXCLUDED.deposit_held,
+        deposit_refunded = b.deposit_refunded + EXCLUDED.deposit_refunded
+"""
+
+# Ledger type summed into each RentalBalance column.
+BALANCE_COLUMNS = {
+    TransactionType.RENTAL_CHARGE: "rental_charged",
+    TransactionType.PENALTY_CHARGE: "penalties_total",
+    TransactionType.DEPOSIT_HELD: "deposit_held",
+    TransactionType.DEPOSIT_REFUND: "deposit_refunded",
+}
+
+LEDGER_BALANCES_SQL = """
+    SELECT rental_id,
+           COALESCE(SUM(amount) FILTER (WHERE transaction_type = %(rental_charge)s), 0) AS rental_charged,
+           COALESCE(SUM(amount) FILTER (WHERE transaction_type = %(penalty_charge)s), 0) AS penalties_total,
+           COALESCE(SUM(amount) FILTER (WHERE transaction_type = %(deposit_held)s), 0) AS deposit_held,
+           COALESCE(SUM(amount) FILTER (WHERE transaction_type = %(deposit_refund)s), 0) AS deposit_refunded
+    FROM {transactions}
+    WHERE %(rental_ids)s::bigint[] IS NULL OR rental_id = ANY(%(rental_ids)s)
+    GROUP BY rental_id
+"""
+
+BALANCE_DRIFT_SQL = """
+    WITH ledger AS ({ledger_balances})
+    SELECT COALESCE(l.rental_id, b.rental_id)
+    FROM ledger l
+    FULL JOIN {balances} b ON b.rental_id = l.rental_id
+    WHERE (l.rental_charged, l.penalties_total, l.deposit_held, l.deposit_refunded)
+        IS DISTINCT FROM (b.rental_charged, b.penalties_total, b.deposit_held, b.deposit_refunded)
+    ORDER BY 1
+"""
+
+BALANCE_REBUILD_SQL = """
+    INSERT INTO {balances} (rental_id, rental_charged, penalties_total, deposit_held, deposit_refunded)
+    {ledger_balances}
+"""
+
+ROLLUP_REBUILD_SQL = """
+    INSERT INTO {rollup} (issue_date, car_id, transaction_type, amount, transactions_count)
+    SELECT r.issue_date, r.car_id, t.transaction_type, SUM(t.amount), COUNT(*)
+    FROM {transactions} t
+    JOIN {rentals} r ON r.id = t.rental_id
+    WHERE r.issue_date >= %s AND r.issue_date <= %s
+    GROUP BY r.issue_date, r.car_id, t.transaction_type
+"""
+
+RENTAL_TOTALS_SQL = """
+    SELECT transaction_type, SUM(amount) AS amount, COUNT(*) AS transactions_count
+    FROM {transactions}
+    WHERE rental_id = %(rental_id)s
+    GROUP BY transaction_type
+"""
+
+# Takes a rental's ledger totals out of the rollup bucket of an issue date and car, dropping rows left empty.
+ROLLUP_SUBTRACT_SQL = """
+    WITH totals AS ({rental_totals})
+    UPDATE {rollup} r
+    SET amount = r.amount - t.amount, transactions_count = r.transactions_count - t.transactions_count
+    FROM totals t
+    WHERE r.issue_date = %(old_issue_date)s AND r.car_id = %(old_car_id)s AND r.transaction_type = t.transaction_type;
+    DELETE FROM {rollup}
+    WHERE issue_date = %(old_issue_date)s AND car_id = %(old_car_id)s AND transactions_count = 0;
+"""
+
+# Adds them to the bucket of the rental's current issue date and car.
+ROLLUP_ADD_SQL = """
+    WITH totals AS ({rental_totals})
+    INSERT INTO {rollup} AS r (issue_date, car_id, transaction_type, amount, transactions_count)
+    SELECT %(issue_date)s, %(car_id)s, transaction_type, amount, transactions_count FROM totals
+    ON CONFLICT (issue_date, car_id, transaction_type) DO UPDATE SET
+        amount = r.amount + EXCLUDED.amount,
+        transactions_count = r.transactions_count + EXCLUDED.transactions_count;
+"""
+
+PARTITION_SQL = """
+    CREATE TABLE {partition} (LIKE {ledger} INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+    WITH moved AS (DELETE FROM {default} WHERE created_at >= %(start)s AND created_at < %(end)s RETURNING *)
+    INSERT INTO {partition} SELECT * FROM moved;
+    ALTER TABLE {ledger} ATTACH PARTITION {partition} FOR VALUES FROM (%(start)s) TO (%(end)s);
+"""
+
+PARTITIONS_SQL = """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = %s::regclass
+"""
+
+DEFAULT_PARTITION_MONTHS_SQL = """
+    SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')::date FROM {default}
+"""
+
+PARTITION_MONTH = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_start(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+
+
+class LedgerRepository:
+    @staticmethod
+    def record(transactions: list[PaymentTransaction]) -> list[PaymentTransaction]:
+        created = PaymentTransaction.objects.bulk_create(transactions)
+        LedgerRepository.apply_to_totals(created)
+        return created
+
+    @staticmethod
+    def apply_to_totals(transactions: list[PaymentTransaction]) -> None:
+        buckets: dict[tuple, list] = defaultdict(lambda: [Decimal("0.00"), 0])
+        balances: dict[int, dict[str, Decimal]] = {}
+        for transaction in transactions:
+            # Match the rounding Postgres applies when storing into the numeric(10, 2) column.
+            amount = Decimal(transaction.amount).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            key = (transaction.rental.issue_date, transaction.rental.car_id, transaction.transaction_type)
+            buckets[key][0] += amount
+            buckets[key][1] += 1
+            balance = balances.setdefault(transaction.rental_id, dict.fromkeys(BALANCE_COLUMNS.values(), Decimal(0)))
+            balance[BALANCE_COLUMNS[transaction.transaction_type]] += amount
+        if not buckets:
+            return
+        params = []
+        for (issue_date, car_id, transaction_type), (amount, count) in buckets.items():
+            params.extend([issue_date, car_id, transaction_type, amount, count])
+        for rental_id, balance in balances.items():
+            params.extend([rental_id, *(balance[column] for column in BALANCE_COLUMNS.values())])
+        sql = TOTALS_UPSERT_SQL.format(
+            rollup_upsert=ROLLUP_UPSERT_SQL.format(
+                rollup=DailyRevenueRollup._meta.db_table,
+                values=", ".join(["(%s, %s, %s, %s, %s)"] * len(buckets)),
+            ),
+            balances=RentalBalance._meta.db_table,
+            balance_values=", ".join(["(%s, %s, %s, %s, %s)"] * len(balances)),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+        bump_version_on_commit(FINANCIAL_REPORTS)
+
+    @staticmethod
+    def _rental_rollup(statements: list[str], params: dict) -> None:
+        tables = {
+            "rollup": DailyRevenueRollup._meta.db_table,
+            "rental_totals": RENTAL_TOTALS_SQL.format(transactions=PaymentTransaction._meta.db_table),
+        }
+        with connection.cursor() as cursor:
+            cursor.execute("".join(statement.format(**tables) for statement in statements), params)
+        bump_version_on_commit(FINANCIAL_REPORTS)
+
+    @staticmethod
+    def move_rollup(rental: RentalAgreement, old_issue_date: date, old_car_id: int) -> None:
+        LedgerRepository._rental_rollup(
+            [ROLLUP_SUBTRACT_SQL, ROLLUP_ADD_SQL],
+            {
+                "rental_id": rental.id,
+                "old_issue_date": old_issue_date,
+                "old_car_id": old_car_id,
+                "issue_date": rental.issue_date,
+                "car_id": rental.car_id,
+            },
+        )
+
+    @staticmethod
+    def remove_from_rollup(rental: RentalAgreement) -> None:
+        # For a rental about to be deleted along with its ledger rows.
+        LedgerRepository._rental_rollup(
+            [ROLLUP_SUBTRACT_SQL],
+            {"rental_id": rental.id, "old_issue_date": rental.issue_date, "old_car_id": rental.car_id},
+        )
+
+    @staticmethod
+    def _ledger_balances(rental_ids) -> tuple[str, dict]:
+        params = {
+            "rental_charge": TransactionType.RENTAL_CHARGE,
+            "penalty_charge": TransactionType.PENALTY_CHARGE,
+            "deposit_held": TransactionType.DEPOSIT_HELD,
+            "deposit_refund": TransactionType.DEPOSIT_REFUND,
+            "rental_ids": None if rental_ids is None else list(rental_ids),
+        }
+        return LEDGER_BALANCES_SQL.format(transactions=PaymentTransaction._meta.db_table), params
+
+    @staticmethod
+    def balance_drift() -> list[int]:
+        # Rentals whose stored balance differs from their ledger rows, including balances left without any.
+        ledger_balances, params = LedgerRepository._ledger_balances(None)
+        sql = BALANCE_DRIFT_SQL.format(ledger_balances=ledger_balances, balances=RentalBalance._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [rental_id for (rental_id,) in cursor.fetchall()]
+
+    @staticmethod
+    def rebuild_balances(rental_ids=None) -> int:
+        # Recomputes the given rentals' balances (all of them without ids) from the ledger.
+        balances = (
+            RentalBalance.objects.all()
+            if rental_ids is None
+            else RentalBalance.objects.filter(rental_id__in=rental_ids)
+        )
+        balances.delete()
+        ledger_balances, params = LedgerRepository._ledger_balances(rental_ids)
+        sql = BALANCE_REBUILD_SQL.format(balances=RentalBalance._meta.db_table, ledger_balances=ledger_balances)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    @staticmethod
+    def rebuild_rollup(date_from: date, date_to: date) -> int:
+        DailyRevenueRollup.objects.filter(issue_date__gte=date_from, issue_date__lte=date_to).delete()
+        sql = ROLLUP_REBUILD_SQL.format(
+            rollup=DailyRevenueRollup._meta.db_table,
+            transactions=PaymentTransaction._meta.db_table,
+            rentals=RentalAgreement._meta.db_table,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [date_from, date_to])
+            rows = cursor.rowcount
+        bump_version_on_commit(FINANCIAL_REPORTS)
+        return rows
+
+    # The ledger is range-partitioned by month on created_at (UTC). Rows outside every monthly partition go to the
+    # default partition until a partition for their month is created.
+    @staticmethod
+    def partition_name(month: date) -> str:
+        return f"{PaymentTransaction._meta.db_table}_p{month:%Y%m}"
+
+    @staticmethod
+    def default_partition() -> str:
+        return f"{PaymentTransaction._meta.db_table}_default"
+
+    @staticmethod
+    def is_partitioned() -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)", [PaymentTransaction._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return bool(row and row[0])
+
+    @staticmethod
+    def partitions() -> dict[date, str]:
+        with connection.cursor() as cursor:
+            cursor.execute(PARTITIONS_SQL, [PaymentTransaction._meta.db_table])
+            names = [name for (name,) in cursor.fetchall()]
+        months = {}
+        for name in names:
+            match = PARTITION_MONTH.search(name)
+            if match:
+                months[date(int(match[1]), int(match[2]), 1)] = name
+        return dict(sorted(months.items()))
+
+    @staticmethod
+    def create_partitions(date_from: date, date_to: date) -> list[str]:
+        existing = LedgerRepository.partitions()
+        created = []
+        month = date_from.replace(day=1)
+        while month <= date_to:
+            if month not in existing:
+                LedgerRepository._create_partition(month)
+                created.append(LedgerRepository.partition_name(month))
+            month = _add_months(month, 1)
+        return created
+
+    @staticmethod
+    def _create_partition(month: date) -> None:
+        # Rows already in the default partition for this month move over in the same transaction; ATTACH then
+        # finds the default partition free of the new range.
+        sql = PARTITION_SQL.format(
+            partition=LedgerRepository.partition_name(month),
+            ledger=PaymentTransaction._meta.db_table,
+            default=LedgerRepository.default_partition(),
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, {"start": _month_start(month), "end": _month_start(_add_months(month, 1))})
+
+    @staticmethod
+    def ensure_partitions(months_ahead: int, today: date | None = None) -> list[str]:
+        this_month = (today or timezone.now().date()).replace(day=1)
+        with connection.cursor() as cursor:
+            cursor.execute(DEFAULT_PARTITION_MONTHS_SQL.format(default=LedgerRepository.default_partition()))
+            stray = [month for (month,) in cursor.fetchall()]
+        created = []
+        for month in stray:
+            created.extend(LedgerRepository.create_partitions(month, month))
+        created.extend(LedgerRepository.create_partitions(this_month, _add_months(this_month, months_ahead)))
+        return created
+
+    @staticmethod
+    def detach_partitions(before: date) -> list[str]:
+        # Detached partitions stay behind as plain tables for archiving; the rollup keeps their totals.
+        detached = []
+        for month, name in LedgerRepository.partitions().items():
+            if _add_months(month, 1) <= before:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ALTER TABLE {PaymentTransaction._meta.db_table} DETACH PARTITION {name}")
+                detached.append(name)
+        return detached
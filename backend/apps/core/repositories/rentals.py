@@ -1,15 +1,104 @@
+from datetime import date
+from django.db.backends.postgresql.psycopg_any import DateRange
+from decimal import Decimal
+from django.db import connection
 from django.db.models import QuerySet
-from apps.rentals.models import RentalAgreement, RentalStatus
+from apps.rentals.models import Penalty, PenaltyType, RentalAgreement, RentalStatus, RentalPeriod, BOOKING_STATUSES
 from apps.accounts.models import User
 
 
+# One statement over the whole fleet: accrue or refresh a provisional late fee and flag every overdue ACTIVE rental,
+# and undo both for rentals that are no longer overdue. Unchanged fees and flags are not rewritten, so repeated runs
+# for the same day write nothing. Flag changes bump the rental version like any other write.
+OVERDUE_ACCRUAL_SQL = """
+    WITH overdue AS (
+        SELECT id, %(as_of)s::date - expected_return_date AS late_days
+        FROM {rentals}
+        WHERE status = %(active)s AND expected_return_date < %(as_of)s
+    ),
+    accrued AS (
+        INSERT INTO {penalties} AS p (rental_id, type, amount, comment, is_provisional, accrued_on)
+        SELECT id, %(late_return)s, late_days * %(fee)s, 'Late by ' || late_days || ' day(s), accrued', TRUE, %(as_of)s
+        FROM overdue
+        ON CONFLICT (rental_id) WHERE is_provisional DO UPDATE
+            SET amount = EXCLUDED.amount, comment = EXCLUDED.comment, accrued_on = EXCLUDED.accrued_on
+            WHERE p.amount IS DISTINCT FROM EXCLUDED.amount
+        RETURNING 1
+    ),
+    flagged AS (
+        UPDATE {rentals} SET is_overdue = TRUE, version = version + 1
+        WHERE status = %(active)s AND expected_return_date < %(as_of)s AND NOT is_overdue
+        RETURNING 1
+    ),
+    cleared AS (
+        UPDATE {rentals} SET is_overdue = FALSE, version = version + 1
+        WHERE is_overdue AND (status <> %(active)s OR expected_return_date >= %(as_of)s)
+        RETURNING 1
+    ),
+    released AS (
+        DELETE FROM {penalties} p
+        WHERE p.is_provisional AND NOT EXISTS (SELECT 1 FROM overdue o WHERE o.id = p.rental_id)
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM overdue),
+           (SELECT COALESCE(SUM(late_days), 0) FROM overdue) * %(fee)s,
+           (SELECT COUNT(*) FROM accrued),
+           (SELECT COUNT(*) FROM flagged),
+           (SELECT COUNT(*) FROM cleared),
+           (SELECT COUNT(*) FROM released)
+"""
+
+
 class RentalRepository:
     @staticmethod
     def for_user(user: User) -> QuerySet[RentalAgreement]:
         if user.role == "CUSTOMER":
-            return RentalAgreement.objects.filter(customer=user)
+            return RentalAgreement.objects.filter(customer_id=user.id)
         return RentalAgreement.objects.all()
 
+    @staticmethod
+    def listing(user: User, columns: list[str] | None = None) -> QuerySet[RentalAgreement]:
+        rentals = RentalRepository.for_user(user)
+        if columns is None:
+            return rentals.select_related("customer", "car", "balance")
+        related = {column.split("__")[0] for column in columns if "__" in column}
+        # The keyset columns are always loaded so the next cursor can be built from the last row.
+        return rentals.select_related(*related).only(*columns, "issue_date", "id")
+
     @staticmethod
     def active():
         return RentalAgreement.objects.filter(status=RentalStatus.ACTIVE)
+
+    @staticmethod
+    def overlapping(date_from: date, date_to: date) -> QuerySet[RentalAgreement]:
+        return (
+            RentalAgreement.objects.filter(status__in=BOOKING_STATUSES)
+            .alias(period=RentalPeriod())
+            .filter(period__overlap=DateRange(date_from, date_to))
+        )
+
+    @staticmethod
+    def accrue_overdue(as_of: date, fee_per_day: Decimal) -> tuple:
+        sql = OVERDUE_ACCRUAL_SQL.format(rentals=RentalAgreement._meta.db_table, penalties=Penalty._meta.db_table)
+        params = {
+            "as_of": as_of,
+            "active": RentalStatus.ACTIVE,
+            "late_return": PenaltyType.LATE_RETURN,
+            "fee": fee_per_day,
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+
+    @staticmethod
+    def for_return(rental_ids, lock: bool = False) -> dict[int, RentalAgreement]:
+        # One read that also brings the car and deposit every return settlement needs. Without the lock the
+        # versioned writes at commit catch a concurrent return.
+        rentals = RentalAgreement.objects.select_related("car", "deposit")
+        if lock:
+            rentals = rentals.select_for_update(of=("self",))
+        return rentals.in_bulk(rental_ids)
+
+    @staticmethod
+    def clear_overdue(rental_ids) -> None:
+        Penalty.objects.filter(rental_id__in=rental_ids, is_provisional=True).delete()
@@ -1,14 +1,138 @@
-from datetime import date
-from django.db.models import Sum, Count
-from apps.rentals.models import RentalAgreement, PaymentTransaction
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterator
+from django.db import connection
+from django.db.models import Count, Sum, Q, F, DecimalField, IntegerField, Value
+from django.db.models.functions import Coalesce
+from apps.fleet.models import Car
+from apps.rentals.models import (
+    DailyRevenueRollup,
+    Penalty,
+    PenaltyType,
+    RentalAgreement,
+    RentalStatus,
+    TransactionType,
+)
+
+
+FINANCIAL_GROUPINGS = {
+    "car": ("car_id", "car_id"),
+    "car_class": ("car__car_class", "car_class"),
+    "brand": ("car__brand", "brand"),
+}
+
+
+def _total(expression="amount", **condition):
+    return Coalesce(
+        Sum(expression, filter=Q(**condition) if condition else None),
+        Value(Decimal("0.00")),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+OCCUPYING_STATUSES = (RentalStatus.ACTIVE, RentalStatus.RETURNED, RentalStatus.CLOSED)
+
+# Rental periods are half-open [issue_date, end) like pricing durations; same-day rentals occupy one day.
+OCCUPANCY_TIMELINE_SQL = """
+    WITH periods AS (
+        SELECT car_id,
+               daterange(issue_date, GREATEST(COALESCE(actual_return_date, expected_return_date), issue_date + 1)) AS period
+        FROM {rentals}
+        WHERE status = ANY(%(statuses)s)
+          AND issue_date < %(window_end)s
+          AND GREATEST(COALESCE(actual_return_date, expected_return_date), issue_date + 1) > %(window_start)s
+    ),
+    occupancy AS (
+        SELECT car_id, range_agg(period * daterange(%(window_start)s, %(window_end)s)) AS occupied
+        FROM periods
+        GROUP BY car_id
+    )
+    SELECT c.id, c.brand, c.model, c.year, c.car_class, o.occupied
+    FROM {cars} c
+    LEFT JOIN occupancy o ON o.car_id = c.id
+    ORDER BY c.car_class, c.id
+"""
+
+RETURNED_RENTAL_COLUMNS_SQL = """
+    SELECT r.issue_date - DATE '1970-01-01',
+           r.expected_return_date - DATE '1970-01-01',
+           r.actual_return_date - DATE '1970-01-01',
+           ROUND(c.base_daily_price * 100)::bigint,
+           c.year,
+           EXTRACT(YEAR FROM r.issue_date)::int * 12 + EXTRACT(MONTH FROM r.issue_date)::int - 1,
+           EXISTS (SELECT 1 FROM {penalties} p WHERE p.rental_id = r.id AND p.type = %(bad_condition)s)::int,
+           c.car_class
+    FROM {rentals} r
+    JOIN {cars} c ON c.id = r.car_id
+    WHERE r.actual_return_date IS NOT NULL
+      AND r.status = ANY(%(statuses)s)
+      AND r.issue_date >= %(date_from)s
+      AND r.issue_date <= %(date_to)s
+"""
 
 
 class ReportRepository:
     @staticmethod
-    def financial(date_from: date, date_to: date):
-        rentals = RentalAgreement.objects.filter(issue_date__gte=date_from, issue_date__lte=date_to)
-        transactions = PaymentTransaction.objects.filter(rental__in=rentals)
-        return transactions.values("rental__car_id").annotate(
-            revenue=Sum("amount"),
-            rentals_count=Count("rental", distinct=True),
+    def financial(date_from: date, date_to: date, group_by: str = "car"):
+        source, key = FINANCIAL_GROUPINGS[group_by]
+        rollups = DailyRevenueRollup.objects.filter(issue_date__gte=date_from, issue_date__lte=date_to)
+        rollups = rollups.values(key) if source == key else rollups.values(**{key: F(source)})
+        return rollups.annotate(
+            revenue=_total(transaction_type=TransactionType.RENTAL_CHARGE),
+            penalties_total=_total(transaction_type=TransactionType.PENALTY_CHARGE),
+            deposits_total=_total(transaction_type=TransactionType.DEPOSIT_HELD),
+            refunds_total=_total(transaction_type=TransactionType.DEPOSIT_REFUND),
+            # Deposits are held and refunded on the customer's behalf; what the deposit keeps back is the penalty.
+            net_amount=_total(transaction_type__in=(TransactionType.RENTAL_CHARGE, TransactionType.PENALTY_CHARGE)),
+            # Every rental gets exactly one DEPOSIT_HELD entry, so its count is the rental count.
+            rentals_count=Coalesce(
+                Sum("transactions_count", filter=Q(transaction_type=TransactionType.DEPOSIT_HELD)),
+                Value(0),
+                output_field=IntegerField(),
+            ),
+        ).order_by(key)
+
+    @staticmethod
+    def overdue():
+        return (
+            Penalty.objects.filter(is_provisional=True)
+            .select_related("rental__car", "rental__customer")
+            .order_by("rental__expected_return_date", "rental_id")
+        )
+
+    @staticmethod
+    def overdue_totals() -> dict:
+        return Penalty.objects.filter(is_provisional=True).aggregate(accrued_total=_total(), rentals_count=Count("id"))
+
+    @staticmethod
+    def occupancy_timeline(date_from: date, date_to: date, chunk_size: int = 2000) -> Iterator[tuple]:
+        sql = OCCUPANCY_TIMELINE_SQL.format(rentals=RentalAgreement._meta.db_table, cars=Car._meta.db_table)
+        params = {
+            "statuses": list(OCCUPYING_STATUSES),
+            "window_start": date_from,
+            "window_end": date_to + timedelta(days=1),
+        }
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            while rows := cursor.fetchmany(chunk_size):
+                for car_id, brand, model, year, car_class, occupied in rows:
+                    intervals = [(period.lower, period.upper) for period in occupied] if occupied else []
+                    yield car_id, str(Car(brand=brand, model=model, year=year)), car_class, intervals
+
+    @staticmethod
+    def returned_rental_columns(date_from: date, date_to: date, chunk_size: int = 50000) -> Iterator[list[tuple]]:
+        sql = RETURNED_RENTAL_COLUMNS_SQL.format(
+            penalties=Penalty._meta.db_table,
+            rentals=RentalAgreement._meta.db_table,
+            cars=Car._meta.db_table,
         )
+        params = {
+            "bad_condition": PenaltyType.BAD_CONDITION,
+            "statuses": [RentalStatus.RETURNED, RentalStatus.CLOSED],
+            "date_from": date_from,
+            "date_to": date_to,
+        }
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            while rows := cursor.fetchmany(chunk_size):
+                yield rows
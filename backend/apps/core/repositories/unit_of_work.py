@@ -0,0 +1,32 @@
+from typing import Callable
+from django.db import models
+from apps.rentals.models import PaymentTransaction
+from .ledger import LedgerRepository
+
+# Models whose inserts must go through a repository; everything else is a plain bulk_create.
+INSERTERS: dict[type[models.Model], Callable[[list], object]] = {PaymentTransaction: LedgerRepository.record}
+
+
+class UnitOfWork:
+    # Collects the rows a service creates and changes, then writes them in commit(): one UPDATE per changed row,
+    # covering every field registered for it, and one bulk insert per model.
+    def __init__(self):
+        self.new: dict[type[models.Model], list[models.Model]] = {}
+        self.dirty: dict[tuple[type[models.Model], object], tuple[models.Model, set[str]]] = {}
+
+    def register_new(self, *instances: models.Model) -> None:
+        for instance in instances:
+            self.new.setdefault(type(instance), []).append(instance)
+
+    def register_dirty(self, instance: models.Model, *fields: str) -> None:
+        _, registered = self.dirty.setdefault((type(instance), instance.pk), (instance, set()))
+        registered.update(fields)
+
+    def commit(self) -> None:
+        # Updates go first: on versioned models they are the compare-and-swap that fails on a concurrent write, and
+        # nothing should be inserted for a change that is about to roll back.
+        for instance, fields in self.dirty.values():
+            instance.save(update_fields=sorted(fields))
+        for model, instances in self.new.items():
+            INSERTERS.get(model, model.objects.bulk_create)(instances)
+        self.new, self.dirty = {}, {}
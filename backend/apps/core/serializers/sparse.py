@@ -0,0 +1,26 @@
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsetMixin:
+    # Model paths each serializer field reads, for fields whose source is not a column of the same name.
+    sparse_sources: dict[str, tuple[str, ...]] = {}
+
+    def __init__(self, *args, fields: list[str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, value: str | None) -> list[str] | None:
+        if not value:
+            return None
+        fields = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = set(fields) - set(cls.Meta.fields)
+        if unknown:
+            raise ValidationError({"fields": f"Unknown fields: {', '.join(sorted(unknown))}"})
+        return fields
+
+    @classmethod
+    def sources(cls, fields: list[str]) -> list[str]:
+        return [source for name in fields for source in cls.sparse_sources.get(name, (name,))]
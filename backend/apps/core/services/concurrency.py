@@ -0,0 +1,22 @@
+from functools import wraps
+from apps.core.exceptions import ConcurrentUpdate
+
+CONFLICT_ATTEMPTS = 3
+
+
+def retry_on_conflict(attempts: int = CONFLICT_ATTEMPTS):
+    # For atomic services that read what they write: a lost compare-and-swap rolls the attempt back and the next one
+    # starts from fresh rows. The last ConcurrentUpdate propagates and surfaces as a 409.
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except ConcurrentUpdate:
+                    if attempt == attempts:
+                        raise
+
+        return wrapper
+
+    return decorator
@@ -1,14 +1,28 @@
 from decimal import Decimal
-from .pricing import BaseCarPricingStrategy, DurationPricingStrategy, YearFactorStrategy, CompositePricingStrategy
+from functools import cache
+from .pricing import (
+    BaseCarPricingStrategy,
+    DurationPricingStrategy,
+    YearFactorStrategy,
+    CompositePricingStrategy,
+    PricingEngine,
+)
+
+DEFAULT_DISCOUNT_TIERS = {7: Decimal("0.05"), 14: Decimal("0.10")}
 
 
 class PricingStrategyFactory:
     @staticmethod
-    def build() -> CompositePricingStrategy:
+    def build(discount_tiers: dict[int, Decimal] | None = None) -> CompositePricingStrategy:
         return CompositePricingStrategy(
             strategies=[
                 BaseCarPricingStrategy(),
-                DurationPricingStrategy({7: Decimal("0.05"), 14: Decimal("0.10")}),
+                DurationPricingStrategy(DEFAULT_DISCOUNT_TIERS if discount_tiers is None else discount_tiers),
                 YearFactorStrategy(),
             ]
         )
+
+    @staticmethod
+    @cache
+    def engine() -> PricingEngine:
+        return PricingEngine(PricingStrategyFactory.build())
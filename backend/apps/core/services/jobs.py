@@ -0,0 +1,100 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from apps.core.models import Job
+from apps.core.repositories.jobs import JobRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    func: Callable[..., None]
+    max_attempts: int
+
+
+registry: dict[str, JobHandler] = {}
+
+
+def register_job(name: str, max_attempts: int | None = None):
+    def register(func):
+        registry[name] = JobHandler(func, max_attempts or settings.JOBS_MAX_ATTEMPTS)
+        return func
+
+    return register
+
+
+def _build(name: str, payload: dict, run_at: datetime | None) -> Job:
+    if name not in registry:
+        raise ValueError(f"Unknown job {name!r}")
+    return Job(name=name, payload=payload, run_at=run_at or timezone.now(), max_attempts=registry[name].max_attempts)
+
+
+def enqueue(name: str, payload: dict, run_at: datetime | None = None) -> Job:
+    # The row is written in the caller's transaction, so the job exists exactly when the change it follows commits.
+    return JobRepository.enqueue([_build(name, payload, run_at)])[0]
+
+
+def enqueue_many(name: str, payloads: list[dict], run_at: datetime | None = None) -> list[Job]:
+    return JobRepository.enqueue([_build(name, payload, run_at) for payload in payloads])
+
+
+def backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.JOBS_BACKOFF_BASE * 2 ** (attempts - 1), settings.JOBS_BACKOFF_MAX))
+
+
+def worker_name(index: int = 0) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def run_job(job: Job) -> bool:
+    handler = registry.get(job.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job {job.name!r}")
+        if job.attempts > job.max_attempts:
+            raise RuntimeError("Worker stopped while running the job on its last attempt")
+        with transaction.atomic():
+            handler.func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if handler is not None and job.attempts < job.max_attempts:
+            JobRepository.retry(job, timezone.now() + backoff(job.attempts), error)
+            logger.warning("Job %s failed (attempt %d/%d), retrying", job, job.attempts, job.max_attempts)
+        else:
+            JobRepository.fail(job, error)
+            logger.error("Job %s failed permanently after %d attempt(s)", job, job.attempts)
+        return False
+    JobRepository.complete(job)
+    return True
+
+
+def run_pending(worker: str, batch_size: int) -> tuple[int, int]:
+    stale_before = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    succeeded = failed = 0
+    for claimed in JobRepository.claim(worker, batch_size, stale_before):
+        if run_job(claimed):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
+
+def work(worker: str, batch_size: int, poll_interval: float, stop: threading.Event, burst: bool = False) -> int:
+    processed = 0
+    while not stop.is_set():
+        succeeded, failed = run_pending(worker, batch_size)
+        processed += succeeded + failed
+        if not succeeded + failed:
+            if burst:
+                break
+            stop.wait(poll_interval)
+    return processed
@@ -1,5 +1,7 @@
-from dataclasses import dataclass
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from decimal import Decimal
+from functools import lru_cache
 from typing import Protocol
 from datetime import date
 
@@ -18,10 +20,14 @@ class BaseCarPricingStrategy:
 @dataclass
 class DurationPricingStrategy:
     discount_tiers: dict[int, Decimal]
+    _sorted_tiers: list[tuple[int, Decimal]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._sorted_tiers = sorted(self.discount_tiers.items())
 
     def multiplier(self, days: int, car_year: int, issue_date: date) -> Decimal:
         multiplier = Decimal("1.0")
-        for min_days, discount in sorted(self.discount_tiers.items()):
+        for min_days, discount in self._sorted_tiers:
             if days >= min_days:
                 multiplier = Decimal("1.0") - discount
         return multiplier
@@ -29,11 +35,15 @@ class DurationPricingStrategy:
 
 @dataclass
 class YearFactorStrategy:
+    discount_per_year: Decimal = Decimal("0.02")
+    max_age: int = 10
+    min_factor: Decimal = Decimal("0.8")
+
     def multiplier(self, days: int, car_year: int, issue_date: date) -> Decimal:
         current_year = issue_date.year
         age = max(current_year - car_year, 0)
-        factor = Decimal("1.0") - Decimal(min(age, 10)) * Decimal("0.02")
-        return max(factor, Decimal("0.8"))
+        factor = Decimal("1.0") - Decimal(min(age, self.max_age)) * self.discount_per_year
+        return max(factor, self.min_factor)
 
 
 @dataclass
@@ -46,3 +56,41 @@ class CompositePricingStrategy:
         for strategy in self.strategies:
             total_multiplier *= strategy.multiplier(days, car_year, issue_date)
         return base_total * total_multiplier
+
+
+class PricingEngine:
+    # Strategies whose multiplier depends only on the duration tier and the car age at issue.
+    KEYED_STRATEGIES = (BaseCarPricingStrategy, DurationPricingStrategy, YearFactorStrategy)
+    REFERENCE_YEAR = 2000
+
+    def __init__(self, pricing: CompositePricingStrategy, cache_size: int = 1024, warm_ages: int = 30):
+        unsupported = [type(s).__name__ for s in pricing.strategies if not isinstance(s, self.KEYED_STRATEGIES)]
+        if unsupported:
+            raise ValueError(f"Cannot precompile pricing strategies: {', '.join(unsupported)}")
+        self._pricing = pricing
+        self._day_breakpoints = sorted(
+            {
+                min_days
+                for strategy in pricing.strategies
+                if isinstance(strategy, DurationPricingStrategy)
+                for min_days in strategy.discount_tiers
+            }
+        )
+        self._multiplier = lru_cache(maxsize=cache_size)(self._compute_multiplier)
+        for bucket in range(len(self._day_breakpoints) + 1):
+            for age in range(warm_ages + 1):
+                self._multiplier(bucket, age)
+
+    def _compute_multiplier(self, days_bucket: int, car_age: int) -> Decimal:
+        days = self._day_breakpoints[days_bucket - 1] if days_bucket else 1
+        issue_date = date(self.REFERENCE_YEAR, 1, 1)
+        total_multiplier = Decimal("1.0")
+        for strategy in self._pricing.strategies:
+            total_multiplier *= strategy.multiplier(days, self.REFERENCE_YEAR - car_age, issue_date)
+        return total_multiplier
+
+    def multiplier(self, days: int, car_year: int, issue_date: date) -> Decimal:
+        return self._multiplier(bisect_right(self._day_breakpoints, days), max(issue_date.year - car_year, 0))
+
+    def calculate(self, base_price: Decimal, days: int, car_year: int, issue_date: date) -> Decimal:
+        return base_price * Decimal(days) * self.multiplier(days, car_year, issue_date)
@@ -0,0 +1,130 @@
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+from apps.core.repositories.reports import ReportRepository
+from apps.rentals.services import BAD_CONDITION_FEE, LATE_FEE_PER_DAY
+from .factory import DEFAULT_DISCOUNT_TIERS
+from .pricing import YearFactorStrategy
+
+BASIS_POINTS = 10_000
+
+
+def _fixed(value: Decimal, scale: int) -> int:
+    return int((value * scale).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+@dataclass(frozen=True)
+class PricingConfig:
+    discount_tiers: dict[int, Decimal]
+    late_fee_per_day: Decimal
+    bad_condition_fee: Decimal
+    year_factor: YearFactorStrategy = field(default_factory=YearFactorStrategy)
+
+    @classmethod
+    def current(cls) -> "PricingConfig":
+        return cls(dict(DEFAULT_DISCOUNT_TIERS), LATE_FEE_PER_DAY, BAD_CONDITION_FEE)
+
+
+@dataclass
+class RentalColumns:
+    issue_day: np.ndarray
+    expected_day: np.ndarray
+    actual_day: np.ndarray
+    base_cents: np.ndarray
+    car_year: np.ndarray
+    month: np.ndarray
+    bad_condition: np.ndarray
+    car_class: np.ndarray
+    class_names: list[str]
+
+    @classmethod
+    def load(cls, date_from: date, date_to: date) -> "RentalColumns":
+        chunks, class_chunks, class_codes = [], [], {}
+        for rows in ReportRepository.returned_rental_columns(date_from, date_to):
+            chunks.append(np.array([row[:7] for row in rows], dtype=np.int64))
+            class_chunks.append(
+                np.array([class_codes.setdefault(row[7], len(class_codes)) for row in rows], dtype=np.int64)
+            )
+        numeric = np.concatenate(chunks) if chunks else np.empty((0, 7), dtype=np.int64)
+        car_class = np.concatenate(class_chunks) if class_chunks else np.empty(0, dtype=np.int64)
+        return cls(*numeric.T, car_class=car_class, class_names=list(class_codes))
+
+    def __len__(self) -> int:
+        return len(self.issue_day)
+
+
+def evaluate(columns: RentalColumns, config: PricingConfig) -> np.ndarray:
+    days = np.maximum(columns.actual_day - columns.issue_day, 1)
+
+    tiers = sorted(config.discount_tiers.items())
+    thresholds = np.array([min_days for min_days, _ in tiers], dtype=np.int64)
+    tier_bp = np.array([BASIS_POINTS] + [BASIS_POINTS - _fixed(d, BASIS_POINTS) for _, d in tiers], dtype=np.int64)
+    duration_bp = tier_bp[np.searchsorted(thresholds, days, side="right")]
+
+    year_factor = config.year_factor
+    age = np.clip(columns.month // 12 - columns.car_year, 0, year_factor.max_age)
+    year_bp = np.maximum(
+        BASIS_POINTS - age * _fixed(year_factor.discount_per_year, BASIS_POINTS),
+        _fixed(year_factor.min_factor, BASIS_POINTS),
+    )
+
+    scale = BASIS_POINTS * BASIS_POINTS
+    rental_charge = (columns.base_cents * days * duration_bp * year_bp + scale // 2) // scale
+    late_fee = np.maximum(columns.actual_day - columns.expected_day, 0) * _fixed(config.late_fee_per_day, 100)
+    bad_condition_fee = columns.bad_condition * _fixed(config.bad_condition_fee, 100)
+    return rental_charge + late_fee + bad_condition_fee
+
+
+@dataclass
+class RepricingRow:
+    car_class: str
+    month: str
+    rentals: int
+    current: Decimal
+    proposed: Decimal
+
+    @property
+    def delta(self) -> Decimal:
+        return self.proposed - self.current
+
+
+def _cents(value) -> Decimal:
+    return Decimal(int(value)).scaleb(-2)
+
+
+def simulate_repricing(
+    proposed: PricingConfig,
+    date_from: date = date.min,
+    date_to: date = date.max,
+    current: PricingConfig | None = None,
+) -> list[RepricingRow]:
+    columns = RentalColumns.load(date_from, date_to)
+    if not len(columns):
+        return []
+    current_cents = evaluate(columns, current or PricingConfig.current())
+    proposed_cents = evaluate(columns, proposed)
+
+    first_month = columns.month.min()
+    months = columns.month.max() - first_month + 1
+    groups, inverse = np.unique(columns.car_class * months + (columns.month - first_month), return_inverse=True)
+    current_totals = np.zeros(len(groups), dtype=np.int64)
+    proposed_totals = np.zeros(len(groups), dtype=np.int64)
+    np.add.at(current_totals, inverse, current_cents)
+    np.add.at(proposed_totals, inverse, proposed_cents)
+    counts = np.bincount(inverse, minlength=len(groups))
+
+    rows = []
+    for index, group in enumerate(groups):
+        class_code, month = divmod(int(group), int(months))
+        year, month_of_year = divmod(int(first_month) + month, 12)
+        rows.append(
+            RepricingRow(
+                car_class=columns.class_names[class_code],
+                month=f"{year:04d}-{month_of_year + 1:02d}",
+                rentals=int(counts[index]),
+                current=_cents(current_totals[index]),
+                proposed=_cents(proposed_totals[index]),
+            )
+        )
+    return sorted(rows, key=lambda row: (row.car_class, row.month))
@@ -1,17 +1,27 @@
 from dataclasses import dataclass
 from apps.rentals.models import RentalAgreement, RentalStatus
+from apps.core.repositories.unit_of_work import UnitOfWork
+
+
+def _save_status(rental: RentalAgreement, uow: UnitOfWork | None) -> None:
+    # Inside a unit of work the status is written with the rental's other changes at commit. Either way the write is
+    # a compare-and-swap on the rental version, so a transition raced by another writer raises ConcurrentUpdate.
+    if uow is None:
+        rental.save(update_fields=["status"])
+    else:
+        uow.register_dirty(rental, "status")
 
 
 class RentalState:
     name: str
 
-    def activate(self, rental: RentalAgreement) -> RentalAgreement:
+    def activate(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         raise NotImplementedError
 
-    def return_car(self, rental: RentalAgreement) -> RentalAgreement:
+    def return_car(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         raise NotImplementedError
 
-    def close(self, rental: RentalAgreement) -> RentalAgreement:
+    def close(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         raise NotImplementedError
 
 
@@ -19,17 +29,17 @@ class RentalState:
 class DraftState(RentalState):
     name: str = RentalStatus.DRAFT
 
-    def activate(self, rental: RentalAgreement) -> RentalAgreement:
+    def activate(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         rental.status = RentalStatus.ACTIVE
-        rental.save(update_fields=["status"])
+        _save_status(rental, uow)
         return rental
 
-    def return_car(self, rental: RentalAgreement) -> RentalAgreement:
+    def return_car(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         raise ValueError("Cannot return a draft rental")
 
-    def close(self, rental: RentalAgreement) -> RentalAgreement:
+    def close(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         rental.status = RentalStatus.CANCELLED
-        rental.save(update_fields=["status"])
+        _save_status(rental, uow)
         return rental
 
 
@@ -37,15 +47,15 @@ class DraftState(RentalState):
 class ActiveState(RentalState):
     name: str = RentalStatus.ACTIVE
 
-    def activate(self, rental: RentalAgreement) -> RentalAgreement:
+    def activate(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         return rental
 
-    def return_car(self, rental: RentalAgreement) -> RentalAgreement:
+    def return_car(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         rental.status = RentalStatus.RETURNED
-        rental.save(update_fields=["status"])
+        _save_status(rental, uow)
         return rental
 
-    def close(self, rental: RentalAgreement) -> RentalAgreement:
+    def close(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         raise ValueError("Must return car before closing")
 
 
@@ -53,22 +63,38 @@ class ActiveState(RentalState):
 class ReturnedState(RentalState):
     name: str = RentalStatus.RETURNED
 
-    def activate(self, rental: RentalAgreement) -> RentalAgreement:
+    def activate(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         raise ValueError("Cannot activate a returned rental")
 
-    def return_car(self, rental: RentalAgreement) -> RentalAgreement:
+    def return_car(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         return rental
 
-    def close(self, rental: RentalAgreement) -> RentalAgreement:
+    def close(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
         rental.status = RentalStatus.CLOSED
-        rental.save(update_fields=["status"])
+        _save_status(rental, uow)
         return rental
 
 
+@dataclass
+class FinishedState(RentalState):
+    name: str = RentalStatus.CLOSED
+
+    def activate(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
+        raise ValueError(f"Cannot activate a {self.name.lower()} rental")
+
+    def return_car(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
+        raise ValueError(f"Cannot return a {self.name.lower()} rental")
+
+    def close(self, rental: RentalAgreement, uow: UnitOfWork | None = None) -> RentalAgreement:
+        raise ValueError(f"Cannot close a {self.name.lower()} rental")
+
+
 STATE_MAP = {
     RentalStatus.DRAFT: DraftState(),
     RentalStatus.ACTIVE: ActiveState(),
     RentalStatus.RETURNED: ReturnedState(),
+    RentalStatus.CLOSED: FinishedState(),
+    RentalStatus.CANCELLED: FinishedState(RentalStatus.CANCELLED),
 }
 
 
@@ -0,0 +1,300 @@
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db.models import F
+from apps.accounts.models import User, UserRole
+from apps.core.cache import CATALOGUE, bump_version_on_commit
+from apps.core.repositories.ledger import LedgerRepository
+from apps.fleet.models import Car, CarStatus
+from apps.rentals.models import (
+    Deposit,
+    DepositStatus,
+    Penalty,
+    PenaltyType,
+    PaymentTransaction,
+    RentalAgreement,
+    RentalStatus,
+    TransactionType,
+)
+from apps.rentals.services import BAD_CONDITION_FEE, LATE_FEE_PER_DAY, calculate_duration_days
+from .factory import PricingStrategyFactory
+
+CAR_MODELS = [
+    ("Toyota", "Corolla", "Sedan", Decimal("80.00")),
+    ("Toyota", "RAV4", "SUV", Decimal("110.00")),
+    ("Ford", "Explorer", "SUV", Decimal("120.00")),
+    ("Ford", "Fiesta", "Compact", Decimal("55.00")),
+    ("Volkswagen", "Golf", "Hatchback", Decimal("70.00")),
+    ("BMW", "X5", "SUV", Decimal("180.00")),
+    ("BMW", "3 Series", "Sedan", Decimal("140.00")),
+    ("Tesla", "Model 3", "Sedan", Decimal("150.00")),
+    ("Mercedes", "V-Class", "Van", Decimal("160.00")),
+]
+
+MAX_RENTAL_DAYS = 21
+LATE_RETURN_RATE = 0.1
+BAD_CONDITION_RATE = 0.05
+MAINTENANCE_RATE = 0.03
+# Share of cars still out at end_date whose expected return date has already passed.
+OVERDUE_RATE = 0.3
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    cars: int = 100
+    customers: int = 1000
+    rentals: int = 10000
+    years: int = 2
+    seed: int = 42
+    end_date: date = field(default_factory=date.today)
+    batch_size: int = 50000
+
+
+@dataclass
+class SyntheticSummary:
+    car_ids: list[int]
+    customer_ids: list[int]
+    date_from: date
+    date_to: date
+    rentals: int = 0
+    penalties: int = 0
+    transactions: int = 0
+    rollup_rows: int = 0
+    balance_rows: int = 0
+    rented_car_ids: set[int] = field(default_factory=set)
+
+
+def _columns(model, *names: str) -> tuple[str, list[str]]:
+    return model._meta.db_table, [model._meta.get_field(name).column for name in names]
+
+
+USER_COLUMNS = _columns(User, "id", "password", "is_superuser", "email", "full_name", "role", "is_active", "is_staff")
+CAR_COLUMNS = _columns(Car, "id", "brand", "model", "car_class", "year", "base_daily_price", "status")
+RENTAL_COLUMNS = _columns(
+    RentalAgreement, "id", "customer", "car", "issue_date", "expected_return_date", "actual_return_date", "status"
+)
+DEPOSIT_COLUMNS = _columns(Deposit, "id", "rental", "amount", "status")
+PENALTY_COLUMNS = _columns(Penalty, "id", "rental", "type", "amount", "comment")
+TRANSACTION_COLUMNS = _columns(PaymentTransaction, "id", "rental", "transaction_type", "amount", "created_at", "note")
+
+
+def _next_id(model) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {model._meta.db_table}")
+        return cursor.fetchone()[0]
+
+
+def _sync_sequence(model) -> None:
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table}",
+            [table],
+        )
+
+
+def _copy(table_columns: tuple[str, list[str]], rows: list[tuple]) -> None:
+    if not rows:
+        return
+    table, columns = table_columns
+    with connection.cursor() as cursor:
+        with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def _at(day: date, hour: int) -> datetime:
+    return datetime.combine(day, time(hour), tzinfo=dt_timezone.utc)
+
+
+class SyntheticDataGenerator:
+    def __init__(self, config: SyntheticConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.pricing = PricingStrategyFactory.engine()
+        self.date_from = config.end_date - timedelta(days=365 * config.years)
+        # A car's last rental may run up to two weeks past end_date; it is still out and stays ACTIVE.
+        self.date_to = config.end_date + timedelta(days=14)
+        self.rentals: list[tuple] = []
+        self.deposits: list[tuple] = []
+        self.penalties: list[tuple] = []
+        self.transactions: list[tuple] = []
+
+    def generate(self) -> SyntheticSummary:
+        config = self.config
+        span_days = (config.end_date - self.date_from).days
+        if config.rentals > config.cars * span_days:
+            raise ValueError(f"{config.rentals} rentals do not fit on {config.cars} cars over {span_days} days")
+
+        customer_ids = self._load_customers()
+        cars = self._load_cars()
+        summary = SyntheticSummary(
+            car_ids=[car.id for car in cars],
+            customer_ids=customer_ids,
+            date_from=self.date_from,
+            date_to=self.date_to,
+        )
+        # Partitions first, so COPY routes ledger rows straight to their month instead of the default partition.
+        LedgerRepository.create_partitions(self.date_from, self.date_to)
+        self.next_ids = {model: _next_id(model) for model in (RentalAgreement, Deposit, Penalty, PaymentTransaction)}
+        first_ids = dict(self.next_ids)
+        per_car, remainder = divmod(config.rentals, len(cars))
+        for index, car in enumerate(cars):
+            self._car_rentals(car, per_car + (index < remainder), customer_ids, summary)
+            if len(self.rentals) >= config.batch_size:
+                self._flush()
+        self._flush()
+        summary.penalties = self.next_ids[Penalty] - first_ids[Penalty]
+        summary.transactions = self.next_ids[PaymentTransaction] - first_ids[PaymentTransaction]
+
+        Car.objects.filter(id__in=summary.rented_car_ids).update(status=CarStatus.RENTED, version=F("version") + 1)
+        for model in (User, Car, RentalAgreement, Deposit, Penalty, PaymentTransaction):
+            _sync_sequence(model)
+        # Bulk-loaded tables have no statistics yet; analyse them before the set-based rollup rebuild.
+        with connection.cursor() as cursor:
+            for model in (Car, RentalAgreement, PaymentTransaction):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+        summary.rollup_rows = LedgerRepository.rebuild_rollup(self.date_from, self.date_to)
+        summary.balance_rows = LedgerRepository.rebuild_balances(
+            range(first_ids[RentalAgreement], self.next_ids[RentalAgreement])
+        )
+        bump_version_on_commit(CATALOGUE)
+        return summary
+
+    def _take_id(self, model) -> int:
+        value = self.next_ids[model]
+        self.next_ids[model] = value + 1
+        return value
+
+    def _load_customers(self) -> list[int]:
+        first_id = _next_id(User)
+        # A fixed salt keeps the generated rows identical between runs; every customer's password is "password".
+        password = make_password("password", salt="synthetic")
+        rows = [
+            (
+                user_id,
+                password,
+                False,
+                f"customer{user_id}@example.com",
+                f"Customer {user_id}",
+                UserRole.CUSTOMER,
+                True,
+                False,
+            )
+            for user_id in range(first_id, first_id + self.config.customers)
+        ]
+        _copy(USER_COLUMNS, rows)
+        return [row[0] for row in rows]
+
+    def _load_cars(self) -> list[Car]:
+        first_id = _next_id(Car)
+        cars = []
+        for car_id in range(first_id, first_id + self.config.cars):
+            brand, model, car_class, price = self.rng.choice(CAR_MODELS)
+            status = CarStatus.MAINTENANCE if self.rng.random() < MAINTENANCE_RATE else CarStatus.AVAILABLE
+            cars.append(
+                Car(
+                    id=car_id,
+                    brand=brand,
+                    model=model,
+                    car_class=car_class,
+                    year=self.rng.randint(self.date_from.year - 8, self.config.end_date.year),
+                    base_daily_price=price,
+                    status=status,
+                )
+            )
+        _copy(CAR_COLUMNS, [tuple(getattr(car, name) for name in CAR_COLUMNS[1]) for car in cars])
+        return cars
+
+    def _car_rentals(self, car: Car, count: int, customer_ids: list[int], summary: SyntheticSummary) -> None:
+        rng = self.rng
+        deposit = max(Decimal("150.00"), car.base_daily_price * 2)
+        slot = (self.config.end_date - self.date_from).days / max(count, 1)
+        for position in range(count):
+            # Each rental starts inside its own slot of the car's timeline and ends before the next slot, so a car is
+            # never double-booked. Only the last one may run past end_date, which leaves at most one still out per car
+            # and nothing issued in the future.
+            slot_start = self.date_from + timedelta(days=int(position * slot))
+            slot_days = int((position + 1) * slot) - int(position * slot)
+            span_days = slot_days + (self.date_to - self.config.end_date).days * (position == count - 1)
+            occupied = rng.randint(1, min(span_days, MAX_RENTAL_DAYS))
+            issue_date = slot_start + timedelta(days=rng.randint(0, min(slot_days - 1, span_days - occupied)))
+            late_days = rng.randint(1, occupied - 1) if occupied > 1 and rng.random() < LATE_RETURN_RATE else 0
+            returned = issue_date + timedelta(days=occupied)
+            expected = returned - timedelta(days=late_days)
+            rental_id = self._take_id(RentalAgreement)
+            self._transaction(rental_id, TransactionType.DEPOSIT_HELD, deposit, _at(issue_date, 9), "Deposit collected")
+
+            # Cars not back by end_date are still out; those past their expected return date are overdue.
+            if returned > self.config.end_date:
+                summary.rented_car_ids.add(car.id)
+                if issue_date + timedelta(days=1) < self.config.end_date and rng.random() < OVERDUE_RATE:
+                    expected = issue_date + timedelta(days=rng.randint(1, (self.config.end_date - issue_date).days - 1))
+                rental_row = (expected, None, RentalStatus.ACTIVE)
+                deposit_status = DepositStatus.HELD
+            else:
+                rental_row = (expected, returned, RentalStatus.CLOSED)
+                deposit_status = self._settle(
+                    rental_id, car, issue_date, returned, late_days, deposit, rng.random() < BAD_CONDITION_RATE
+                )
+            self.rentals.append((rental_id, rng.choice(customer_ids), car.id, issue_date, *rental_row))
+            self.deposits.append((self._take_id(Deposit), rental_id, deposit, deposit_status))
+        summary.rentals += count
+
+    def _settle(
+        self,
+        rental_id: int,
+        car: Car,
+        issue_date: date,
+        returned: date,
+        late_days: int,
+        deposit: Decimal,
+        bad_condition: bool,
+    ) -> str:
+        # Same charges, penalties and deposit outcome as settle_return, written straight to COPY rows.
+        created_at = _at(returned, 17)
+        charge = self.pricing.calculate(
+            car.base_daily_price, calculate_duration_days(issue_date, returned), car.year, issue_date
+        )
+        self._transaction(rental_id, TransactionType.RENTAL_CHARGE, charge, created_at, "Rental charge")
+        penalties_total = Decimal("0.00")
+        if late_days:
+            late_fee = LATE_FEE_PER_DAY * late_days
+            self._penalty(rental_id, PenaltyType.LATE_RETURN, late_fee, f"Late by {late_days} day(s)")
+            penalties_total += late_fee
+        if bad_condition:
+            self._penalty(rental_id, PenaltyType.BAD_CONDITION, BAD_CONDITION_FEE, "Bad condition reported")
+            penalties_total += BAD_CONDITION_FEE
+        if penalties_total > 0:
+            self._transaction(rental_id, TransactionType.PENALTY_CHARGE, penalties_total, created_at, "Penalties")
+
+        refund = max(Decimal("0.00"), deposit - penalties_total)
+        if refund > 0:
+            self._transaction(rental_id, TransactionType.DEPOSIT_REFUND, refund, created_at, "Deposit refund")
+        if refund == deposit:
+            return DepositStatus.REFUNDED
+        if refund == 0:
+            return DepositStatus.FORFEITED
+        return DepositStatus.PARTIAL_REFUND
+
+    def _transaction(self, rental_id: int, transaction_type: str, amount: Decimal, created_at: datetime, note: str):
+        self.transactions.append(
+            (self._take_id(PaymentTransaction), rental_id, transaction_type, amount, created_at, note)
+        )
+
+    def _penalty(self, rental_id: int, penalty_type: str, amount: Decimal, comment: str):
+        self.penalties.append((self._take_id(Penalty), rental_id, penalty_type, amount, comment))
+
+    def _flush(self) -> None:
+        _copy(RENTAL_COLUMNS, self.rentals)
+        _copy(DEPOSIT_COLUMNS, self.deposits)
+        _copy(PENALTY_COLUMNS, self.penalties)
+        _copy(TRANSACTION_COLUMNS, self.transactions)
+        self.rentals, self.deposits, self.penalties, self.transactions = [], [], [], []
+
+
+def generate_synthetic_data(config: SyntheticConfig) -> SyntheticSummary:
+    return SyntheticDataGenerator(config).generate()
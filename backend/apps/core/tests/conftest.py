@@ -2,12 +2,19 @@ import pytest
 from datetime import date, timedelta
 from decimal import Decimal
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from apps.fleet.models import Car
 from apps.rentals.models import RentalAgreement, Deposit
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+
+
 @pytest.fixture
 def customer(db):
     return User.objects.create_user(email="customer@example.com", full_name="Customer", password="pass")
@@ -0,0 +1,56 @@
+from datetime import date
+from decimal import Decimal
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from apps.accounts.tokens import ClaimsTokenObtainPairSerializer
+from apps.core.repositories.ledger import LedgerRepository
+from apps.rentals.models import PaymentTransaction, TransactionType
+
+User = get_user_model()
+
+
+def _headers(user) -> dict:
+    return {"authorization": f"Bearer {ClaimsTokenObtainPairSerializer.get_token(user).access_token}"}
+
+
+def _get(path: str, **kwargs):
+    return async_to_sync(AsyncClient().get)(path, **kwargs)
+
+
+def test_async_endpoints_match_sync_ones(db, customer, rental, deposit):
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    LedgerRepository.record(
+        [PaymentTransaction(rental=rental, transaction_type=TransactionType.DEPOSIT_HELD, amount=Decimal("200"))]
+    )
+    sync_client = APIClient()
+    sync_client.force_authenticate(user=staff)
+    paths = [
+        f"reports/occupancy/?date={date.today()}",
+        "reports/financial/?date_from=2020-01-01&date_to=2030-01-01&group_by=car_class",
+        "rentals/?page_size=1&fields=id,status",
+        "cars/?search=toyota&ordering=-year",
+    ]
+    for path in paths:
+        response = _get(f"/api/async/{path}", headers=_headers(staff))
+        assert response.status_code == 200
+        assert response.json() == sync_client.get(f"/api/{path}").json()
+
+    listing = _get("/api/async/rentals/", headers=_headers(customer)).json()
+    assert [row["id"] for row in listing["results"]] == [rental.id]
+
+    etag = _get("/api/async/cars/")["ETag"]
+    assert _get("/api/async/cars/", headers={"if-none-match": etag}).status_code == 304
+
+
+def test_async_endpoints_apply_authentication_and_permissions(db, customer):
+    unauthenticated = _get("/api/async/rentals/")
+    assert unauthenticated.status_code == 401
+    assert unauthenticated["WWW-Authenticate"].startswith("Bearer")
+    assert _get("/api/async/rentals/", headers={"authorization": "Bearer nonsense"}).status_code == 401
+    forbidden = _get(
+        "/api/async/reports/financial/?date_from=2024-01-01&date_to=2024-01-31", headers=_headers(customer)
+    )
+    assert forbidden.status_code == 403
+    assert forbidden.json() == {"detail": "You do not have permission to perform this action."}
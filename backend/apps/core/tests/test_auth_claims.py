@@ -0,0 +1,92 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from rest_framework.test import APIClient
+from apps.accounts import tokens
+from apps.accounts.models import TokenRevocation
+from apps.core.cache import LocalCache
+
+User = get_user_model()
+
+
+def _login(email: str) -> dict:
+    response = APIClient().post("/api/auth/login/", {"email": email, "password": "pass"}, format="json")
+    assert response.status_code == 200
+    return response.json()
+
+
+def _client(access: str) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+def test_role_claim_is_trusted_without_loading_the_user(db, rental):
+    User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    customer = _client(_login("customer@example.com")["access"])
+    staff = _client(_login("staff@example.com")["access"])
+
+    with CaptureQueriesContext(connection) as queries:
+        assert customer.get("/api/rentals/").json()["results"][0]["id"] == rental.id
+        assert staff.get("/api/reports/occupancy/").status_code == 200
+    assert not any('FROM "accounts_user"' in query["sql"] for query in queries.captured_queries)
+
+    assert customer.get("/api/reports/financial/?date_from=2024-01-01&date_to=2024-01-31").status_code == 403
+    assert customer.get("/api/auth/me/").json()["email"] == "customer@example.com"
+
+
+def test_role_change_and_logout_revoke_tokens(db, customer, django_capture_on_commit_callbacks):
+    tokens = _login("customer@example.com")
+    client = _client(tokens["access"])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        customer.full_name = "Renamed"
+        customer.save()
+    assert client.get("/api/auth/me/").json()["full_name"] == "Renamed"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        customer.role = "STAFF"
+        customer.save()
+    assert client.get("/api/auth/me/").status_code == 401
+    assert APIClient().post("/api/auth/refresh/", {"refresh": tokens["refresh"]}, format="json").status_code == 401
+
+    User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    staff = _client(_login("staff@example.com")["access"])
+    assert staff.post("/api/auth/logout/").status_code == 204
+    assert staff.get("/api/auth/me/").status_code == 401
+
+
+def test_login_right_after_logout_gets_a_working_token(db, customer):
+    for _ in range(3):
+        tokens = _login("customer@example.com")
+        client = _client(tokens["access"])
+        assert client.get("/api/auth/me/").status_code == 200
+        assert APIClient().post("/api/auth/refresh/", {"refresh": tokens["refresh"]}, format="json").status_code == 200
+        assert client.post("/api/auth/logout/").status_code == 204
+        assert client.get("/api/auth/me/").status_code == 401
+
+
+def test_revocation_is_stored_in_the_database(db, customer):
+    client = _client(_login("customer@example.com")["access"])
+    assert client.post("/api/auth/logout/").status_code == 204
+    assert TokenRevocation.objects.filter(user=customer).exists()
+
+    # Another worker, or this one after its entry expired or the shared cache culled everything, reads the row.
+    cache.clear()
+    tokens._revocations.delete(customer.id)
+    assert client.get("/api/auth/me/").status_code == 401
+
+
+def test_local_cache_is_bounded_and_expires(monkeypatch):
+    local = LocalCache(max_entries=2)
+    local.set("a", 1, 60)
+    local.set("b", 2, 60)
+    assert local.get("a") == 1
+    local.set("c", 3, 60)
+    assert (local.get("a"), local.get("b"), local.get("c"), len(local)) == (1, None, 3, 2)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert local.get("a") is None and len(local) == 1
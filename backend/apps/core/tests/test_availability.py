@@ -0,0 +1,59 @@
+import pytest
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from rest_framework.test import APIClient
+from apps.rentals.models import RentalAgreement
+
+User = get_user_model()
+
+
+def test_available_cars_excludes_overlapping_bookings(db, rental):
+    client = APIClient()
+    during = {"date_from": rental.issue_date + timedelta(days=1), "date_to": rental.expected_return_date}
+    after = {"date_from": rental.expected_return_date, "date_to": rental.expected_return_date + timedelta(days=2)}
+    response = client.get("/api/cars/available/", {**during, "car_class": "sedan"})
+    assert response.status_code == 200
+    assert response.json() == []
+    response = client.get("/api/cars/available/", {**after, "car_class": "sedan", "max_price": "150"})
+    assert [car["id"] for car in response.json()] == [rental.car_id]
+
+
+def test_create_rental_rejects_double_booking(db, rental):
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    response = client.post(
+        "/api/rentals/",
+        {
+            "customer": rental.customer_id,
+            "car": rental.car_id,
+            "issue_date": rental.issue_date + timedelta(days=1),
+            "expected_return_date": rental.expected_return_date + timedelta(days=1),
+            "deposit_amount": "100.00",
+        },
+    )
+    assert response.status_code == 400
+    assert "car" in response.json()
+
+
+def test_database_rejects_overlapping_active_rentals(db, rental):
+    with pytest.raises(IntegrityError):
+        RentalAgreement.objects.create(
+            customer=rental.customer,
+            car=rental.car,
+            issue_date=rental.issue_date,
+            expected_return_date=rental.expected_return_date,
+            status="ACTIVE",
+        )
+
+
+def test_update_rejects_return_date_before_issue_date(db, rental):
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    response = client.patch(f"/api/rentals/{rental.id}/", {"expected_return_date": rental.issue_date})
+    assert response.status_code == 400
+    assert "expected_return_date" in response.json()
+    response = client.patch(f"/api/rentals/{rental.id}/", {"issue_date": rental.expected_return_date})
+    assert response.status_code == 400
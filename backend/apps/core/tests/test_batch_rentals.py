@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from apps.fleet.models import Car, CarStatus
+from apps.rentals.models import Deposit, PaymentTransaction, RentalAgreement, RentalStatus
+
+User = get_user_model()
+
+
+def _staff_client():
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    return client
+
+
+def test_batch_create_reports_each_item(db, customer, car, django_assert_max_num_queries):
+    suv = Car.objects.create(
+        brand="Ford", model="Explorer", car_class="SUV", year=2021, base_daily_price=Decimal("120.00")
+    )
+    client = _staff_client()
+    start = date(2030, 1, 1)
+    booking = {
+        "customer": customer.id,
+        "issue_date": start,
+        "expected_return_date": start + timedelta(days=3),
+        "deposit_amount": "200.00",
+    }
+    payload = [
+        {**booking, "car": car.id},
+        {**booking, "car": suv.id},
+        {**booking, "car": suv.id, "issue_date": start + timedelta(days=1)},
+        {**booking, "car": car.id, "customer": 999999},
+    ]
+    with django_assert_max_num_queries(12):
+        response = client.post("/api/rentals/batch/", payload, format="json")
+    assert response.status_code == 207
+    results = response.json()
+    assert [result["status"] for result in results] == ["created", "created", "error", "error"]
+    assert "car" in results[2]["errors"]
+    assert "customer" in results[3]["errors"]
+    assert RentalAgreement.objects.filter(status=RentalStatus.ACTIVE).count() == 2
+    assert Deposit.objects.count() == 2
+    assert PaymentTransaction.objects.count() == 2
+    assert set(Car.objects.values_list("status", flat=True)) == {CarStatus.RENTED}
@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from apps.fleet.models import Car, CarStatus
+from apps.rentals.models import Deposit, DepositStatus, Penalty, RentalAgreement, RentalStatus
+from apps.rentals.services import create_rental
+
+User = get_user_model()
+
+
+def _book(customer, car, issue_date):
+    rental = RentalAgreement.objects.create(
+        customer=customer, car=car, issue_date=issue_date, expected_return_date=issue_date + timedelta(days=3)
+    )
+    create_rental(rental, Decimal("200.00"))
+    return rental
+
+
+def test_batch_return_prices_all_rentals(db, customer, car, django_assert_max_num_queries):
+    suv = Car.objects.create(
+        brand="Ford", model="Explorer", car_class="SUV", year=2021, base_daily_price=Decimal("120.00")
+    )
+    on_time = _book(customer, car, date(2024, 1, 1))
+    late = _book(customer, suv, date(2024, 1, 1))
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    payload = [
+        {"rental": on_time.id, "actual_return_date": "2024-01-04"},
+        {"rental": late.id, "actual_return_date": "2024-01-06", "bad_condition": True},
+        {"rental": 999999},
+    ]
+    with django_assert_max_num_queries(12):
+        response = client.post("/api/rentals/return-batch/", payload, format="json")
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["status"] for result in results] == ["returned", "returned", "error"]
+    assert results[0]["invoice"]["total"] == "276.00"
+    assert [item["description"] for item in results[1]["invoice"]["items"]] == [
+        "Rental charge",
+        "Late return penalty",
+        "Bad condition penalty",
+    ]
+    assert set(RentalAgreement.objects.values_list("status", flat=True)) == {RentalStatus.CLOSED}
+    assert Deposit.objects.get(rental=on_time).status == DepositStatus.REFUNDED
+    assert Deposit.objects.get(rental=late).status == DepositStatus.FORFEITED
+    assert Penalty.objects.filter(rental=late).count() == 2
+    assert set(Car.objects.values_list("status", flat=True)) == {CarStatus.AVAILABLE}
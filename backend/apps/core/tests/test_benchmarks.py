@@ -0,0 +1,40 @@
+from apps.core.benchmarks.runner import compare, run_suite
+from apps.core.benchmarks.scenarios import SCENARIOS
+from apps.rentals.models import RentalAgreement
+
+
+def test_benchmark_suite_reports_every_scenario_and_rolls_back(db):
+    report = run_suite(sizes=[20], iterations=2)
+
+    assert {row["scenario"] for row in report["results"]} == set(SCENARIOS)
+    for row in report["results"]:
+        assert row["size"] == 20
+        assert row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"]
+        assert row["peak_memory_kb"] > 0
+    queries = {row["scenario"]: row["queries"] for row in report["results"]}
+    assert queries["pricing_calculate"] == 0
+    # The report query, plus taking and releasing the rebuild lock.
+    assert queries["financial_report"] == 3
+    assert queries["financial_report_cached"] == 0
+    assert not RentalAgreement.objects.exists()
+
+
+def test_compare_flags_slower_runs_and_extra_queries():
+    baseline = {
+        "results": [
+            {
+                "scenario": "rental_list",
+                "size": 100,
+                "p50_ms": 10.0,
+                "p95_ms": 12.0,
+                "p99_ms": 15.0,
+                "peak_memory_kb": 100.0,
+                "queries": 3,
+            }
+        ]
+    }
+    current = {"results": [{**baseline["results"][0], "p95_ms": 13.0, "p99_ms": 30.0, "queries": 4}]}
+
+    regressions = compare(current, baseline, tolerance=0.2)
+
+    assert {regression.metric for regression in regressions} == {"p99_ms", "queries"}
@@ -0,0 +1,41 @@
+from decimal import Decimal
+from rest_framework.test import APIClient
+from apps.core.repositories.cars import CarRepository
+from apps.fleet.models import Car
+
+
+def test_catalogue_is_cached_and_revalidated_with_etag(
+    db, car, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    client = APIClient()
+    first = client.get("/api/cars/")
+    assert first.status_code == 200
+    etag, last_modified = first["ETag"], first["Last-Modified"]
+
+    with django_assert_num_queries(0):
+        assert client.get("/api/cars/").json() == first.json()
+        assert client.get("/api/cars/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert client.get("/api/cars/", HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+    assert client.get("/api/cars/?search=Toyota")["ETag"] != etag
+
+    with django_capture_on_commit_callbacks(execute=True):
+        CarRepository.set_status(car, "MAINTENANCE")
+    changed = client.get("/api/cars/", HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed.json()[0]["status"] == "MAINTENANCE"
+
+
+def test_bulk_status_updates_invalidate_catalogue(db, car, django_capture_on_commit_callbacks):
+    client = APIClient()
+    etag = client.get(f"/api/cars/{car.id}/")["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        CarRepository.set_status_many([car.id], "RENTED")
+
+    response = client.get(f"/api/cars/{car.id}/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["status"] == "RENTED"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Car.objects.create(brand="Ford", model="Focus", car_class="Compact", year=2022, base_daily_price=Decimal("60"))
+    assert len(client.get("/api/cars/").json()) == 2
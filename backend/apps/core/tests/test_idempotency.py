@@ -0,0 +1,113 @@
+import threading
+import time
+from datetime import date, timedelta
+from io import StringIO
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models.signals import post_save
+from rest_framework.test import APIClient
+from apps.core.models import IdempotencyKey
+from apps.rentals.models import PaymentTransaction, RentalAgreement
+
+User = get_user_model()
+
+
+@pytest.fixture
+def staff(db):
+    return User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+
+
+def _client(user) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def _payload(customer, car) -> dict:
+    return {
+        "customer": customer.id,
+        "car": car.id,
+        "issue_date": date.today(),
+        "expected_return_date": date.today() + timedelta(days=2),
+        "deposit_amount": "100.00",
+    }
+
+
+def test_retries_replay_the_first_response(staff, customer, car):
+    client = _client(staff)
+    first = client.post("/api/rentals/", _payload(customer, car), HTTP_IDEMPOTENCY_KEY="create-1")
+    retry = client.post("/api/rentals/", _payload(customer, car), HTTP_IDEMPOTENCY_KEY="create-1")
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert retry.json() == first.json() and retry["Idempotent-Replayed"] == "true"
+    assert RentalAgreement.objects.count() == 1
+
+    rental_id = first.json()["id"]
+    returned = client.post(f"/api/rentals/{rental_id}/return/", {}, HTTP_IDEMPOTENCY_KEY="return-1")
+    retry = client.post(f"/api/rentals/{rental_id}/return/", {}, HTTP_IDEMPOTENCY_KEY="return-1")
+    assert (returned.status_code, retry.status_code) == (200, 200) and retry.json() == returned.json()
+    assert PaymentTransaction.objects.filter(rental_id=rental_id, transaction_type="RENTAL_CHARGE").count() == 1
+
+    reused = client.post(f"/api/rentals/{rental_id}/return/", {"bad_condition": True}, HTTP_IDEMPOTENCY_KEY="return-1")
+    assert reused.status_code == 422
+
+
+def test_failed_requests_and_expired_keys_run_again(staff, customer, car, settings):
+    client = _client(staff)
+    payload = {**_payload(customer, car), "car": car.id + 1}
+    assert client.post("/api/rentals/", payload, HTTP_IDEMPOTENCY_KEY="k").status_code == 400
+    assert not IdempotencyKey.objects.exists()
+
+    settings.IDEMPOTENCY_KEY_TTL = 0
+    assert client.post("/api/rentals/", _payload(customer, car), HTTP_IDEMPOTENCY_KEY="k").status_code == 201
+    out = StringIO()
+    call_command("purge_idempotency_keys", stdout=out)
+    assert "Deleted 1 expired" in out.getvalue() and not IdempotencyKey.objects.exists()
+
+
+def _waiting_on_lock() -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock'")
+        return cursor.fetchone()[0] > 0
+
+
+def test_concurrent_duplicate_waits_for_the_request_in_flight(transactional_db, customer, car):
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    held, release = threading.Event(), threading.Event()
+    responses = {}
+
+    def hold(sender, **kwargs):
+        # The first request stops after claiming the key and inserting its rental, before committing either.
+        if threading.current_thread().name == "first":
+            held.set()
+            release.wait(10)
+
+    def post():
+        try:
+            client = _client(staff)
+            responses[threading.current_thread().name] = client.post(
+                "/api/rentals/", _payload(customer, car), HTTP_IDEMPOTENCY_KEY="k"
+            )
+        finally:
+            connections.close_all()
+
+    post_save.connect(hold, sender=RentalAgreement, dispatch_uid="hold_first")
+    threads = [threading.Thread(target=post, name=name) for name in ("first", "second")]
+    try:
+        threads[0].start()
+        assert held.wait(10)
+        threads[1].start()
+        deadline = time.monotonic() + 10
+        while not _waiting_on_lock() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _waiting_on_lock() and not responses
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join(10)
+        post_save.disconnect(sender=RentalAgreement, dispatch_uid="hold_first")
+
+    assert responses["first"].status_code == responses["second"].status_code == 201
+    assert responses["second"].json() == responses["first"].json()
+    assert RentalAgreement.objects.count() == 1
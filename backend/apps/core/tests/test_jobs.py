@@ -0,0 +1,86 @@
+import threading
+from datetime import timedelta
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.core.models import Job, JobStatus
+from apps.core.repositories.jobs import JobRepository
+from apps.core.services.jobs import enqueue, register_job, run_pending
+
+calls = []
+
+
+@register_job("tests.flaky", max_attempts=2)
+def flaky(fail: bool) -> None:
+    calls.append(fail)
+    if fail:
+        raise RuntimeError("boom")
+
+
+@register_job("tests.record")
+def record(value: str) -> None:
+    calls.append(value)
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def test_jobs_commit_with_the_enqueuing_transaction_and_the_worker_runs_them(db):
+    with transaction.atomic():
+        enqueue("tests.record", {"value": "kept"})
+    with pytest.raises(RuntimeError), transaction.atomic():
+        enqueue("tests.record", {"value": "rolled back"})
+        raise RuntimeError("abort")
+    job = Job.objects.get()
+    assert (job.name, job.payload, job.status) == ("tests.record", {"value": "kept"}, JobStatus.PENDING)
+    assert not calls
+
+    call_command("run_jobs", "--burst")
+    assert not Job.objects.exists()
+    assert calls == ["kept"]
+
+
+def test_failed_jobs_back_off_then_fail_permanently(db):
+    job = enqueue("tests.flaky", {"fail": True})
+    assert run_pending("worker", 10) == (0, 1)
+    job.refresh_from_db()
+    assert job.status == JobStatus.PENDING and job.attempts == 1 and "boom" in job.last_error
+    assert job.run_at > timezone.now()
+    assert run_pending("worker", 10) == (0, 0)
+
+    Job.objects.filter(id=job.id).update(run_at=timezone.now())
+    assert run_pending("worker", 10) == (0, 1)
+    job.refresh_from_db()
+    assert job.status == JobStatus.FAILED and job.attempts == 2
+    assert calls == [True, True]
+
+    with pytest.raises(ValueError):
+        enqueue("tests.missing", {})
+
+
+def test_concurrent_claims_skip_locked_jobs(transactional_db):
+    first, second = (enqueue("tests.flaky", {"fail": False}) for _ in range(2))
+    locked, release = threading.Event(), threading.Event()
+
+    def hold_first():
+        with transaction.atomic():
+            Job.objects.select_for_update().get(id=first.id)
+            locked.set()
+            release.wait(5)
+        connection.close()
+
+    holder = threading.Thread(target=hold_first)
+    holder.start()
+    locked.wait(5)
+    try:
+        claimed = JobRepository.claim("worker", 10, timezone.now() - timedelta(minutes=10))
+    finally:
+        release.set()
+        holder.join()
+    assert [job.id for job in claimed] == [second.id]
+
+    stale = timezone.now() + timedelta(seconds=1)
+    assert [job.id for job in JobRepository.claim("other", 10, stale)] == [first.id, second.id]
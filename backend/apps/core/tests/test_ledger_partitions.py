@@ -0,0 +1,55 @@
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from apps.core.repositories.ledger import LedgerRepository
+from apps.rentals.models import PaymentTransaction, TransactionType
+from apps.rentals.services import return_rental
+
+
+def _rows(table: str) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
+
+
+def test_ledger_rows_land_in_monthly_partitions(db, rental, deposit):
+    return_rental(rental, rental.expected_return_date, bad_condition=False)
+    this_month = timezone.now().date().replace(day=1)
+    assert _rows(LedgerRepository.partitions()[this_month]) == PaymentTransaction.objects.count() > 0
+
+    # A backdated entry has no partition for its month yet, so it waits in the default partition.
+    stray = PaymentTransaction.objects.create(rental=rental, transaction_type=TransactionType.RENTAL_CHARGE, amount=1)
+    PaymentTransaction.objects.filter(pk=stray.pk).update(created_at=datetime(2020, 3, 15, tzinfo=dt_timezone.utc))
+    assert _rows(LedgerRepository.default_partition()) == 1
+
+    out = StringIO()
+    call_command("ledger_partitions", stdout=out)
+    assert "Created rentals_paymenttransaction_p202003" in out.getvalue()
+    assert _rows(LedgerRepository.default_partition()) == 0
+    assert _rows("rentals_paymenttransaction_p202003") == 1
+
+    march = PaymentTransaction.objects.filter(
+        created_at__gte=datetime(2020, 3, 1, tzinfo=dt_timezone.utc),
+        created_at__lt=datetime(2020, 4, 1, tzinfo=dt_timezone.utc),
+    )
+    plan = march.explain()
+    assert "rentals_paymenttransaction_p202003" in plan
+    assert LedgerRepository.partition_name(this_month) not in plan and "_default" not in plan
+    assert march.get().amount == Decimal("1.00")
+
+
+def test_detached_months_leave_the_ledger(db, rental, deposit):
+    LedgerRepository.create_partitions(date(2020, 1, 1), date(2020, 2, 1))
+    old = PaymentTransaction.objects.create(rental=rental, transaction_type=TransactionType.RENTAL_CHARGE, amount=5)
+    PaymentTransaction.objects.filter(pk=old.pk).update(created_at=datetime(2020, 1, 10, tzinfo=dt_timezone.utc))
+    current = PaymentTransaction.objects.create(rental=rental, transaction_type=TransactionType.RENTAL_CHARGE, amount=7)
+
+    out = StringIO()
+    call_command("ledger_partitions", "--detach-before", "2020-02-01", stdout=out)
+    assert "Detached rentals_paymenttransaction_p202001" in out.getvalue()
+    assert "rentals_paymenttransaction_p202002" not in out.getvalue()
+    assert list(PaymentTransaction.objects.values_list("pk", flat=True)) == [current.pk]
+    assert _rows("rentals_paymenttransaction_p202001") == 1
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from django.db import connection
+from apps.core.metrics import registry
+from apps.core.middleware import QueryCollector
+from apps.fleet.models import Car
+from apps.rentals.models import RentalAgreement
+
+User = get_user_model()
+
+
+def test_metrics_record_views_and_queries(db, customer):
+    registry.reset()
+    for index in range(12):
+        car = Car.objects.create(
+            brand="Toyota", model="Corolla", car_class="Sedan", year=2020, base_daily_price=Decimal("100.00")
+        )
+        RentalAgreement.objects.create(
+            customer=customer,
+            car=car,
+            issue_date=date(2024, 1, 1) + timedelta(days=index),
+            expected_return_date=date(2024, 1, 3) + timedelta(days=index),
+            status="CLOSED",
+        )
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+
+    assert client.get("/api/rentals/").status_code == 200
+    response = client.get("/api/metrics/")
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = response.content.decode()
+    labels = 'view="RentalViewSet",action="list",method="GET",status="200"'
+    assert f"http_request_duration_seconds_count{{{labels}}} 1" in text
+    assert f'http_request_queries_bucket{{{labels},le="1"}} 1' in text
+    assert "http_response_size_bytes_bucket{" in text
+
+
+def test_metrics_endpoint_is_staff_only(db, customer):
+    client = APIClient()
+    client.force_authenticate(user=customer)
+    assert client.get("/api/metrics/").status_code == 403
+
+
+def test_query_collector_flags_repeated_sql_shapes(db, car):
+    collector = QueryCollector()
+    with connection.execute_wrapper(collector):
+        for _ in range(10):
+            Car.objects.get(id=car.id)
+        list(Car.objects.filter(id__in=[1, 2]))
+        list(Car.objects.filter(id__in=[1, 2, 3]))
+
+    assert collector.count == 12
+    shape, count = collector.repeated_shape(threshold=10)
+    assert count == 10 and "WHERE" in shape
+    assert collector.repeated_shape(threshold=11) is None
@@ -0,0 +1,52 @@
+import json
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+def _get_timeline(user, date_from, date_to, group_by="car"):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.get(
+        "/api/reports/occupancy/timeline/",
+        {"date_from": date_from.isoformat(), "date_to": date_to.isoformat(), "group_by": group_by},
+    )
+    assert response.status_code == 200
+    assert response.streaming
+    return json.loads(b"".join(response.streaming_content))
+
+
+def test_occupancy_timeline_per_car(db, customer, rental):
+    start = rental.issue_date - timedelta(days=1)
+    data = _get_timeline(customer, start, start + timedelta(days=6))
+    assert data == [
+        {
+            "car_id": rental.car_id,
+            "car": str(rental.car),
+            "car_class": "Sedan",
+            "occupied": [
+                {
+                    "from": rental.issue_date.isoformat(),
+                    "to": (rental.expected_return_date - timedelta(days=1)).isoformat(),
+                }
+            ],
+            "occupied_days": 3,
+            "utilisation": 42.86,
+        }
+    ]
+
+
+def test_occupancy_timeline_per_car_class(db, customer, rental):
+    start = rental.issue_date - timedelta(days=1)
+    data = _get_timeline(customer, start, start + timedelta(days=4), group_by="car_class")
+    assert data == [
+        {
+            "car_class": "Sedan",
+            "cars": 1,
+            "daily_occupied": [0, 1, 1, 1, 0],
+            "occupied_car_days": 3,
+            "utilisation": 60.0,
+        }
+    ]
@@ -0,0 +1,96 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.db import transaction
+from django.db.models import F
+from rest_framework.test import APIClient
+from apps.core.exceptions import ConcurrentUpdate
+from apps.core.services.concurrency import CONFLICT_ATTEMPTS
+from apps.core.services.state import get_state
+from apps.fleet.models import Car, CarStatus
+from apps.rentals.models import PaymentTransaction, RentalAgreement, RentalStatus, TransactionType
+from apps.rentals.signals import rental_returned
+
+User = get_user_model()
+
+
+class CompetingWriter:
+    # Another writer updates the rental while a return is in flight; its update rolls back with the failed attempt.
+    def __init__(self, conflicts: int):
+        self.conflicts = conflicts
+        self.calls = 0
+
+    def __call__(self, sender, rental, **kwargs):
+        self.calls += 1
+        if self.calls <= self.conflicts:
+            RentalAgreement.objects.filter(pk=rental.pk).update(version=F("version") + 1)
+
+
+@pytest.fixture
+def competing_writer():
+    def connect(conflicts: int) -> CompetingWriter:
+        writer = CompetingWriter(conflicts)
+        rental_returned.connect(writer, weak=False, dispatch_uid="competing_writer")
+        return writer
+
+    yield connect
+    rental_returned.disconnect(dispatch_uid="competing_writer")
+
+
+@pytest.fixture
+def staff_client():
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create_user(email="s@example.com", full_name="S", password="p", role="STAFF")
+    )
+    return client
+
+
+def test_stale_transition_raises_instead_of_overwriting(rental):
+    stale = RentalAgreement.objects.get(pk=rental.pk)
+    get_state(rental).return_car(rental)
+    assert rental.version == 2
+
+    # Like an IntegrityError, a lost compare-and-swap breaks the atomic block it happens in.
+    with pytest.raises(ConcurrentUpdate), transaction.atomic():
+        get_state(stale).return_car(stale)
+    car, other = Car.objects.get(pk=rental.car_id), Car.objects.get(pk=rental.car_id)
+    other.save()
+    car.status = CarStatus.MAINTENANCE
+    with pytest.raises(ConcurrentUpdate), transaction.atomic():
+        car.save(update_fields=["status"])
+    assert Car.objects.get(pk=car.pk).status == CarStatus.AVAILABLE
+
+
+def test_return_retries_a_lost_race_and_charges_once(rental, deposit, competing_writer, staff_client):
+    writer = competing_writer(conflicts=1)
+    response = staff_client.post(f"/api/rentals/{rental.id}/return/", {})
+    assert response.status_code == 200 and writer.calls == 2
+    rental.refresh_from_db()
+    assert (rental.status, rental.version) == (RentalStatus.CLOSED, 2)
+    charges = PaymentTransaction.objects.filter(rental=rental, transaction_type=TransactionType.RENTAL_CHARGE)
+    assert charges.count() == 1
+
+    response = staff_client.post(f"/api/rentals/{rental.id}/return/", {})
+    assert response.status_code == 409 and response.json()["detail"] == "Cannot return a closed rental"
+
+
+def test_return_that_keeps_losing_is_a_409(rental, deposit, competing_writer, staff_client):
+    writer = competing_writer(conflicts=CONFLICT_ATTEMPTS)
+    response = staff_client.post(f"/api/rentals/{rental.id}/return/", {})
+    assert response.status_code == 409 and writer.calls == CONFLICT_ATTEMPTS
+    rental.refresh_from_db()
+    assert (rental.status, rental.version) == (RentalStatus.ACTIVE, 1)
+    assert not PaymentTransaction.objects.filter(rental=rental, transaction_type=TransactionType.RENTAL_CHARGE).exists()
+
+
+def test_new_instances_with_an_explicit_pk_are_saved_without_a_version_check(car):
+    data = serializers.serialize("json", [car])
+    Car.objects.filter(pk=car.pk).delete()
+    Car(**{field.attname: getattr(car, field.attname) for field in Car._meta.concrete_fields}).save()
+    assert Car.objects.filter(pk=car.pk).exists()
+
+    Car.objects.filter(pk=car.pk).update(version=F("version") + 5)
+    for loaded in serializers.deserialize("json", data):
+        loaded.save()
+    assert Car.objects.get(pk=car.pk).version == 1
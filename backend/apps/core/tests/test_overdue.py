@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from apps.fleet.models import Car
+from apps.rentals.models import Penalty, PenaltyType, RentalAgreement
+from apps.rentals.services import accrue_overdue, return_rental
+
+User = get_user_model()
+
+
+def test_overdue_accrual_is_idempotent_and_replaced_on_return(db, rental, deposit):
+    as_of = rental.expected_return_date + timedelta(days=2)
+    first = accrue_overdue(as_of)
+    assert (first.overdue, first.exposure, first.accrued, first.flagged) == (1, Decimal("100.00"), 1, 1)
+    again = accrue_overdue(as_of)
+    assert (again.overdue, again.accrued, again.flagged, again.cleared, again.released) == (1, 0, 0, 0, 0)
+
+    later = accrue_overdue(as_of + timedelta(days=1))
+    assert (later.accrued, later.flagged) == (1, 0)
+    penalty = Penalty.objects.get()
+    assert (penalty.is_provisional, penalty.amount, penalty.accrued_on) == (
+        True,
+        Decimal("150.00"),
+        as_of + timedelta(days=1),
+    )
+
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    report = client.get("/api/reports/overdue/").json()
+    assert report["accrued_total"] == "150.00"
+    assert report["rentals"][0]["days_late"] == 3
+    assert [row["id"] for row in client.get("/api/rentals/?overdue=true").json()["results"]] == [rental.id]
+    assert client.get("/api/rentals/?overdue=false").json()["results"] == []
+
+    rental.refresh_from_db()
+    return_rental(rental, as_of, bad_condition=False)
+    rental.refresh_from_db()
+    assert not rental.is_overdue
+    assert list(Penalty.objects.values_list("type", "amount", "is_provisional")) == [
+        (PenaltyType.LATE_RETURN, Decimal("100.00"), False)
+    ]
+    assert accrue_overdue(as_of).overdue == 0
+    assert Penalty.objects.count() == 1
+
+
+def test_extended_rentals_are_released_by_the_command(db, rental, capsys):
+    as_of = rental.expected_return_date + timedelta(days=1)
+    accrue_overdue(as_of)
+    # Flagging bumped the version, so the extension is made on a fresh read.
+    rental.refresh_from_db()
+    rental.expected_return_date = as_of + timedelta(days=5)
+    rental.save(update_fields=["expected_return_date"])
+
+    call_command("accrue_overdue", "--date", as_of.isoformat())
+    assert "0 overdue rental(s), 0.00 accrued: 0 fee(s) written, 0 flagged, 1 unflagged, 1 provisional" in (
+        capsys.readouterr().out
+    )
+    rental.refresh_from_db()
+    assert not rental.is_overdue and not Penalty.objects.exists()
+
+
+def test_overdue_report_pages_by_due_date_with_one_total(db, customer, django_assert_num_queries):
+    rentals = []
+    for index in range(5):
+        car = Car.objects.create(
+            brand="Ford", model="Fiesta", car_class="Compact", year=2021, base_daily_price=Decimal("50.00")
+        )
+        rentals.append(
+            RentalAgreement.objects.create(
+                customer=customer,
+                car=car,
+                issue_date=date(2024, 1, 1),
+                # Pairs share a due date so pages have to break ties on the rental id.
+                expected_return_date=date(2024, 1, 3) + timedelta(days=index // 2),
+                status="ACTIVE",
+            )
+        )
+    accrue_overdue(date(2024, 1, 10))
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+
+    seen, url = [], "/api/reports/overdue/?page_size=2"
+    while url:
+        # The page, then the total and count in one aggregate.
+        with django_assert_num_queries(2):
+            report = client.get(url).json()
+        assert (report["accrued_total"], report["rentals_count"]) == ("1550.00", 5)
+        seen += [row["rental_id"] for row in report["rentals"]]
+        url = report["next"]
+    assert seen == [rental.id for rental in rentals]
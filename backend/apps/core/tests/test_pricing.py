@@ -1,9 +1,57 @@
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
+from rest_framework.test import APIClient
 from apps.core.services.factory import PricingStrategyFactory
+from apps.rentals.models import Deposit, PaymentTransaction, TransactionType
+from apps.rentals.services import return_rental
 
 
 def test_pricing_calculation():
     pricing = PricingStrategyFactory.build()
     amount = pricing.calculate(Decimal("100.00"), 5, 2022, date(2024, 1, 1))
     assert amount > Decimal("0.00")
+
+
+def test_pricing_engine_matches_composite_strategy():
+    pricing = PricingStrategyFactory.build()
+    engine = PricingStrategyFactory.engine()
+    for days in (1, 6, 7, 13, 14, 30):
+        for car_year in (2010, 2019, 2024, 2026):
+            issue_date = date(2024, 3, 15)
+            expected = pricing.calculate(Decimal("80.00"), days, car_year, issue_date)
+            assert engine.calculate(Decimal("80.00"), days, car_year, issue_date) == expected
+
+
+def test_quote_endpoint(car):
+    client = APIClient()
+    response = client.post(
+        "/api/cars/quote/",
+        [
+            {"car": car.id, "issue_date": "2024-01-01", "days": 7},
+            {"car": car.id, "issue_date": "2024-01-01", "days": 1},
+        ],
+        format="json",
+    )
+    assert response.status_code == 200
+    assert [quote["amount"] for quote in response.json()] == ["611.80", "92.00"]
+    response = client.post(
+        "/api/cars/quote/", [{"car": car.id + 1, "issue_date": "2024-01-01", "days": 1}], format="json"
+    )
+    assert response.status_code == 400
+
+
+def test_quote_matches_the_stored_charge_on_a_half_cent(car, rental):
+    # 10 days at 10.25 price to 89.585, which half-even rounding would quote as 89.58.
+    car.base_daily_price = Decimal("10.25")
+    car.save(update_fields=["base_daily_price"])
+    rental.issue_date = date(2024, 1, 1)
+    rental.expected_return_date = rental.issue_date + timedelta(days=10)
+    rental.save(update_fields=["issue_date", "expected_return_date"])
+    Deposit.objects.create(rental=rental, amount=Decimal("200.00"))
+
+    response = APIClient().post(
+        "/api/cars/quote/", [{"car": car.id, "issue_date": "2024-01-01", "days": 10}], format="json"
+    )
+    return_rental(rental, rental.expected_return_date, bad_condition=False)
+    charge = PaymentTransaction.objects.get(rental=rental, transaction_type=TransactionType.RENTAL_CHARGE)
+    assert response.json()[0]["amount"] == str(charge.amount) == "89.59"
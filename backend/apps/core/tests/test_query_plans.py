@@ -0,0 +1,20 @@
+import inspect
+from apps.core.benchmarks.dataset import build_dataset
+from apps.core.benchmarks.plans import PLAN_CHECKS, check_plans
+from apps.core.repositories.cars import CarRepository
+from apps.core.repositories.rentals import RentalRepository
+from apps.core.repositories.reports import ReportRepository
+
+
+def test_every_repository_query_has_a_plan_check():
+    methods = {
+        f"{repository.__name__}.{name}"
+        for repository in (CarRepository, RentalRepository, ReportRepository)
+        for name, _ in inspect.getmembers(repository, inspect.isfunction)
+    }
+    assert methods == {check.name for check in PLAN_CHECKS}
+
+
+def test_repository_queries_use_indexes(db):
+    dataset = build_dataset(300)
+    assert check_plans(dataset) == []
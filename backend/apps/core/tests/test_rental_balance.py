@@ -0,0 +1,60 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.rentals.models import RentalBalance
+from apps.rentals.services import create_rental, return_rental
+
+User = get_user_model()
+
+
+def test_balance_follows_every_ledger_write(rental):
+    create_rental(rental, Decimal("200.00"))
+    balance = RentalBalance.objects.get(rental=rental)
+    assert (balance.deposit_held, balance.deposit_outstanding) == (Decimal("200.00"), Decimal("200.00"))
+
+    invoice = return_rental(rental, rental.expected_return_date + timedelta(days=1), bad_condition=False)
+    balance.refresh_from_db()
+    assert (balance.rental_charged, balance.penalties_total) == (invoice.total - Decimal("50.00"), Decimal("50.00"))
+    assert (balance.deposit_refunded, balance.deposit_outstanding) == (Decimal("150.00"), Decimal("0.00"))
+
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get("/api/rentals/", {"fields": "id,balance"})
+    assert len(captured) == 1
+    assert response.json()["results"] == [
+        {
+            "id": rental.id,
+            "balance": {
+                "rental_charged": str(balance.rental_charged),
+                "penalties_total": "50.00",
+                "deposit_held": "200.00",
+                "deposit_refunded": "150.00",
+                "deposit_outstanding": "0.00",
+            },
+        }
+    ]
+
+
+def test_verify_command_repairs_drift(rental):
+    create_rental(rental, Decimal("200.00"))
+    RentalBalance.objects.filter(rental=rental).update(deposit_held=Decimal("1.00"))
+    # Without --repair the drift is only reported.
+    with pytest.raises(CommandError, match=f"1 rental balance\\(s\\) drifted from the ledger: {rental.id}"):
+        call_command("verify_rental_balances", stdout=StringIO())
+
+    out = StringIO()
+    call_command("verify_rental_balances", "--repair", stdout=out)
+    assert "Rebuilt 1 rental balance(s)" in out.getvalue()
+    assert RentalBalance.objects.get(rental=rental).deposit_held == Decimal("200.00")
+
+    out = StringIO()
+    call_command("verify_rental_balances", stdout=out)
+    assert "All rental balances match the ledger" in out.getvalue()
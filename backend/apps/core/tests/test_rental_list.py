@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from apps.fleet.models import Car
+from apps.rentals.models import RentalAgreement
+
+User = get_user_model()
+
+
+def _staff_client():
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    return client
+
+
+def _rentals(customer, count):
+    rentals = []
+    for index in range(count):
+        car = Car.objects.create(
+            brand="Ford", model="Fiesta", car_class="Compact", year=2021, base_daily_price=Decimal("50.00")
+        )
+        # Pairs share an issue date so pages have to break ties on id.
+        issue_date = date(2024, 1, 1) + timedelta(days=index // 2)
+        rentals.append(
+            RentalAgreement.objects.create(
+                customer=customer,
+                car=car,
+                issue_date=issue_date,
+                expected_return_date=issue_date + timedelta(days=2),
+                status="CLOSED" if index % 3 else "ACTIVE",
+            )
+        )
+    return rentals
+
+
+def test_rental_list_pages_by_issue_date_and_id_in_constant_queries(db, customer, django_assert_num_queries):
+    rentals = _rentals(customer, 7)
+    client = _staff_client()
+    expected = [rental.id for rental in sorted(rentals, key=lambda r: (r.issue_date, r.id), reverse=True)]
+
+    seen, pages, url = [], [], "/api/rentals/?page_size=3"
+    while url:
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.data)
+        seen += [row["id"] for row in response.data["results"]]
+        url = response.data["next"]
+
+    assert seen == expected
+    assert [len(page["results"]) for page in pages] == [3, 3, 1]
+    assert pages[0]["results"][0]["customer_email"] == customer.email
+    assert pages[0]["previous"] is None
+    previous = client.get(pages[2]["previous"]).data
+    assert [row["id"] for row in previous["results"]] == expected[3:6]
+
+
+def test_rental_list_filters_and_sparse_fields(db, customer):
+    rentals = _rentals(customer, 6)
+    client = _staff_client()
+
+    response = client.get("/api/rentals/?status=ACTIVE&date_from=2024-01-02&fields=id,status")
+
+    assert response.status_code == 200
+    active = [r.id for r in rentals if r.status == "ACTIVE" and r.issue_date >= date(2024, 1, 2)]
+    assert [row["id"] for row in response.data["results"]] == sorted(active, reverse=True)
+    assert set(response.data["results"][0]) == {"id", "status"}
+    assert client.get("/api/rentals/?fields=id,secret").status_code == 400
+    assert client.get("/api/rentals/?cursor=garbage").status_code == 404
+
+
+def test_rental_count_applies_list_filters(db, customer):
+    rentals = _rentals(customer, 6)
+    client = _staff_client()
+
+    response = client.get("/api/rentals/count/", {"status": "ACTIVE"})
+    assert response.status_code == 200
+    assert response.data == {"count": sum(r.status == "ACTIVE" for r in rentals)}
+    assert client.get("/api/rentals/count/").data == {"count": 6}
+    assert client.get("/api/rentals/count/", {"status": "LOST"}).status_code == 400
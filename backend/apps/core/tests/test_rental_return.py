@@ -1,7 +1,16 @@
-from datetime import date, timedelta
+from collections import Counter
+from datetime import timedelta
 from decimal import Decimal
-from apps.rentals.services import return_rental
-from apps.rentals.models import DepositStatus
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.fleet.models import CarStatus
+from apps.rentals.services import RETURN_RENTAL_QUERY_BUDGET, accrue_overdue, return_rental
+from apps.rentals.models import DepositStatus, Penalty, PaymentTransaction, RentalAgreement, RentalStatus
+
+
+def _statements(captured) -> list[str]:
+    # Savepoints come from the test's own transaction, not from the return.
+    return [query["sql"] for query in captured if not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))]
 
 
 def test_return_rental_applies_penalties(rental, deposit):
@@ -11,3 +20,30 @@ def test_return_rental_applies_penalties(rental, deposit):
     deposit.refresh_from_db()
     assert invoice.total > Decimal("0.00")
     assert deposit.status in {DepositStatus.PARTIAL_REFUND, DepositStatus.FORFEITED, DepositStatus.REFUNDED}
+
+
+def test_return_rental_stays_within_its_query_budget(rental, deposit):
+    rental = RentalAgreement.objects.get(pk=rental.pk)
+    with CaptureQueriesContext(connection) as captured:
+        return_rental(rental, rental.expected_return_date + timedelta(days=2), bad_condition=True)
+    statements = _statements(captured)
+    assert len(statements) == RETURN_RENTAL_QUERY_BUDGET
+    updates = Counter(sql.split('"')[1] for sql in statements if sql.startswith("UPDATE"))
+    assert updates == {"rentals_rentalagreement": 1, "rentals_deposit": 1, "fleet_car": 1}
+
+    rental.refresh_from_db()
+    assert (rental.status, rental.car.status) == (RentalStatus.CLOSED, CarStatus.AVAILABLE)
+    assert Penalty.objects.filter(rental=rental).count() == 2
+    # The two penalties use up the whole deposit: a rental charge and a penalty charge, no refund.
+    assert PaymentTransaction.objects.filter(rental=rental).count() == 2
+    assert rental.deposit.status == DepositStatus.FORFEITED
+
+
+def test_overdue_return_adds_only_the_provisional_fee_delete(rental, deposit):
+    accrue_overdue(rental.expected_return_date + timedelta(days=1))
+    rental = RentalAgreement.objects.get(pk=rental.pk)
+    with CaptureQueriesContext(connection) as captured:
+        return_rental(rental, rental.expected_return_date + timedelta(days=1), bad_condition=False)
+    assert len(_statements(captured)) == RETURN_RENTAL_QUERY_BUDGET + 1
+    assert not Penalty.objects.filter(rental=rental, is_provisional=True).exists()
+    assert not RentalAgreement.objects.get(pk=rental.pk).is_overdue
@@ -0,0 +1,83 @@
+import pytest
+from datetime import date, timedelta
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.accounts.tokens import ClaimsTokenObtainPairSerializer
+from apps.core.cache import CATALOGUE, bump_version
+from apps.core.db import pin_to_primary
+
+User = get_user_model()
+
+
+@pytest.fixture
+def replica(settings, transactional_db):
+    # A second connection to the test database: like a real replica it only sees committed rows.
+    alias = "replica_test"
+    connections.settings[alias] = {**connection.settings_dict, "TEST": {"MIRROR": "default"}}
+    settings.REPLICA_DATABASES = [alias]
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+
+def _queries(alias: str, request) -> tuple[object, int, int]:
+    with CaptureQueriesContext(connection) as primary, CaptureQueriesContext(connections[alias]) as replica:
+        response = request()
+    return response, len(primary), len(replica)
+
+
+def test_reads_go_to_the_replica_except_right_after_own_writes(replica, customer, car):
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    staff_client, customer_client = APIClient(), APIClient()
+    staff_client.force_authenticate(user=staff)
+    customer_client.force_authenticate(user=customer)
+
+    response, primary, replica_queries = _queries(replica, lambda: staff_client.get("/api/rentals/"))
+    assert response.status_code == 200 and (primary, replica_queries > 0) == (0, True)
+
+    payload = {
+        "customer": customer.id,
+        "car": car.id,
+        "issue_date": date.today(),
+        "expected_return_date": date.today() + timedelta(days=2),
+        "deposit_amount": "100.00",
+    }
+    response, primary, replica_queries = _queries(replica, lambda: staff_client.post("/api/rentals/", payload))
+    assert response.status_code == 201 and replica_queries == 0
+    rental_id = response.json()["id"]
+
+    # The writer reads its rental back from the primary; other users keep using the replica.
+    response, primary, replica_queries = _queries(replica, lambda: staff_client.get(f"/api/rentals/{rental_id}/"))
+    assert response.status_code == 200 and replica_queries == 0
+    response, primary, replica_queries = _queries(replica, lambda: customer_client.get("/api/rentals/"))
+    assert [row["id"] for row in response.json()["results"]] == [rental_id] and replica_queries > 0
+
+
+def test_cached_reads_stay_on_the_primary_right_after_a_version_bump(replica, settings, car):
+    bump_version(CATALOGUE)
+    response, primary, replica_queries = _queries(replica, lambda: APIClient().get("/api/cars/"))
+    assert response.status_code == 200 and replica_queries == 0
+
+    settings.REPLICA_STICKY_SECONDS = 0
+    bump_version(CATALOGUE)
+    response, primary, replica_queries = _queries(replica, lambda: APIClient().get("/api/cars/"))
+    assert [row["id"] for row in response.json()] == [car.id] and replica_queries > 0
+
+
+def test_async_reads_go_to_the_replica_unless_pinned(replica, customer, rental):
+    headers = {"authorization": f"Bearer {ClaimsTokenObtainPairSerializer.get_token(customer).access_token}"}
+
+    def request():
+        return async_to_sync(AsyncClient().get)("/api/async/rentals/", headers=headers)
+
+    response, primary, replica_queries = _queries(replica, request)
+    assert [row["id"] for row in response.json()["results"]] == [rental.id] and replica_queries > 0
+
+    pin_to_primary(customer.id)
+    response, primary, replica_queries = _queries(replica, request)
+    assert response.status_code == 200 and replica_queries == 0
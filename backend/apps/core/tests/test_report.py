@@ -1,6 +1,13 @@
-from datetime import date
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
+from apps.core.repositories.ledger import LedgerRepository
+from apps.core.repositories.reports import ReportRepository
+from apps.fleet.models import Car
+from apps.rentals.models import DailyRevenueRollup, PaymentTransaction, RentalAgreement, TransactionType
 
 User = get_user_model()
 
@@ -13,3 +20,102 @@ def test_financial_report_endpoint(db, rental):
     client.force_authenticate(user=staff)
     response = client.get("/api/reports/financial/?date_from=2020-01-01&date_to=2030-01-01")
     assert response.status_code == 200
+
+
+def test_financial_report_single_query(db, rental, deposit, django_assert_num_queries):
+    LedgerRepository.record(
+        [
+            PaymentTransaction(rental=rental, transaction_type=TransactionType.DEPOSIT_HELD, amount=Decimal("200.00")),
+            PaymentTransaction(rental=rental, transaction_type=TransactionType.RENTAL_CHARGE, amount=Decimal("300.00")),
+            PaymentTransaction(rental=rental, transaction_type=TransactionType.PENALTY_CHARGE, amount=Decimal("50.00")),
+            PaymentTransaction(
+                rental=rental, transaction_type=TransactionType.DEPOSIT_REFUND, amount=Decimal("150.00")
+            ),
+        ]
+    )
+    with django_assert_num_queries(1):
+        rows = list(ReportRepository.financial(date(2020, 1, 1), date(2030, 1, 1)))
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["car_id"] == rental.car_id
+    assert row["revenue"] == Decimal("300.00")
+    assert row["penalties_total"] == Decimal("50.00")
+    assert row["refunds_total"] == Decimal("150.00")
+    assert row["net_amount"] == Decimal("350.00")
+    by_class = list(ReportRepository.financial(date(2020, 1, 1), date(2030, 1, 1), group_by="car_class"))
+    assert by_class[0]["car_class"] == "Sedan"
+    assert row["rentals_count"] == 1
+
+
+def test_revenue_rollup_rebuild_matches_ledger(db, rental, deposit):
+    PaymentTransaction.objects.create(
+        rental=rental, transaction_type=TransactionType.DEPOSIT_HELD, amount=Decimal("200.00")
+    )
+    PaymentTransaction.objects.create(
+        rental=rental, transaction_type=TransactionType.RENTAL_CHARGE, amount=Decimal("99.99")
+    )
+    assert not ReportRepository.financial(date(2020, 1, 1), date(2030, 1, 1)).exists()
+    call_command("rebuild_revenue_rollup", stdout=StringIO())
+    row = ReportRepository.financial(date(2020, 1, 1), date(2030, 1, 1)).get()
+    assert row["revenue"] == Decimal("99.99")
+    assert row["deposits_total"] == Decimal("200.00")
+
+
+def test_rental_edit_moves_its_rollup_totals(db, rental, deposit):
+    other_car = Car.objects.create(
+        brand="Honda", model="Civic", car_class="Sedan", year=2021, base_daily_price=Decimal("90.00")
+    )
+    LedgerRepository.record(
+        [
+            PaymentTransaction(rental=rental, transaction_type=TransactionType.DEPOSIT_HELD, amount=Decimal("200.00")),
+            PaymentTransaction(rental=rental, transaction_type=TransactionType.RENTAL_CHARGE, amount=Decimal("300.00")),
+        ]
+    )
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    response = client.patch(
+        f"/api/rentals/{rental.id}/", {"car": other_car.id, "issue_date": rental.issue_date - timedelta(days=1)}
+    )
+    assert response.status_code == 200
+
+    moved = list(DailyRevenueRollup.objects.values_list("issue_date", "car_id", "transaction_type", "amount"))
+    assert sorted(moved) == [
+        (rental.issue_date - timedelta(days=1), other_car.id, TransactionType.DEPOSIT_HELD, Decimal("200.00")),
+        (rental.issue_date - timedelta(days=1), other_car.id, TransactionType.RENTAL_CHARGE, Decimal("300.00")),
+    ]
+    LedgerRepository.rebuild_rollup(date.min, date.max)
+    assert sorted(DailyRevenueRollup.objects.values_list("issue_date", "car_id", "transaction_type", "amount")) == moved
+
+
+def test_deleting_a_rental_takes_it_out_of_the_financial_report(
+    db, rental, deposit, django_capture_on_commit_callbacks
+):
+    other = RentalAgreement.objects.create(
+        customer=rental.customer,
+        car=rental.car,
+        issue_date=rental.issue_date - timedelta(days=2),
+        expected_return_date=rental.issue_date,
+        status="CLOSED",
+    )
+    LedgerRepository.record(
+        [
+            PaymentTransaction(rental=rental, transaction_type=TransactionType.DEPOSIT_HELD, amount=Decimal("200.00")),
+            PaymentTransaction(rental=rental, transaction_type=TransactionType.RENTAL_CHARGE, amount=Decimal("300.00")),
+            PaymentTransaction(rental=other, transaction_type=TransactionType.DEPOSIT_HELD, amount=Decimal("100.00")),
+        ]
+    )
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    url = "/api/reports/financial/?date_from=2020-01-01&date_to=2030-01-01"
+    assert client.get(url).json()[0]["rentals_count"] == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert client.delete(f"/api/rentals/{rental.id}/").status_code == 204
+    row = client.get(url).json()[0]
+    assert (row["rentals_count"], row["revenue"], row["deposits_total"]) == (1, "0.00", "100.00")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        other.delete()
+    assert client.get(url).json() == [] and not DailyRevenueRollup.objects.exists()
@@ -0,0 +1,122 @@
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from rest_framework.test import APIClient
+from apps.core.cache import FINANCIAL_REPORTS, bump_version, get_version, single_flight
+from apps.core.repositories.ledger import LedgerRepository
+from apps.rentals.models import PaymentTransaction, TransactionType
+from apps.rentals.services import return_rental
+from config import settings as project_settings
+
+User = get_user_model()
+
+
+def _staff_client():
+    staff = User.objects.create_user(email="staff@example.com", full_name="Staff", password="pass", role="STAFF")
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    return client
+
+
+def test_reports_are_cached_until_ledger_or_returns_change(
+    db, rental, deposit, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    client = _staff_client()
+    financial_url = "/api/reports/financial/?date_from=2020-01-01&date_to=2030-01-01"
+    occupancy_url = f"/api/reports/occupancy/?date={date.today()}"
+    assert client.get(financial_url).json() == []
+    assert client.get(occupancy_url).json()[0]["status"] == "RENTED"
+
+    with django_assert_num_queries(0):
+        client.get(financial_url)
+        client.get(occupancy_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        LedgerRepository.record(
+            [PaymentTransaction(rental=rental, transaction_type=TransactionType.DEPOSIT_HELD, amount=Decimal("200"))]
+        )
+    assert client.get(financial_url).json()[0]["deposits_total"] == "200.00"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        return_rental(rental, rental.expected_return_date, bad_condition=False)
+    assert client.get(occupancy_url).json()[0]["status"] == "AVAILABLE"
+
+
+@pytest.fixture
+def production_cache(settings, tmp_path):
+    # The backend production runs on; its add() is not atomic, so the single-flight lock must not rely on it.
+    settings.CACHES = {"default": {**project_settings.CACHES["default"], "LOCATION": str(tmp_path)}}
+
+
+def _advisory_locks() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM pg_locks WHERE locktype = 'advisory'")
+        return cursor.fetchone()[0]
+
+
+def _in_thread(target):
+    def run():
+        try:
+            target()
+        finally:
+            connections.close_all()
+
+    return threading.Thread(target=run)
+
+
+def test_single_flight_serves_stale_value_while_one_worker_rebuilds(db, production_cache):
+    calls = []
+    assert single_flight(FINANCIAL_REPORTS, ("key",), lambda: "v1", 60) == "v1"
+    bump_version(FINANCIAL_REPORTS)
+
+    building = threading.Event()
+    release = threading.Event()
+
+    def slow_build():
+        calls.append("build")
+        building.set()
+        release.wait(5)
+        return "v2"
+
+    worker = _in_thread(lambda: single_flight(FINANCIAL_REPORTS, ("key",), slow_build, 60))
+    worker.start()
+    building.wait(5)
+    # The lock is held by the rebuilding worker, so everyone else gets the previous result immediately.
+    assert _advisory_locks() == 1
+    assert single_flight(FINANCIAL_REPORTS, ("key",), slow_build, 60) == "v1"
+    release.set()
+    worker.join(5)
+
+    assert calls == ["build"]
+    assert single_flight(FINANCIAL_REPORTS, ("key",), slow_build, 60) == "v2"
+    assert _advisory_locks() == 0
+
+
+def test_single_flight_builds_once_for_concurrent_cold_reads(db, production_cache):
+    workers = 8
+    calls, results = [], []
+    start = threading.Barrier(workers)
+
+    def build():
+        calls.append("build")
+        time.sleep(0.2)
+        return "v1"
+
+    def read():
+        start.wait(5)
+        results.append(single_flight(FINANCIAL_REPORTS, ("key",), build, 60))
+
+    # Cold entry under an existing version: creating the very first version is a racy get_or_set of its own.
+    get_version(FINANCIAL_REPORTS)
+    threads = [_in_thread(read) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert calls == ["build"] and results == ["v1"] * workers
+    assert _advisory_locks() == 0
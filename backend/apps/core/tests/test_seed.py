@@ -0,0 +1,72 @@
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from django.core.management import call_command
+from django.db.models import Count, Q, Sum
+from apps.core.services.synthetic import SyntheticConfig, generate_synthetic_data
+from apps.fleet.models import Car, CarStatus
+from apps.rentals.models import (
+    DailyRevenueRollup,
+    Deposit,
+    PaymentTransaction,
+    Penalty,
+    RentalAgreement,
+    RentalStatus,
+    TransactionType,
+)
+
+
+def _snapshot():
+    return list(
+        RentalAgreement.objects.order_by("id").values_list(
+            "car__car_class", "issue_date", "expected_return_date", "actual_return_date", "status"
+        )
+    ), list(PaymentTransaction.objects.order_by("id").values_list("transaction_type", "amount"))
+
+
+def test_synthetic_history_is_deterministic_and_ledger_consistent(db):
+    config = SyntheticConfig(cars=5, customers=10, rentals=300, years=1, seed=10, end_date=date(2025, 1, 1))
+    summary = generate_synthetic_data(config)
+    first = _snapshot()
+
+    assert (summary.rentals, RentalAgreement.objects.count(), Deposit.objects.count()) == (300, 300, 300)
+    assert summary.transactions == PaymentTransaction.objects.count()
+    assert summary.penalties == Penalty.objects.count() > 0
+    assert RentalAgreement.objects.filter(status=RentalStatus.ACTIVE, expected_return_date__lt=config.end_date).exists()
+    # Marking cars out is a write like any other, so it moves their version on.
+    assert set(Car.objects.filter(status=CarStatus.RENTED).values_list("version", flat=True)) == {2}
+    # Only the rental spanning end_date is still out, and nothing was issued or booked after it.
+    active = RentalAgreement.objects.filter(status=RentalStatus.ACTIVE)
+    assert not active.values("car").annotate(count=Count("id")).filter(count__gt=1).exists()
+    assert set(active.values_list("car", flat=True)) == set(
+        Car.objects.filter(status=CarStatus.RENTED).values_list("id", flat=True)
+    )
+    assert not RentalAgreement.objects.filter(issue_date__gt=config.end_date).exists()
+    end_of_day = datetime.combine(config.end_date, time.max, tzinfo=timezone.utc)
+    assert not PaymentTransaction.objects.filter(created_at__gt=end_of_day).exists()
+    penalties = PaymentTransaction.objects.filter(transaction_type=TransactionType.PENALTY_CHARGE)
+    assert penalties.aggregate(total=Sum("amount"))["total"] == Penalty.objects.aggregate(total=Sum("amount"))["total"]
+    held = RentalAgreement.objects.annotate(
+        held=Count("transactions", filter=Q(transactions__transaction_type=TransactionType.DEPOSIT_HELD))
+    )
+    assert set(held.values_list("held", flat=True)) == {1}
+
+    ledger = PaymentTransaction.objects.values("transaction_type").annotate(total=Sum("amount"), count=Count("id"))
+    rollup = DailyRevenueRollup.objects.values("transaction_type").annotate(
+        total=Sum("amount"), count=Sum("transactions_count")
+    )
+    assert sorted(ledger, key=str) == sorted(rollup, key=str)
+
+    for model in (DailyRevenueRollup, PaymentTransaction, Penalty, Deposit, RentalAgreement):
+        model.objects.all().delete()
+    generate_synthetic_data(config)
+    assert _snapshot() == first
+
+
+def test_seed_command_generates_history_and_keeps_sequences_in_sync(db):
+    call_command("seed", cars=3, customers=4, rentals=20, years=1, end_date=date(2025, 1, 1))
+
+    assert RentalAgreement.objects.count() == 20
+    # Rows were copied with explicit ids, so new inserts only work if the sequences were moved past them.
+    PaymentTransaction.objects.create(
+        rental=RentalAgreement.objects.first(), transaction_type=TransactionType.DEPOSIT_HELD, amount=Decimal("1.00")
+    )
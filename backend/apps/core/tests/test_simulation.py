@@ -0,0 +1,25 @@
+from datetime import date
+from decimal import Decimal
+from django.db.models import Sum
+from apps.core.services.simulation import PricingConfig, simulate_repricing
+from apps.rentals.models import PaymentTransaction, TransactionType
+from apps.rentals.services import return_rental
+
+
+def test_repricing_replays_ledger_and_reports_deltas(rental, deposit):
+    rental.issue_date = date(2024, 1, 30)
+    rental.expected_return_date = date(2024, 2, 6)
+    rental.save()
+    return_rental(rental, date(2024, 2, 9), bad_condition=True)
+    charged = PaymentTransaction.objects.filter(
+        transaction_type__in=[TransactionType.RENTAL_CHARGE, TransactionType.PENALTY_CHARGE]
+    ).aggregate(total=Sum("amount"))["total"]
+
+    current = PricingConfig.current()
+    proposed = PricingConfig({7: Decimal("0.05"), 10: Decimal("0.08")}, Decimal("60.00"), current.bad_condition_fee)
+    [row] = simulate_repricing(proposed)
+
+    assert (row.car_class, row.month, row.rentals) == ("Sedan", "2024-01", 1)
+    assert row.current == charged
+    # 10 days at 100.00 with a 0.92 age factor, 3 late days and one bad condition fee.
+    assert row.proposed == Decimal("846.40") + Decimal("180.00") + Decimal("100.00")
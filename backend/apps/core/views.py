@@ -0,0 +1,13 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from apps.accounts.permissions import IsStaff
+from .metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsView(APIView):
+    permission_classes = [IsStaff]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
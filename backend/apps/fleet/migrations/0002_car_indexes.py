@@ -0,0 +1,25 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:37
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("fleet", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                django.db.models.functions.text.Upper("car_class"),
+                models.F("status"),
+                name="car_class_upper_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(fields=["status"], name="car_status_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("fleet", "0002_car_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="car",
+            name="version",
+            field=models.PositiveIntegerField(db_default=1, default=1),
+        ),
+    ]
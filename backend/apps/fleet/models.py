@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Upper
+from apps.core.models import VersionedModel
 
 
 class CarStatus(models.TextChoices):
@@ -7,7 +9,7 @@ class CarStatus(models.TextChoices):
     MAINTENANCE = "MAINTENANCE", "Maintenance"
 
 
-class Car(models.Model):
+class Car(VersionedModel):
     brand = models.CharField(max_length=100)
     model = models.CharField(max_length=100)
     car_class = models.CharField(max_length=50)
@@ -15,5 +17,12 @@ class Car(models.Model):
     base_daily_price = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=CarStatus.choices, default=CarStatus.AVAILABLE)
 
+    class Meta:
+        indexes = [
+            # Availability search filters car_class with iexact, i.e. UPPER(car_class) = UPPER(%s).
+            models.Index(Upper("car_class"), "status", name="car_class_upper_status_idx"),
+            models.Index(fields=["status"], name="car_status_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.brand} {self.model} ({self.year})"
@@ -6,3 +6,19 @@ class CarSerializer(serializers.ModelSerializer):
     class Meta:
         model = Car
         fields = ("id", "brand", "model", "car_class", "year", "base_daily_price", "status")
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    car_class = serializers.CharField(required=False)
+    brand = serializers.CharField(required=False)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    min_year = serializers.IntegerField(required=False)
+    max_year = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if attrs["date_to"] <= attrs["date_from"]:
+            raise serializers.ValidationError({"date_to": "Must be after date_from"})
+        return attrs
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.core.cache import CATALOGUE, OCCUPANCY_REPORTS, bump_version_on_commit
+from .models import Car
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_delete, sender=Car)
+def on_car_changed(sender, **kwargs):
+    bump_version_on_commit(CATALOGUE)
+    bump_version_on_commit(OCCUPANCY_REPORTS)
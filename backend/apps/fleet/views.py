@@ -1,17 +1,119 @@
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from django.conf import settings
 from rest_framework import viewsets, permissions, filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from .models import Car
-from .serializers import CarSerializer
+from .serializers import CarSerializer, AvailabilityQuerySerializer
 from apps.accounts.permissions import IsStaff
+from apps.core.async_views import AsyncAPIView, json_response
+from apps.core.cache import CATALOGUE, aconditional_cached_response, conditional_cached_response
+from apps.core.db import ReplicaReadMixin
+from apps.core.repositories.cars import CarRepository
+from apps.core.services.factory import PricingStrategyFactory
 
+AVAILABILITY_FILTERS = {
+    "car_class": "car_class__iexact",
+    "brand": "brand__iexact",
+    "min_price": "base_daily_price__gte",
+    "max_price": "base_daily_price__lte",
+    "min_year": "year__gte",
+    "max_year": "year__lte",
+}
 
-class CarViewSet(viewsets.ModelViewSet):
+MAX_QUOTE_ITEMS = 10000
+MAX_QUOTE_DAYS = 365
+
+
+def _parse_quote_item(item) -> tuple[int, date, int]:
+    # Parsed by hand: DRF field validation costs more than pricing for large quote batches.
+    car_id, issue_date, days = int(item["car"]), date.fromisoformat(item["issue_date"]), int(item["days"])
+    if not 1 <= days <= MAX_QUOTE_DAYS:
+        raise ValueError
+    return car_id, issue_date, days
+
+
+class CarViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = CarSerializer
+    replica_cache_namespaces = (CATALOGUE,)
     queryset = Car.objects.all()
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["brand", "model", "car_class"]
     ordering_fields = ["base_daily_price", "year", "brand"]
 
     def get_permissions(self):
-        if self.action in {"list", "retrieve"}:
+        if self.action in {"list", "retrieve", "available", "quote"}:
             return [permissions.AllowAny()]
         return [IsStaff()]
+
+    def list(self, request, *args, **kwargs):
+        return conditional_cached_response(
+            request, CATALOGUE, lambda: super(CarViewSet, self).list(request).data, settings.CATALOGUE_CACHE_TIMEOUT
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_cached_response(
+            request,
+            CATALOGUE,
+            lambda: super(CarViewSet, self).retrieve(request, *args, **kwargs).data,
+            settings.CATALOGUE_CACHE_TIMEOUT,
+        )
+
+    @action(detail=False, methods=["get"])
+    def available(self, request):
+        params = AvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+        cars = CarRepository.available(query["date_from"], query["date_to"]).filter(
+            **{lookup: query[name] for name, lookup in AVAILABILITY_FILTERS.items() if name in query}
+        )
+        return Response(CarSerializer(self.filter_queryset(cars.order_by("id")), many=True).data)
+
+    @action(detail=False, methods=["post"])
+    def quote(self, request):
+        items = request.data
+        if not isinstance(items, list) or not 0 < len(items) <= MAX_QUOTE_ITEMS:
+            raise ValidationError({"non_field_errors": [f"Expected a list of 1 to {MAX_QUOTE_ITEMS} quote requests"]})
+        parsed, errors = [], {}
+        for index, item in enumerate(items):
+            try:
+                parsed.append(_parse_quote_item(item))
+            except (KeyError, TypeError, ValueError):
+                errors[index] = f"Expected car id, issue_date (YYYY-MM-DD) and days (1-{MAX_QUOTE_DAYS})"
+        if errors:
+            raise ValidationError(errors)
+        cars = Car.objects.only("id", "base_daily_price", "year").in_bulk({car_id for car_id, _, _ in parsed})
+        missing = {index: "Car not found" for index, (car_id, _, _) in enumerate(parsed) if car_id not in cars}
+        if missing:
+            raise ValidationError(missing)
+        engine = PricingStrategyFactory.engine()
+        quotes = []
+        for car_id, issue_date, days in parsed:
+            car = cars[car_id]
+            # Round like the numeric(10, 2) column the charge is stored in, so the quote matches the invoice.
+            amount = engine.calculate(car.base_daily_price, days, car.year, issue_date)
+            amount = amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            quotes.append({"car": car_id, "issue_date": issue_date, "days": days, "amount": str(amount)})
+        return Response(quotes)
+
+
+class AsyncCarListView(AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+    replica_reads = True
+    replica_cache_namespaces = (CATALOGUE,)
+    filter_backends = CarViewSet.filter_backends
+    search_fields = CarViewSet.search_fields
+    ordering_fields = CarViewSet.ordering_fields
+
+    async def get(self, request):
+        return await aconditional_cached_response(
+            request, CATALOGUE, lambda: self._build(request), settings.CATALOGUE_CACHE_TIMEOUT, json_response
+        )
+
+    async def _build(self, request):
+        cars = Car.objects.all()
+        for backend in self.filter_backends:
+            cars = backend().filter_queryset(request, cars, self)
+        return CarSerializer([car async for car in cars], many=True).data
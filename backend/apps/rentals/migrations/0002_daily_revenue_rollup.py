@@ -0,0 +1,40 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0001_initial'),
+        ('rentals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issue_date', models.DateField()),
+                ('transaction_type', models.CharField(choices=[('RENTAL_CHARGE', 'Rental charge'), ('DEPOSIT_HELD', 'Deposit held'), ('DEPOSIT_REFUND', 'Deposit refund'), ('PENALTY_CHARGE', 'Penalty charge')], max_length=30)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('transactions_count', models.PositiveIntegerField(default=0)),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revenue_rollups', to='fleet.car')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrevenuerollup',
+            constraint=models.UniqueConstraint(fields=('issue_date', 'car', 'transaction_type'), name='unique_daily_revenue_rollup'),
+        ),
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO rentals_dailyrevenuerollup (issue_date, car_id, transaction_type, amount, transactions_count)
+                SELECT r.issue_date, r.car_id, t.transaction_type, SUM(t.amount), COUNT(*)
+                FROM rentals_paymenttransaction t
+                JOIN rentals_rentalagreement r ON r.id = t.rental_id
+                GROUP BY r.issue_date, r.car_id, t.transaction_type
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
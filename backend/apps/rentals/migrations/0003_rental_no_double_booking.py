@@ -0,0 +1,22 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:59
+
+import apps.rentals.models
+import django.contrib.postgres.constraints
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0001_initial'),
+        ('rentals', '0002_daily_revenue_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='rentalagreement',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ('DRAFT', 'ACTIVE'))), expressions=[(apps.rentals.models.CarRange(), '&&'), (apps.rentals.models.RentalPeriod(), '&&')], name='rental_no_double_booking'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("fleet", "0001_initial"),
+        ("rentals", "0003_rental_no_double_booking"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="rentalagreement",
+            index=models.Index(fields=["issue_date", "id"], name="rental_issue_date_id_idx"),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("fleet", "0001_initial"),
+        ("rentals", "0004_rental_issue_date_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="penalty",
+            name="accrued_on",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="penalty",
+            name="is_provisional",
+            field=models.BooleanField(db_default=False, default=False),
+        ),
+        migrations.AddField(
+            model_name="rentalagreement",
+            name="is_overdue",
+            field=models.BooleanField(db_default=False, default=False),
+        ),
+        migrations.AddIndex(
+            model_name="rentalagreement",
+            index=models.Index(
+                condition=models.Q(("status", "ACTIVE")),
+                fields=["expected_return_date"],
+                name="rental_active_due_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rentalagreement",
+            index=models.Index(
+                condition=models.Q(("is_overdue", True)),
+                fields=["expected_return_date"],
+                name="rental_overdue_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="penalty",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_provisional", True)),
+                fields=("rental",),
+                name="penalty_one_provisional_per_rental",
+            ),
+        ),
+    ]
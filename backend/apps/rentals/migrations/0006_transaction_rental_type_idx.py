@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rentals", "0005_overdue_accrual"),
+    ]
+
+    # The composite index is built before the FK's own index is dropped, so rental lookups stay indexed.
+    operations = [
+        migrations.AddIndex(
+            model_name="paymenttransaction",
+            index=models.Index(
+                fields=["rental", "transaction_type"],
+                name="transaction_rental_type_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="paymenttransaction",
+            name="rental",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transactions",
+                to="rentals.rentalagreement",
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.db import migrations
+
+# Postgres requires the partition key in every unique constraint, so the primary key becomes (id, created_at); ids
+# still come from one identity sequence and stay unique. Existing rows land in the default partition until
+# `manage.py ledger_partitions` (also run after every migrate) moves them into monthly partitions.
+PARTITION_SQL = """
+    CREATE TABLE rentals_paymenttransaction_partitioned (
+        id bigint GENERATED BY DEFAULT AS IDENTITY,
+        transaction_type varchar(30) NOT NULL,
+        amount numeric(10, 2) NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        note varchar(255) NOT NULL,
+        rental_id bigint NOT NULL
+    ) PARTITION BY RANGE (created_at);
+    CREATE TABLE rentals_paymenttransaction_default PARTITION OF rentals_paymenttransaction_partitioned DEFAULT;
+    INSERT INTO rentals_paymenttransaction_partitioned (id, transaction_type, amount, created_at, note, rental_id)
+    SELECT id, transaction_type, amount, created_at, note, rental_id FROM rentals_paymenttransaction;
+    DROP TABLE rentals_paymenttransaction;
+    ALTER TABLE rentals_paymenttransaction_partitioned RENAME TO rentals_paymenttransaction;
+    ALTER SEQUENCE rentals_paymenttransaction_partitioned_id_seq RENAME TO rentals_paymenttransaction_id_seq;
+    ALTER TABLE rentals_paymenttransaction ADD CONSTRAINT rentals_paymenttransaction_pkey PRIMARY KEY (id, created_at);
+    ALTER TABLE rentals_paymenttransaction ADD CONSTRAINT rentals_paymenttrans_rental_id_28f9f808_fk_rentals_r
+        FOREIGN KEY (rental_id) REFERENCES rentals_rentalagreement (id) DEFERRABLE INITIALLY DEFERRED;
+    CREATE INDEX transaction_rental_type_idx ON rentals_paymenttransaction (rental_id, transaction_type);
+    SELECT setval('rentals_paymenttransaction_id_seq', COALESCE(MAX(id), 1), MAX(id) IS NOT NULL)
+    FROM rentals_paymenttransaction;
+"""
+
+UNPARTITION_SQL = """
+    CREATE TABLE rentals_paymenttransaction_unpartitioned (
+        id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        transaction_type varchar(30) NOT NULL,
+        amount numeric(10, 2) NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        note varchar(255) NOT NULL,
+        rental_id bigint NOT NULL
+    );
+    INSERT INTO rentals_paymenttransaction_unpartitioned (id, transaction_type, amount, created_at, note, rental_id)
+    SELECT id, transaction_type, amount, created_at, note, rental_id FROM rentals_paymenttransaction;
+    DROP TABLE rentals_paymenttransaction;
+    ALTER TABLE rentals_paymenttransaction_unpartitioned RENAME TO rentals_paymenttransaction;
+    ALTER SEQUENCE rentals_paymenttransaction_unpartitioned_id_seq RENAME TO rentals_paymenttransaction_id_seq;
+    ALTER INDEX rentals_paymenttransaction_unpartitioned_pkey RENAME TO rentals_paymenttransaction_pkey;
+    ALTER TABLE rentals_paymenttransaction ADD CONSTRAINT rentals_paymenttrans_rental_id_28f9f808_fk_rentals_r
+        FOREIGN KEY (rental_id) REFERENCES rentals_rentalagreement (id) DEFERRABLE INITIALLY DEFERRED;
+    CREATE INDEX transaction_rental_type_idx ON rentals_paymenttransaction (rental_id, transaction_type);
+    SELECT setval('rentals_paymenttransaction_id_seq', COALESCE(MAX(id), 1), MAX(id) IS NOT NULL)
+    FROM rentals_paymenttransaction;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rentals", "0006_transaction_rental_type_idx"),
+    ]
+
+    # The model is unchanged: Django keeps treating `id` as the primary key.
+    operations = [migrations.RunSQL(PARTITION_SQL, UNPARTITION_SQL)]
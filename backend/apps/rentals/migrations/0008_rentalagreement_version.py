@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rentals", "0007_partition_payment_transactions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rentalagreement",
+            name="version",
+            field=models.PositiveIntegerField(db_default=1, default=1),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.0.7 on 2026-10-18 11:05
+
+import django.db.models.deletion
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+BACKFILL_SQL = """
+    INSERT INTO rentals_rentalbalance (rental_id, rental_charged, penalties_total, deposit_held, deposit_refunded)
+    SELECT rental_id,
+           COALESCE(SUM(amount) FILTER (WHERE transaction_type = 'RENTAL_CHARGE'), 0),
+           COALESCE(SUM(amount) FILTER (WHERE transaction_type = 'PENALTY_CHARGE'), 0),
+           COALESCE(SUM(amount) FILTER (WHERE transaction_type = 'DEPOSIT_HELD'), 0),
+           COALESCE(SUM(amount) FILTER (WHERE transaction_type = 'DEPOSIT_REFUND'), 0)
+    FROM rentals_paymenttransaction
+    GROUP BY rental_id
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("rentals", "0008_rentalagreement_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RentalBalance",
+            fields=[
+                (
+                    "rental",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="balance",
+                        serialize=False,
+                        to="rentals.rentalagreement",
+                    ),
+                ),
+                (
+                    "rental_charged",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "penalties_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "deposit_held",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "deposit_refunded",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "deposit_outstanding",
+                    models.GeneratedField(
+                        db_persist=True,
+                        expression=django.db.models.functions.comparison.Greatest(
+                            django.db.models.expressions.CombinedExpression(
+                                django.db.models.expressions.CombinedExpression(
+                                    models.F("deposit_held"),
+                                    "-",
+                                    models.F("deposit_refunded"),
+                                ),
+                                "-",
+                                models.F("penalties_total"),
+                            ),
+                            models.Value(0),
+                        ),
+                        output_field=models.DecimalField(
+                            decimal_places=2, max_digits=12
+                        ),
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
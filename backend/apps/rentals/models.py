@@ -1,6 +1,11 @@
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import BigIntegerRangeField, DateRangeField, RangeOperators
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from apps.accounts.models import User
+from apps.core.models import VersionedModel
 from apps.fleet.models import Car
 
 
@@ -12,13 +17,60 @@ class RentalStatus(models.TextChoices):
     CANCELLED = "CANCELLED", "Cancelled"
 
 
-class RentalAgreement(models.Model):
+BOOKING_STATUSES = (RentalStatus.DRAFT, RentalStatus.ACTIVE)
+
+
+class RentalPeriod(models.Func):
+    function = "daterange"
+    output_field = DateRangeField()
+
+    def __init__(self):
+        super().__init__(models.F("issue_date"), models.F("expected_return_date"))
+
+
+class CarRange(models.Func):
+    # Single-point int8range so car equality can share a plain GiST index with the period
+    # (range types have built-in GiST support; no btree_gist extension is required).
+    function = "int8range"
+    template = "%(function)s(%(expressions)s, %(expressions)s, '[]')"
+    output_field = BigIntegerRangeField()
+
+    def __init__(self):
+        super().__init__(models.F("car"))
+
+
+class RentalAgreement(VersionedModel):
     customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name="rentals")
     car = models.ForeignKey(Car, on_delete=models.PROTECT, related_name="rentals")
     issue_date = models.DateField()
     expected_return_date = models.DateField()
     actual_return_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=RentalStatus.choices, default=RentalStatus.DRAFT)
+    # Set by the nightly overdue scan, cleared on return; db_default keeps raw COPY loads valid.
+    is_overdue = models.BooleanField(default=False, db_default=False)
+
+    class Meta:
+        constraints = [
+            ExclusionConstraint(
+                name="rental_no_double_booking",
+                expressions=[
+                    (CarRange(), RangeOperators.OVERLAPS),
+                    (RentalPeriod(), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(status__in=BOOKING_STATUSES),
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["issue_date", "id"], name="rental_issue_date_id_idx"),
+            models.Index(
+                fields=["expected_return_date"],
+                name="rental_active_due_idx",
+                condition=models.Q(status=RentalStatus.ACTIVE),
+            ),
+            models.Index(
+                fields=["expected_return_date"], name="rental_overdue_idx", condition=models.Q(is_overdue=True)
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Rental {self.id} - {self.car}"
@@ -52,6 +104,18 @@ class Penalty(models.Model):
     type = models.CharField(max_length=20, choices=PenaltyType.choices)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     comment = models.CharField(max_length=255, blank=True)
+    # Provisional late fees are accrued nightly for rentals still out and replaced by the real one on return.
+    is_provisional = models.BooleanField(default=False, db_default=False)
+    accrued_on = models.DateField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["rental"],
+                condition=models.Q(is_provisional=True),
+                name="penalty_one_provisional_per_rental",
+            )
+        ]
 
 
 class TransactionType(models.TextChoices):
@@ -62,8 +126,44 @@ class TransactionType(models.TextChoices):
 
 
 class PaymentTransaction(models.Model):
-    rental = models.ForeignKey(RentalAgreement, on_delete=models.CASCADE, related_name="transactions")
+    # Indexed by the (rental, transaction_type) composite, which also serves lookups by rental alone.
+    rental = models.ForeignKey(RentalAgreement, on_delete=models.CASCADE, related_name="transactions", db_index=False)
     transaction_type = models.CharField(max_length=30, choices=TransactionType.choices)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
     note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["rental", "transaction_type"], name="transaction_rental_type_idx")]
+
+
+class DailyRevenueRollup(models.Model):
+    issue_date = models.DateField()
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name="revenue_rollups")
+    transaction_type = models.CharField(max_length=30, choices=TransactionType.choices)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transactions_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["issue_date", "car", "transaction_type"],
+                name="unique_daily_revenue_rollup",
+            )
+        ]
+
+
+class RentalBalance(models.Model):
+    # Ledger totals of one rental, kept in step by LedgerRepository.record; `manage.py verify_rental_balances`
+    # checks them against the ledger.
+    rental = models.OneToOneField(RentalAgreement, on_delete=models.CASCADE, primary_key=True, related_name="balance")
+    rental_charged = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    penalties_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    deposit_held = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    deposit_refunded = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Held deposit not yet refunded nor used to cover penalties.
+    deposit_outstanding = models.GeneratedField(
+        expression=Greatest(F("deposit_held") - F("deposit_refunded") - F("penalties_total"), Value(0)),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True,
+    )
@@ -1,12 +1,64 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from apps.accounts.models import User
 from apps.fleet.models import Car
-from .models import RentalAgreement, Deposit, Penalty
+from apps.core.repositories.ledger import LedgerRepository
+from apps.core.repositories.rentals import RentalRepository
+from apps.core.serializers.sparse import SparseFieldsetMixin
+from .models import RentalAgreement, RentalBalance, RentalStatus, Deposit, Penalty
 
+DOUBLE_BOOKING_ERROR = {"car": "Car is already booked for these dates"}
+BALANCE_FIELDS = ("rental_charged", "penalties_total", "deposit_held", "deposit_refunded", "deposit_outstanding")
 
-class RentalAgreementSerializer(serializers.ModelSerializer):
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        prefetched = self.context.get("prefetched", {}).get(self.field_name)
+        if prefetched is None:
+            return super().to_internal_value(data)
+        try:
+            return prefetched[int(data)]
+        except (KeyError, TypeError, ValueError):
+            self.fail("does_not_exist", pk_value=data)
+
+
+class NoDoubleBookingMixin:
+    def _save_guarded(self, save, *args):
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError as exc:
+            if "rental_no_double_booking" in str(exc):
+                raise serializers.ValidationError(DOUBLE_BOOKING_ERROR) from exc
+            raise
+
+    def create(self, validated_data):
+        return self._save_guarded(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self._save_guarded(super().update, instance, validated_data)
+
+
+class RentalBalanceSerializer(serializers.ModelSerializer):
+    # A generated column, which ModelSerializer would map to a raw ModelField rendered as a float.
+    deposit_outstanding = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = RentalBalance
+        fields = BALANCE_FIELDS
+
+
+class RentalAgreementSerializer(SparseFieldsetMixin, NoDoubleBookingMixin, serializers.ModelSerializer):
     customer_email = serializers.EmailField(source="customer.email", read_only=True)
     car_display = serializers.CharField(source="car.__str__", read_only=True)
+    # Null until the rental's first ledger entry.
+    balance = RentalBalanceSerializer(read_only=True, allow_null=True)
+
+    sparse_sources = {
+        "customer_email": ("customer__email",),
+        "car_display": ("car__brand", "car__model", "car__year"),
+        "balance": tuple(f"balance__{name}" for name in BALANCE_FIELDS),
+    }
 
     class Meta:
         model = RentalAgreement
@@ -20,10 +72,51 @@ class RentalAgreementSerializer(serializers.ModelSerializer):
             "expected_return_date",
             "actual_return_date",
             "status",
+            "is_overdue",
+            "balance",
         )
+        read_only_fields = ("is_overdue",)
+
+    def validate(self, attrs):
+        issue_date = attrs.get("issue_date", getattr(self.instance, "issue_date", None))
+        expected_return_date = attrs.get("expected_return_date", getattr(self.instance, "expected_return_date", None))
+        if issue_date and expected_return_date and expected_return_date <= issue_date:
+            raise serializers.ValidationError({"expected_return_date": "Must be after issue_date"})
+        return attrs
 
+    def update(self, instance, validated_data):
+        # The revenue rollup files ledger rows under the rental's issue date and car, so an edit moves them along.
+        rollup_key = (instance.issue_date, instance.car_id)
+        with transaction.atomic():
+            rental = super().update(instance, validated_data)
+            if (rental.issue_date, rental.car_id) != rollup_key:
+                LedgerRepository.move_rollup(rental, *rollup_key)
+        return rental
 
-class RentalCreateSerializer(serializers.ModelSerializer):
+
+class QueryBooleanField(serializers.BooleanField):
+    # BooleanField reads a missing form/query key as False; here a missing key means "no filter".
+    default_empty_html = serializers.empty
+
+
+class RentalListQuerySerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=RentalStatus.choices, required=False)
+    customer = serializers.IntegerField(required=False)
+    car = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    overdue = QueryBooleanField(required=False)
+    fields = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if "date_from" in attrs and "date_to" in attrs and attrs["date_to"] < attrs["date_from"]:
+            raise serializers.ValidationError({"date_to": "Must not be before date_from"})
+        return attrs
+
+
+class RentalCreateSerializer(NoDoubleBookingMixin, serializers.ModelSerializer):
+    customer = PrefetchedPrimaryKeyRelatedField(queryset=User.objects.all())
+    car = PrefetchedPrimaryKeyRelatedField(queryset=Car.objects.all())
     deposit_amount = serializers.DecimalField(max_digits=10, decimal_places=2, write_only=True)
 
     class Meta:
@@ -41,6 +134,16 @@ class RentalCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Rental customer must be a CUSTOMER")
         return value
 
+    def validate(self, attrs):
+        if attrs["expected_return_date"] <= attrs["issue_date"]:
+            raise serializers.ValidationError({"expected_return_date": "Must be after issue_date"})
+        if not self.context.get("check_overlap", True):
+            return attrs
+        overlapping = RentalRepository.overlapping(attrs["issue_date"], attrs["expected_return_date"])
+        if overlapping.filter(car=attrs["car"]).exists():
+            raise serializers.ValidationError(DOUBLE_BOOKING_ERROR)
+        return attrs
+
     def create(self, validated_data):
         validated_data.pop("deposit_amount", None)
         return super().create(validated_data)
@@ -51,6 +154,20 @@ class RentalReturnSerializer(serializers.Serializer):
     bad_condition = serializers.BooleanField(default=False)
 
 
+class RentalBatchReturnSerializer(RentalReturnSerializer):
+    rental = serializers.IntegerField()
+
+
+class LineItemSerializer(serializers.Serializer):
+    description = serializers.CharField()
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class InvoiceSerializer(serializers.Serializer):
+    items = LineItemSerializer(many=True)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
 class DepositSerializer(serializers.ModelSerializer):
     class Meta:
         model = Deposit
@@ -1,19 +1,40 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import date
 from decimal import Decimal
 from django.db import transaction
 from django.utils import timezone
 from apps.core.services.factory import PricingStrategyFactory
-from apps.core.services.builder import InvoiceBuilder
+from apps.core.services.builder import Invoice, InvoiceBuilder
+from apps.core.services.concurrency import retry_on_conflict
+from apps.core.services.pricing import PricingEngine
 from apps.core.repositories.cars import CarRepository
+from apps.core.repositories.ledger import LedgerRepository
+from apps.core.repositories.unit_of_work import UnitOfWork
 from apps.core.services.state import get_state
 from apps.fleet.models import CarStatus
-from .models import RentalAgreement, Deposit, Penalty, PenaltyType, PaymentTransaction, TransactionType
-from .signals import rental_returned
+from apps.core.repositories.rentals import RentalRepository
+from .models import (
+    RentalAgreement,
+    RentalStatus,
+    Deposit,
+    DepositStatus,
+    Penalty,
+    PenaltyType,
+    PaymentTransaction,
+    TransactionType,
+)
+from .signals import rental_returned, rentals_returned
 
 
 LATE_FEE_PER_DAY = Decimal("50.00")
 BAD_CONDITION_FEE = Decimal("100.00")
 
+# Statements one return_rental attempt issues: the read of the rental with its car and deposit, one UPDATE each for
+# the rental, deposit and car, the penalty insert, and the ledger insert and rollup upsert. An overdue rental adds
+# the delete of its provisional fee.
+RETURN_RENTAL_QUERY_BUDGET = 7
+
 
 def calculate_duration_days(start_date: date, end_date: date) -> int:
     days = (end_date - start_date).days
@@ -23,85 +44,262 @@ def calculate_duration_days(start_date: date, end_date: date) -> int:
 @transaction.atomic
 def create_rental(rental: RentalAgreement, deposit_amount: Decimal) -> Deposit:
     Deposit.objects.create(rental=rental, amount=deposit_amount)
-    PaymentTransaction.objects.create(
-        rental=rental,
-        transaction_type=TransactionType.DEPOSIT_HELD,
-        amount=deposit_amount,
-        note="Deposit collected",
+    LedgerRepository.record(
+        [
+            PaymentTransaction(
+                rental=rental,
+                transaction_type=TransactionType.DEPOSIT_HELD,
+                amount=deposit_amount,
+                note="Deposit collected",
+            )
+        ]
     )
     CarRepository.set_status(rental.car, CarStatus.RENTED)
     get_state(rental).activate(rental)
     return rental.deposit
 
 
+def find_booking_conflicts(rentals: list[RentalAgreement]) -> set[int]:
+    if not rentals:
+        return set()
+    booked: dict[int, list[tuple[date, date]]] = {}
+    existing = RentalRepository.overlapping(
+        min(rental.issue_date for rental in rentals),
+        max(rental.expected_return_date for rental in rentals),
+    ).filter(car_id__in={rental.car_id for rental in rentals})
+    for car_id, issue_date, expected_return_date in existing.values_list(
+        "car_id", "issue_date", "expected_return_date"
+    ):
+        booked.setdefault(car_id, []).append((issue_date, expected_return_date))
+    conflicts = set()
+    for index, rental in enumerate(rentals):
+        periods = booked.setdefault(rental.car_id, [])
+        if any(start < rental.expected_return_date and rental.issue_date < end for start, end in periods):
+            conflicts.add(index)
+        else:
+            periods.append((rental.issue_date, rental.expected_return_date))
+    return conflicts
+
+
 @transaction.atomic
-def return_rental(rental: RentalAgreement, return_date: date | None, bad_condition: bool):
-    actual_return = return_date or timezone.now().date()
-    rental.actual_return_date = actual_return
-    rental.save(update_fields=["actual_return_date"])
-    get_state(rental).return_car(rental)
-    pricing = PricingStrategyFactory.build()
+def create_rentals(bookings: list[tuple[RentalAgreement, Decimal]]) -> list[RentalAgreement]:
+    rentals = [rental for rental, _ in bookings]
+    # Rentals are inserted already ACTIVE, the same end state as DraftState.activate in create_rental.
+    for rental in rentals:
+        rental.status = RentalStatus.ACTIVE
+    RentalAgreement.objects.bulk_create(rentals)
+    Deposit.objects.bulk_create([Deposit(rental=rental, amount=amount) for rental, amount in bookings])
+    LedgerRepository.record(
+        [
+            PaymentTransaction(
+                rental=rental,
+                transaction_type=TransactionType.DEPOSIT_HELD,
+                amount=amount,
+                note="Deposit collected",
+            )
+            for rental, amount in bookings
+        ]
+    )
+    CarRepository.set_status_many({rental.car_id for rental in rentals}, CarStatus.RENTED)
+    return rentals
+
+
+@dataclass
+class ReturnSettlement:
+    invoice: Invoice
+    penalties: list[Penalty] = field(default_factory=list)
+    transactions: list[PaymentTransaction] = field(default_factory=list)
+    deposit_status: str = DepositStatus.HELD
+
+
+def settle_return(
+    rental: RentalAgreement,
+    deposit: Deposit,
+    actual_return: date,
+    bad_condition: bool,
+    pricing: PricingEngine,
+) -> ReturnSettlement:
     duration_days = calculate_duration_days(rental.issue_date, actual_return)
     rental_charge = pricing.calculate(rental.car.base_daily_price, duration_days, rental.car.year, rental.issue_date)
 
     invoice = InvoiceBuilder().add_item("Rental charge", rental_charge)
+    penalties = []
 
     penalties_total = Decimal("0.00")
     if actual_return > rental.expected_return_date:
         late_days = (actual_return - rental.expected_return_date).days
         late_fee = LATE_FEE_PER_DAY * Decimal(late_days)
-        Penalty.objects.create(
-            rental=rental,
-            type=PenaltyType.LATE_RETURN,
-            amount=late_fee,
-            comment=f"Late by {late_days} day(s)",
+        penalties.append(
+            Penalty(
+                rental=rental,
+                type=PenaltyType.LATE_RETURN,
+                amount=late_fee,
+                comment=f"Late by {late_days} day(s)",
+            )
         )
         penalties_total += late_fee
         invoice.add_item("Late return penalty", late_fee)
 
     if bad_condition:
-        Penalty.objects.create(
-            rental=rental,
-            type=PenaltyType.BAD_CONDITION,
-            amount=BAD_CONDITION_FEE,
-            comment="Bad condition reported",
+        penalties.append(
+            Penalty(
+                rental=rental,
+                type=PenaltyType.BAD_CONDITION,
+                amount=BAD_CONDITION_FEE,
+                comment="Bad condition reported",
+            )
         )
         penalties_total += BAD_CONDITION_FEE
         invoice.add_item("Bad condition penalty", BAD_CONDITION_FEE)
 
-    PaymentTransaction.objects.create(
-        rental=rental,
-        transaction_type=TransactionType.RENTAL_CHARGE,
-        amount=rental_charge,
-        note="Rental charge",
-    )
+    transactions = [
+        PaymentTransaction(
+            rental=rental,
+            transaction_type=TransactionType.RENTAL_CHARGE,
+            amount=rental_charge,
+            note="Rental charge",
+        )
+    ]
 
     if penalties_total > 0:
-        PaymentTransaction.objects.create(
-            rental=rental,
-            transaction_type=TransactionType.PENALTY_CHARGE,
-            amount=penalties_total,
-            note="Penalties",
+        transactions.append(
+            PaymentTransaction(
+                rental=rental,
+                transaction_type=TransactionType.PENALTY_CHARGE,
+                amount=penalties_total,
+                note="Penalties",
+            )
         )
 
-    deposit = rental.deposit
     refund_amount = max(Decimal("0.00"), deposit.amount - penalties_total)
     if refund_amount == deposit.amount:
-        deposit.status = "REFUNDED"
+        deposit_status = DepositStatus.REFUNDED
     elif refund_amount == Decimal("0.00"):
-        deposit.status = "FORFEITED"
+        deposit_status = DepositStatus.FORFEITED
     else:
-        deposit.status = "PARTIAL_REFUND"
-    deposit.save(update_fields=["status"])
+        deposit_status = DepositStatus.PARTIAL_REFUND
 
     if refund_amount > 0:
-        PaymentTransaction.objects.create(
-            rental=rental,
-            transaction_type=TransactionType.DEPOSIT_REFUND,
-            amount=refund_amount,
-            note="Deposit refund",
+        transactions.append(
+            PaymentTransaction(
+                rental=rental,
+                transaction_type=TransactionType.DEPOSIT_REFUND,
+                amount=refund_amount,
+                note="Deposit refund",
+            )
         )
+    return ReturnSettlement(
+        invoice=invoice.build(),
+        penalties=penalties,
+        transactions=transactions,
+        deposit_status=deposit_status,
+    )
+
+
+@retry_on_conflict()
+@transaction.atomic
+def return_rental(rental: RentalAgreement, return_date: date | None, bad_condition: bool):
+    # No row lock: the rental and car updates are compare-and-swaps on the versions read here, so a concurrent return
+    # rolls this attempt back and the retry finds the rental already closed.
+    current = RentalRepository.for_return([rental.id])[rental.id]
+    # The caller's instance carries the changes, starting from the rental's current state, car and deposit.
+    rental.status, rental.is_overdue, rental.version = current.status, current.is_overdue, current.version
+    rental.car, rental.deposit = current.car, current.deposit
+
+    uow = UnitOfWork()
+    actual_return = return_date or timezone.now().date()
+    rental.actual_return_date = actual_return
+    uow.register_dirty(rental, "actual_return_date")
+    if rental.is_overdue:
+        # The settled late fee replaces the provisional one accrued by the overdue scan.
+        RentalRepository.clear_overdue([rental.id])
+        rental.is_overdue = False
+        uow.register_dirty(rental, "is_overdue")
+    get_state(rental).return_car(rental, uow)
+    settlement = settle_return(rental, rental.deposit, actual_return, bad_condition, PricingStrategyFactory.engine())
+
+    uow.register_new(*settlement.penalties, *settlement.transactions)
+    rental.deposit.status = settlement.deposit_status
+    uow.register_dirty(rental.deposit, "status")
+    rental_returned.send(sender=RentalAgreement, rental=rental, uow=uow)
+    get_state(rental).close(rental, uow)
+    uow.commit()
+    return settlement.invoice
+
+
+@dataclass
+class ReturnRequest:
+    rental_id: int
+    return_date: date | None = None
+    bad_condition: bool = False
+
+
+@dataclass
+class ReturnResult:
+    rental_id: int
+    invoice: Invoice | None = None
+    error: str | None = None
+
+
+@transaction.atomic
+def return_rentals(requests: list[ReturnRequest]) -> list[ReturnResult]:
+    rentals = RentalRepository.for_return({request.rental_id for request in requests}, lock=True)
+    pricing = PricingStrategyFactory.engine()
+    today = timezone.now().date()
+    results = []
+    returned: dict[int, RentalAgreement] = {}
+    penalties: list[Penalty] = []
+    transactions: list[PaymentTransaction] = []
+    deposits_by_status: dict[str, list[int]] = defaultdict(list)
+    for request in requests:
+        rental = rentals.get(request.rental_id)
+        if rental is None:
+            results.append(ReturnResult(request.rental_id, error="Rental not found"))
+            continue
+        if request.rental_id in returned:
+            results.append(ReturnResult(request.rental_id, error="Rental listed more than once"))
+            continue
+        if rental.status != RentalStatus.ACTIVE:
+            results.append(ReturnResult(request.rental_id, error=f"Cannot return a {rental.status.lower()} rental"))
+            continue
+        # Same end state as ActiveState.return_car followed by ReturnedState.close in return_rental.
+        rental.actual_return_date = request.return_date or today
+        rental.status = RentalStatus.CLOSED
+        settlement = settle_return(rental, rental.deposit, rental.actual_return_date, request.bad_condition, pricing)
+        returned[rental.id] = rental
+        penalties.extend(settlement.penalties)
+        transactions.extend(settlement.transactions)
+        deposits_by_status[settlement.deposit_status].append(rental.deposit.id)
+        results.append(ReturnResult(request.rental_id, invoice=settlement.invoice))
+
+    if returned:
+        overdue_ids = [rental.id for rental in returned.values() if rental.is_overdue]
+        if overdue_ids:
+            RentalRepository.clear_overdue(overdue_ids)
+        for rental in returned.values():
+            rental.is_overdue = False
+            # The rows are locked, so the version bump cannot race another writer.
+            rental.version += 1
+        Penalty.objects.bulk_create(penalties)
+        LedgerRepository.record(transactions)
+        for deposit_status, deposit_ids in deposits_by_status.items():
+            Deposit.objects.filter(id__in=deposit_ids).update(status=deposit_status)
+        RentalAgreement.objects.bulk_update(
+            list(returned.values()), ["actual_return_date", "status", "is_overdue", "version"]
+        )
+        rentals_returned.send(sender=RentalAgreement, rentals=list(returned.values()))
+    return results
+
+
+@dataclass
+class OverdueAccrual:
+    overdue: int
+    exposure: Decimal
+    accrued: int
+    flagged: int
+    cleared: int
+    released: int
+
 
-    rental_returned.send(sender=RentalAgreement, rental=rental)
-    get_state(rental).close(rental)
-    return invoice.build()
+def accrue_overdue(as_of: date | None = None) -> OverdueAccrual:
+    return OverdueAccrual(*RentalRepository.accrue_overdue(as_of or timezone.now().date(), LATE_FEE_PER_DAY))
@@ -1,10 +1,43 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
 from django.dispatch import Signal, receiver
+from apps.core.cache import OCCUPANCY_REPORTS, bump_version_on_commit
 from apps.core.repositories.cars import CarRepository
+from apps.core.repositories.ledger import LedgerRepository
 from apps.fleet.models import CarStatus
+from .models import RentalAgreement
 
 rental_returned = Signal()
+rentals_returned = Signal()
 
 
+# The car is freed in the request transaction so the catalogue never shows a returned car as rented.
 @receiver(rental_returned)
-def on_rental_returned(sender, rental, **kwargs):
-    CarRepository.set_status(rental.car, CarStatus.AVAILABLE)
+def on_rental_returned(sender, rental, uow=None, **kwargs):
+    CarRepository.set_status(rental.car, CarStatus.AVAILABLE, uow)
+
+
+@receiver(rentals_returned)
+def on_rentals_returned(sender, rentals, **kwargs):
+    CarRepository.set_status_many({rental.car_id for rental in rentals}, CarStatus.AVAILABLE)
+
+
+@receiver(rental_returned)
+@receiver(rentals_returned)
+@receiver(post_save, sender=RentalAgreement)
+@receiver(post_delete, sender=RentalAgreement)
+def invalidate_occupancy(sender, **kwargs):
+    bump_version_on_commit(OCCUPANCY_REPORTS)
+
+
+# The ledger rows go with the rental, so the revenue rollup must let go of them first.
+@receiver(pre_delete, sender=RentalAgreement)
+def remove_from_rollup(sender, instance, **kwargs):
+    LedgerRepository.remove_from_rollup(instance)
+
+
+# Keeps monthly ledger partitions ahead of the clock on every deploy, and in freshly migrated test databases.
+@receiver(post_migrate)
+def ensure_ledger_partitions(sender, **kwargs):
+    if sender.label == "rentals" and LedgerRepository.is_partitioned():
+        LedgerRepository.ensure_partitions(settings.LEDGER_PARTITIONS_AHEAD)
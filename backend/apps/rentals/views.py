@@ -1,48 +1,216 @@
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from apps.accounts.models import User
 from apps.accounts.permissions import IsStaff
+from apps.core.async_views import AsyncAPIView, json_response
+from apps.core.db import ReplicaReadMixin
+from apps.core.exceptions import Conflict
+from apps.core.idempotency import idempotent_response
+from apps.core.pagination import KeysetPagination
 from apps.core.repositories.rentals import RentalRepository
+from apps.fleet.models import Car
 from .models import RentalAgreement
-from .serializers import RentalAgreementSerializer, RentalCreateSerializer, RentalReturnSerializer
-from .services import create_rental, return_rental
+from .serializers import (
+    DOUBLE_BOOKING_ERROR,
+    InvoiceSerializer,
+    RentalAgreementSerializer,
+    RentalBatchReturnSerializer,
+    RentalCreateSerializer,
+    RentalListQuerySerializer,
+    RentalReturnSerializer,
+)
+from .services import (
+    ReturnRequest,
+    create_rental,
+    create_rentals,
+    find_booking_conflicts,
+    return_rental,
+    return_rentals,
+)
 
+MAX_BATCH_SIZE = 500
 
-class RentalViewSet(viewsets.ModelViewSet):
+RENTAL_LIST_FILTERS = {
+    "status": "status",
+    "customer": "customer_id",
+    "car": "car_id",
+    "date_from": "issue_date__gte",
+    "date_to": "issue_date__lte",
+    "overdue": "is_overdue",
+}
+
+
+def _ids(items, field: str) -> set[int]:
+    ids = set()
+    for item in items:
+        try:
+            ids.add(int(item.get(field)))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    return ids
+
+
+class RentalPagination(KeysetPagination):
+    ordering = ("-issue_date", "-id")
+
+
+def _rental_listing(request) -> tuple[QuerySet, list[str] | None]:
+    params = RentalListQuerySerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    query = params.validated_data
+    fields = RentalAgreementSerializer.parse_fields(query.get("fields"))
+    rentals = RentalRepository.listing(
+        request.user, RentalAgreementSerializer.sources(fields) if fields else None
+    ).filter(**{lookup: query[name] for name, lookup in RENTAL_LIST_FILTERS.items() if name in query})
+    return rentals, fields
+
+
+class RentalViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = RentalAgreement.objects.all()
     serializer_class = RentalAgreementSerializer
+    pagination_class = RentalPagination
+    replica_actions = ("list", "retrieve", "count")
 
     def get_queryset(self):
-        return RentalRepository.for_user(self.request.user)
+        return RentalRepository.for_user(self.request.user).select_related("customer", "car", "balance")
 
     def get_permissions(self):
-        if self.action in {"list", "retrieve"}:
+        if self.action in {"list", "retrieve", "count"}:
             return [permissions.IsAuthenticated()]
         return [IsStaff()]
 
     def get_serializer_class(self):
-        if self.action == "create":
+        if self.action in {"create", "batch_create"}:
             return RentalCreateSerializer
         if self.action == "return_rental":
             return RentalReturnSerializer
+        if self.action == "batch_return":
+            return RentalBatchReturnSerializer
         return RentalAgreementSerializer
 
+    def list(self, request, *args, **kwargs):
+        rentals, fields = _rental_listing(request)
+        page = self.paginate_queryset(rentals)
+        return self.get_paginated_response(RentalAgreementSerializer(page, many=True, fields=fields).data)
+
+    @action(detail=False, methods=["get"])
+    def count(self, request):
+        # The keyset-paginated list has no total; this counts the same filtered rows in the database.
+        rentals, _ = _rental_listing(request)
+        return Response({"count": rentals.count()})
+
     def create(self, request, *args, **kwargs):
+        return idempotent_response(request, lambda: self._create(request))
+
+    def _create(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         deposit_amount = serializer.validated_data["deposit_amount"]
-        rental = serializer.save(status="DRAFT")
-        create_rental(rental, deposit_amount)
+        # A car changed since validation fails create_rental with a 409; the client retries and is validated afresh.
+        with transaction.atomic():
+            rental = serializer.save(status="DRAFT")
+            create_rental(rental, deposit_amount)
         return Response(RentalAgreementSerializer(rental).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=["post"], url_path="return")
     def return_rental(self, request, pk=None):
+        return idempotent_response(request, lambda: self._return(request))
+
+    def _return(self, request):
         rental = self.get_object()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        invoice = return_rental(
-            rental,
-            serializer.validated_data.get("actual_return_date"),
-            serializer.validated_data.get("bad_condition", False),
-        )
+        try:
+            invoice = return_rental(
+                rental,
+                serializer.validated_data.get("actual_return_date"),
+                serializer.validated_data.get("bad_condition", False),
+            )
+        except ValueError as exc:
+            raise Conflict(str(exc)) from exc
         return Response({"rental": RentalAgreementSerializer(rental).data, "invoice_total": str(invoice.total)})
+
+    @action(detail=False, methods=["post"], url_path="batch")
+    def batch_create(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"non_field_errors": ["Expected a non-empty list of rentals"]})
+        if len(items) > MAX_BATCH_SIZE:
+            raise ValidationError({"non_field_errors": [f"At most {MAX_BATCH_SIZE} rentals per batch"]})
+        context = {
+            **self.get_serializer_context(),
+            "check_overlap": False,
+            "prefetched": {
+                "customer": User.objects.in_bulk(_ids(items, "customer")),
+                "car": Car.objects.in_bulk(_ids(items, "car")),
+            },
+        }
+        results: list[dict | None] = [None] * len(items)
+        pending = []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item, context=context)
+            if not serializer.is_valid():
+                results[index] = {"index": index, "status": "error", "errors": serializer.errors}
+                continue
+            data = dict(serializer.validated_data)
+            deposit_amount = data.pop("deposit_amount")
+            pending.append((index, RentalAgreement(**data), deposit_amount))
+
+        conflicts = find_booking_conflicts([rental for _, rental, _ in pending])
+        accepted = []
+        for position, (index, rental, deposit_amount) in enumerate(pending):
+            if position in conflicts:
+                results[index] = {"index": index, "status": "error", "errors": DOUBLE_BOOKING_ERROR}
+            else:
+                accepted.append((index, rental, deposit_amount))
+
+        if accepted:
+            try:
+                create_rentals([(rental, deposit_amount) for _, rental, deposit_amount in accepted])
+            except IntegrityError as exc:
+                raise Conflict("A car in this batch was booked concurrently, retry the batch.") from exc
+        for index, rental, _ in accepted:
+            results[index] = {"index": index, "status": "created", "rental": RentalAgreementSerializer(rental).data}
+        all_created = len(accepted) == len(items)
+        return Response(results, status=status.HTTP_201_CREATED if all_created else status.HTTP_207_MULTI_STATUS)
+
+    @action(detail=False, methods=["post"], url_path="return-batch")
+    def batch_return(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False, max_length=MAX_BATCH_SIZE)
+        serializer.is_valid(raise_exception=True)
+        results = return_rentals(
+            [
+                ReturnRequest(item["rental"], item.get("actual_return_date"), item["bad_condition"])
+                for item in serializer.validated_data
+            ]
+        )
+        data = []
+        for result in results:
+            if result.error:
+                data.append({"rental": result.rental_id, "status": "error", "error": result.error})
+            else:
+                data.append(
+                    {
+                        "rental": result.rental_id,
+                        "status": "returned",
+                        "invoice": InvoiceSerializer(result.invoice).data,
+                    }
+                )
+        return Response(data)
+
+
+class AsyncRentalListView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    replica_reads = True
+
+    async def get(self, request):
+        rentals, fields = _rental_listing(request)
+        paginator = RentalPagination()
+        page = await paginator.apaginate_queryset(rentals, request)
+        return json_response(
+            paginator.get_paginated_data(RentalAgreementSerializer(page, many=True, fields=fields).data)
+        )
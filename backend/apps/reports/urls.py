@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import OccupancyReportView, FinancialReportView
+from .views import OccupancyReportView, OccupancyTimelineView, FinancialReportView, OverdueReportView
 
 urlpatterns = [
     path("occupancy/", OccupancyReportView.as_view(), name="occupancy-report"),
+    path("occupancy/timeline/", OccupancyTimelineView.as_view(), name="occupancy-timeline-report"),
     path("financial/", FinancialReportView.as_view(), name="financial-report"),
+    path("overdue/", OverdueReportView.as_view(), name="overdue-report"),
 ]
@@ -1,61 +1,243 @@
-from datetime import datetime
+import json
+from datetime import date, datetime, timedelta
+from itertools import accumulate, groupby
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
-from django.db.models import Sum
+from rest_framework.exceptions import ValidationError
 from apps.accounts.permissions import IsStaff
+from apps.core.async_views import AsyncAPIView, json_response
+from apps.core.cache import FINANCIAL_REPORTS, OCCUPANCY_REPORTS, asingle_flight, single_flight
+from apps.core.db import ReplicaReadMixin
+from apps.core.pagination import KeysetPagination
 from apps.core.repositories.cars import CarRepository
-from apps.core.repositories.reports import ReportRepository
-from apps.rentals.models import RentalAgreement, PaymentTransaction, TransactionType
+from apps.core.repositories.reports import ReportRepository, FINANCIAL_GROUPINGS
 
 
-class OccupancyReportView(APIView):
+def _occupancy_row(car) -> dict:
+    current_rental = car.current_rentals[0] if getattr(car, "current_rentals", []) else None
+    return {
+        "car_id": car.id,
+        "car": str(car),
+        "status": "RENTED" if current_rental else car.status,
+        "expected_return_date": current_rental.expected_return_date if current_rental else None,
+    }
+
+
+def _occupancy(target_date: date) -> list[dict]:
+    return [_occupancy_row(car) for car in CarRepository.with_current_rental(target_date)]
+
+
+async def _aoccupancy(target_date: date) -> list[dict]:
+    return [_occupancy_row(car) async for car in CarRepository.with_current_rental(target_date)]
+
+
+def _occupancy_date(request) -> date:
+    date_str = request.query_params.get("date")
+    return datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else datetime.utcnow().date()
+
+
+class OccupancyReportView(ReplicaReadMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
+    replica_cache_namespaces = (OCCUPANCY_REPORTS,)
 
     def get(self, request):
-        date_str = request.query_params.get("date")
-        target_date = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else datetime.utcnow().date()
-        cars = CarRepository.with_current_rental(target_date)
-        data = []
-        for car in cars:
-            current_rental = car.current_rentals[0] if getattr(car, "current_rentals", []) else None
-            status = car.status
-            if current_rental:
-                status = "RENTED"
-            data.append(
-                {
-                    "car_id": car.id,
-                    "car": str(car),
-                    "status": status,
-                    "expected_return_date": current_rental.expected_return_date if current_rental else None,
-                }
-            )
+        target_date = _occupancy_date(request)
+        data = single_flight(
+            OCCUPANCY_REPORTS,
+            ("occupancy", target_date),
+            lambda: _occupancy(target_date),
+            settings.REPORT_CACHE_TIMEOUT,
+        )
         return Response(data)
 
 
-class FinancialReportView(APIView):
+class AsyncOccupancyReportView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    replica_reads = True
+    replica_cache_namespaces = (OCCUPANCY_REPORTS,)
+
+    async def get(self, request):
+        target_date = _occupancy_date(request)
+        data = await asingle_flight(
+            OCCUPANCY_REPORTS,
+            ("occupancy", target_date),
+            lambda: _aoccupancy(target_date),
+            settings.REPORT_CACHE_TIMEOUT,
+        )
+        return json_response(data)
+
+
+TIMELINE_GROUPINGS = ("car", "car_class")
+
+
+def _parse_date(request, name: str) -> date:
+    value = request.query_params.get(name)
+    try:
+        return datetime.strptime(value or "", "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError({name: "Expected a date in YYYY-MM-DD format"})
+
+
+def _utilisation(occupied_days: int, available_days: int) -> float:
+    return round(occupied_days * 100 / available_days, 2) if available_days else 0.0
+
+
+def _timeline_by_car(rows, window_days: int):
+    for car_id, car, car_class, intervals in rows:
+        occupied_days = sum((upper - lower).days for lower, upper in intervals)
+        yield {
+            "car_id": car_id,
+            "car": car,
+            "car_class": car_class,
+            "occupied": [{"from": lower, "to": upper - timedelta(days=1)} for lower, upper in intervals],
+            "occupied_days": occupied_days,
+            "utilisation": _utilisation(occupied_days, window_days),
+        }
+
+
+def _timeline_by_class(rows, date_from: date, window_days: int):
+    for car_class, class_rows in groupby(rows, key=lambda row: row[2]):
+        # Difference array over the window: +1 where an interval starts, -1 where it ends.
+        deltas = [0] * (window_days + 1)
+        cars = 0
+        for _, _, _, intervals in class_rows:
+            cars += 1
+            for lower, upper in intervals:
+                deltas[(lower - date_from).days] += 1
+                deltas[(upper - date_from).days] -= 1
+        daily_occupied = list(accumulate(deltas[:window_days]))
+        occupied_car_days = sum(daily_occupied)
+        yield {
+            "car_class": car_class,
+            "cars": cars,
+            "daily_occupied": daily_occupied,
+            "occupied_car_days": occupied_car_days,
+            "utilisation": _utilisation(occupied_car_days, cars * window_days),
+        }
+
+
+def _stream_json_array(items):
+    yield "["
+    for index, item in enumerate(items):
+        yield ("," if index else "") + json.dumps(item, cls=DjangoJSONEncoder)
+    yield "]"
+
+
+class OccupancyTimelineView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        date_from = _parse_date(request, "date_from")
+        date_to = _parse_date(request, "date_to")
+        if date_to < date_from:
+            raise ValidationError({"date_to": "Must not be before date_from"})
+        group_by = request.query_params.get("group_by", "car")
+        if group_by not in TIMELINE_GROUPINGS:
+            raise ValidationError({"group_by": f"Must be one of: {', '.join(TIMELINE_GROUPINGS)}"})
+        window_days = (date_to - date_from).days + 1
+        rows = ReportRepository.occupancy_timeline(date_from, date_to)
+        if group_by == "car_class":
+            items = _timeline_by_class(rows, date_from, window_days)
+        else:
+            items = _timeline_by_car(rows, window_days)
+        return StreamingHttpResponse(_stream_json_array(items), content_type="application/json")
+
+
+def _financial_row(key: str, row: dict) -> dict:
+    return {
+        key: row[key],
+        "revenue": str(row["revenue"]),
+        "rentals_count": row["rentals_count"],
+        "penalties_total": str(row["penalties_total"]),
+        "deposits_total": str(row["deposits_total"]),
+        "refunds_total": str(row["refunds_total"]),
+        "net_amount": str(row["net_amount"]),
+    }
+
+
+def _financial(date_from: date, date_to: date, group_by: str) -> list[dict]:
+    key = FINANCIAL_GROUPINGS[group_by][1]
+    return [_financial_row(key, row) for row in ReportRepository.financial(date_from, date_to, group_by)]
+
+
+async def _afinancial(date_from: date, date_to: date, group_by: str) -> list[dict]:
+    key = FINANCIAL_GROUPINGS[group_by][1]
+    return [_financial_row(key, row) async for row in ReportRepository.financial(date_from, date_to, group_by)]
+
+
+def _financial_params(request) -> tuple[date, date, str]:
+    date_from = datetime.strptime(request.query_params.get("date_from"), "%Y-%m-%d").date()
+    date_to = datetime.strptime(request.query_params.get("date_to"), "%Y-%m-%d").date()
+    group_by = request.query_params.get("group_by", "car")
+    if group_by not in FINANCIAL_GROUPINGS:
+        raise ValidationError({"group_by": f"Must be one of: {', '.join(FINANCIAL_GROUPINGS)}"})
+    return date_from, date_to, group_by
+
+
+class FinancialReportView(ReplicaReadMixin, APIView):
     permission_classes = [IsStaff]
+    replica_cache_namespaces = (FINANCIAL_REPORTS,)
 
     def get(self, request):
-        date_from = datetime.strptime(request.query_params.get("date_from"), "%Y-%m-%d").date()
-        date_to = datetime.strptime(request.query_params.get("date_to"), "%Y-%m-%d").date()
-        totals = ReportRepository.financial(date_from, date_to)
-        rentals = RentalAgreement.objects.filter(issue_date__gte=date_from, issue_date__lte=date_to)
-        transactions = PaymentTransaction.objects.filter(rental__in=rentals)
-        data = []
-        for row in totals:
-            car_id = row["rental__car_id"]
-            penalty_total = transactions.filter(
-                rental__car_id=car_id, transaction_type=TransactionType.PENALTY_CHARGE
-            ).aggregate(total=Sum("amount"))["total"] or 0
-            net_amount = row["revenue"] or 0
-            data.append(
-                {
-                    "car_id": car_id,
-                    "revenue": str(row["revenue"] or 0),
-                    "rentals_count": row["rentals_count"],
-                    "penalties_total": str(penalty_total),
-                    "net_amount": str(net_amount),
-                }
-            )
+        date_from, date_to, group_by = _financial_params(request)
+        data = single_flight(
+            FINANCIAL_REPORTS,
+            ("financial", date_from, date_to, group_by),
+            lambda: _financial(date_from, date_to, group_by),
+            settings.REPORT_CACHE_TIMEOUT,
+        )
         return Response(data)
+
+
+class AsyncFinancialReportView(AsyncAPIView):
+    permission_classes = [IsStaff]
+    replica_reads = True
+    replica_cache_namespaces = (FINANCIAL_REPORTS,)
+
+    async def get(self, request):
+        date_from, date_to, group_by = _financial_params(request)
+        data = await asingle_flight(
+            FINANCIAL_REPORTS,
+            ("financial", date_from, date_to, group_by),
+            lambda: _afinancial(date_from, date_to, group_by),
+            settings.REPORT_CACHE_TIMEOUT,
+        )
+        return json_response(data)
+
+
+class OverduePagination(KeysetPagination):
+    ordering = ("rental__expected_return_date", "rental_id")
+
+
+class OverdueReportView(APIView):
+    permission_classes = [IsStaff]
+
+    def get(self, request):
+        paginator = OverduePagination()
+        penalties = paginator.paginate_queryset(ReportRepository.overdue(), request, view=self)
+        totals = ReportRepository.overdue_totals()
+        rentals = [
+            {
+                "rental_id": penalty.rental.id,
+                "car": str(penalty.rental.car),
+                "customer_email": penalty.rental.customer.email,
+                "expected_return_date": penalty.rental.expected_return_date,
+                "days_late": (penalty.accrued_on - penalty.rental.expected_return_date).days,
+                "accrued_fee": str(penalty.amount),
+                "accrued_on": penalty.accrued_on,
+            }
+            for penalty in penalties
+        ]
+        return Response(
+            {
+                "accrued_total": str(totals["accrued_total"]),
+                "rentals_count": totals["rentals_count"],
+                "next": paginator.get_next_link(),
+                "previous": paginator.get_previous_link(),
+                "rentals": rentals,
+            }
+        )
@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import timedelta
 import os
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -15,6 +16,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "drf_spectacular",
     "apps.core",
@@ -26,6 +28,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -35,6 +38,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "apps.core.middleware.ReadYourWritesMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -67,6 +71,20 @@ DATABASES = {
     }
 }
 
+# Streaming replicas of the primary, as comma-separated host[:port]. Views with ReplicaReadMixin read from them.
+for index, replica in enumerate(filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")), start=1):
+    host, _, port = replica.strip().partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != "default"]
+# Reads stay on the primary this long after a user's own write or a cache version bump; keep it above replica lag.
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+DATABASE_ROUTERS = ["apps.core.db.ReplicaRouter"]
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -84,10 +102,11 @@ AUTH_USER_MODEL = "accounts.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.accounts.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "EXCEPTION_HANDLER": "apps.core.exceptions.exception_handler",
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -96,11 +115,19 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
 ]
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "apps.accounts.tokens.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.accounts.tokens.ClaimsTokenRefreshSerializer",
 }
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+# How long a worker trusts its last read of a user's token revocation; keep it well below the access-token lifetime.
+AUTH_REVOCATION_CACHE_TTL = int(os.getenv("AUTH_REVOCATION_CACHE_TTL", "30"))
+AUTH_LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_LOCAL_CACHE_MAX_ENTRIES", "10000"))
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "Car Rental Financial Tracking API",
@@ -108,4 +135,30 @@ SPECTACULAR_SETTINGS = {
     "VERSION": "1.0.0",
 }
 
+CACHES = {
+    "default": {
+        # File-based so every worker process on a host shares cached entries and version bumps.
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", "/tmp/cars-rental-cache"),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+CATALOGUE_CACHE_TIMEOUT = int(os.getenv("CATALOGUE_CACHE_TIMEOUT", "300"))
+REPORT_CACHE_TIMEOUT = int(os.getenv("REPORT_CACHE_TIMEOUT", "3600"))
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_N_PLUS_ONE_THRESHOLD = int(os.getenv("METRICS_N_PLUS_ONE_THRESHOLD", "10"))
+
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "5"))
+JOBS_BACKOFF_BASE = int(os.getenv("JOBS_BACKOFF_BASE", "10"))
+JOBS_BACKOFF_MAX = int(os.getenv("JOBS_BACKOFF_MAX", "3600"))
+JOBS_LOCK_TIMEOUT = int(os.getenv("JOBS_LOCK_TIMEOUT", "600"))
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", "1"))
+JOBS_BATCH_SIZE = int(os.getenv("JOBS_BATCH_SIZE", "10"))
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1.0"))
+
+LEDGER_PARTITIONS_AHEAD = int(os.getenv("LEDGER_PARTITIONS_AHEAD", "3"))
+
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
@@ -1,6 +1,17 @@
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from apps.fleet.views import AsyncCarListView
+from apps.rentals.views import AsyncRentalListView
+from apps.reports.views import AsyncFinancialReportView, AsyncOccupancyReportView
+
+# Async variants of the slow read endpoints: under ASGI only their queries occupy a thread, not the whole request.
+async_urlpatterns = [
+    path("cars/", AsyncCarListView.as_view(), name="async-car-list"),
+    path("rentals/", AsyncRentalListView.as_view(), name="async-rental-list"),
+    path("reports/occupancy/", AsyncOccupancyReportView.as_view(), name="async-occupancy-report"),
+    path("reports/financial/", AsyncFinancialReportView.as_view(), name="async-financial-report"),
+]
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -10,4 +21,6 @@ urlpatterns = [
     path("api/cars/", include("apps.fleet.urls")),
     path("api/rentals/", include("apps.rentals.urls")),
     path("api/reports/", include("apps.reports.urls")),
+    path("api/metrics/", include("apps.core.urls")),
+    path("api/async/", include(async_urlpatterns)),
 ]
@@ -21,6 +21,14 @@ export type Car = {
   status: CarStatus
 }
 
+export type RentalBalance = {
+  rental_charged: string
+  penalties_total: string
+  deposit_held: string
+  deposit_refunded: string
+  deposit_outstanding: string
+}
+
 export type Rental = {
   id: number
   customer: number
@@ -31,8 +39,29 @@ export type Rental = {
   expected_return_date: string
   actual_return_date?: string | null
   status: string
+  is_overdue?: boolean
+  balance?: RentalBalance | null
+}
+
+export type Page<T> = {
+  next: string | null
+  previous: string | null
+  results: T[]
+}
+
+export type RentalListParams = {
+  status?: string
+  customer?: string
+  car?: string
+  date_from?: string
+  date_to?: string
+  fields?: string
+  page_size?: number
+  cursor?: string
 }
 
+export const cursorFrom = (link: string | null) => (link ? new URL(link).searchParams.get('cursor') : null)
+
 export type Customer = {
   id: number
   email: string
@@ -52,10 +81,29 @@ export type OccupancyRow = {
 export type FinancialRow = {
   car_id: number
   revenue: string
+  rentals_count: number
   penalties_total: string
+  deposits_total: string
+  refunds_total: string
   net_amount: string
 }
 
+export type OverdueReport = {
+  accrued_total: string
+  rentals_count: number
+  next: string | null
+  previous: string | null
+  rentals: Array<{
+    rental_id: number
+    car: string
+    customer_email: string
+    expected_return_date: string
+    days_late: number
+    accrued_fee: string
+    accrued_on: string
+  }>
+}
+
 export class ApiError extends Error {
   status: number
   data: unknown
@@ -114,14 +162,31 @@ export const api = {
   register: (payload: { email: string; full_name: string; password: string; address: string; phone: string }) =>
     request('/auth/register/', { method: 'POST', body: JSON.stringify(payload) }),
   me: () => request<User>('/auth/me/'),
+  logout: () => request<void>('/auth/logout/', { method: 'POST' }),
   cars: () => request<Car[]>('/cars/'),
   car: (id: number) => request<Car>(`/cars/${id}/`),
+  availableCars: (params: {
+    date_from: string
+    date_to: string
+    car_class?: string
+    brand?: string
+    min_price?: string
+    max_price?: string
+    min_year?: number
+    max_year?: number
+  }) => request<Car[]>(`/cars/available/${buildQuery(params)}`),
+  quote: (items: { car: number; issue_date: string; days: number }[]) =>
+    request<{ car: number; issue_date: string; days: number; amount: string }[]>('/cars/quote/', {
+      method: 'POST',
+      body: JSON.stringify(items)
+    }),
   createCar: (payload: Omit<Car, 'id'>) => request<Car>('/cars/', { method: 'POST', body: JSON.stringify(payload) }),
   updateCar: (id: number, payload: Partial<Omit<Car, 'id'>>) =>
     request<Car>(`/cars/${id}/`, { method: 'PATCH', body: JSON.stringify(payload) }),
   deleteCar: (id: number) => request<void>(`/cars/${id}/`, { method: 'DELETE' }),
-  rentals: (params?: { status?: string; customer?: string; car?: string; date_from?: string; date_to?: string }) =>
-    request<Rental[]>(`/rentals/${params ? buildQuery(params) : ''}`),
+  rentals: (params?: RentalListParams) => request<Page<Rental>>(`/rentals/${params ? buildQuery(params) : ''}`),
+  rentalCount: (params?: Omit<RentalListParams, 'fields' | 'page_size' | 'cursor'>) =>
+    request<{ count: number }>(`/rentals/count/${params ? buildQuery(params) : ''}`),
   rental: (id: number) => request<Rental>(`/rentals/${id}/`),
   createRental: (payload: {
     customer: number
@@ -142,5 +207,6 @@ export const api = {
   updateCustomer: (id: number, payload: Partial<Customer>) =>
     request<Customer>(`/customers/${id}/`, { method: 'PATCH', body: JSON.stringify(payload) }),
   occupancyReport: (date: string) => request<OccupancyRow[]>(`/reports/occupancy/?date=${date}`),
-  financialReport: (from: string, to: string) => request<FinancialRow[]>(`/reports/financial/?date_from=${from}&date_to=${to}`)
+  financialReport: (from: string, to: string) => request<FinancialRow[]>(`/reports/financial/?date_from=${from}&date_to=${to}`),
+  overdueReport: (cursor?: string) => request<OverdueReport>(`/reports/overdue/${buildQuery({ cursor })}`)
 }
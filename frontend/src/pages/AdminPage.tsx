@@ -11,16 +11,22 @@ import { useToast } from '../components/ui/Toast'
 export default function AdminPage() {
   const [cars, setCars] = useState<Car[]>([])
   const [rentals, setRentals] = useState<Rental[]>([])
+  const [activeRentals, setActiveRentals] = useState(0)
   const [loading, setLoading] = useState(true)
   const { notify } = useToast()
 
   useEffect(() => {
     let mounted = true
-    Promise.all([api.cars(), api.rentals()])
-      .then(([carsData, rentalsData]) => {
+    Promise.all([
+      api.cars(),
+      api.rentals({ page_size: 5 }),
+      api.rentalCount({ status: 'ACTIVE' })
+    ])
+      .then(([carsData, recentPage, activeCount]) => {
         if (mounted) {
           setCars(carsData)
-          setRentals(rentalsData)
+          setRentals(recentPage.results)
+          setActiveRentals(activeCount.count)
         }
       })
       .catch(() => {
@@ -39,9 +45,8 @@ export default function AdminPage() {
   const summary = useMemo(() => {
     const totalCars = cars.length
     const available = cars.filter((car) => car.status === 'AVAILABLE').length
-    const activeRentals = rentals.filter((rental) => rental.status === 'ACTIVE').length
     return { totalCars, available, activeRentals }
-  }, [cars, rentals])
+  }, [cars, activeRentals])
 
   return (
     <section>
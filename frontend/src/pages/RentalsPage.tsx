@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from 'react'
 import { Link } from 'react-router-dom'
-import { api, type Rental } from '../api/client'
+import { api, cursorFrom, type Rental } from '../api/client'
 import { PageHeader } from '../components/PageHeader'
 import { Badge } from '../components/ui/Badge'
 import { Button } from '../components/ui/Button'
@@ -28,6 +28,7 @@ const statusTone = (status: string) => {
 
 export default function RentalsPage() {
   const [rentals, setRentals] = useState<Rental[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
   const [filters, setFilters] = useState({
@@ -40,7 +41,7 @@ export default function RentalsPage() {
   const { user } = useAuth()
   const { notify } = useToast()
 
-  const load = () => {
+  const load = (cursor?: string) => {
     setLoading(true)
     api
       .rentals({
@@ -48,10 +49,12 @@ export default function RentalsPage() {
         customer: filters.customer || undefined,
         car: filters.car || undefined,
         date_from: filters.dateFrom || undefined,
-        date_to: filters.dateTo || undefined
+        date_to: filters.dateTo || undefined,
+        cursor
       })
-      .then((data) => {
-        setRentals(data)
+      .then((page) => {
+        setRentals((prev) => (cursor ? [...prev, ...page.results] : page.results))
+        setNextCursor(cursorFrom(page.next))
         setError(null)
       })
       .catch(() => {
@@ -135,7 +138,7 @@ export default function RentalsPage() {
             />
           </FormField>
           <div className="filters-actions">
-            <Button variant="secondary" onClick={load}>
+            <Button variant="secondary" onClick={() => load()}>
               Apply filters
             </Button>
           </div>
@@ -157,7 +160,7 @@ export default function RentalsPage() {
             }
           />
         )}
-        {!loading && filteredRentals.length > 0 && (
+        {filteredRentals.length > 0 && (
           <Table caption="Rental list">
             <thead>
               <tr>
@@ -191,6 +194,13 @@ export default function RentalsPage() {
             </tbody>
           </Table>
         )}
+        {nextCursor && (
+          <div className="filters-actions">
+            <Button variant="secondary" onClick={() => load(nextCursor)} disabled={loading}>
+              {loading ? 'Loading…' : 'Load more'}
+            </Button>
+          </div>
+        )}
       </div>
     </section>
   )
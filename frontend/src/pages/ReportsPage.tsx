@@ -1,5 +1,5 @@
 import { useMemo, useState } from 'react'
-import { api, type FinancialRow, type OccupancyRow } from '../api/client'
+import { api, cursorFrom, type FinancialRow, type OccupancyRow, type OverdueReport } from '../api/client'
 import { PageHeader } from '../components/PageHeader'
 import { Alert } from '../components/ui/Alert'
 import { Button } from '../components/ui/Button'
@@ -34,6 +34,8 @@ export default function ReportsPage() {
   const [financial, setFinancial] = useState<FinancialRow[]>([])
   const [loadingOccupancy, setLoadingOccupancy] = useState(false)
   const [loadingFinancial, setLoadingFinancial] = useState(false)
+  const [overdue, setOverdue] = useState<OverdueReport | null>(null)
+  const [loadingOverdue, setLoadingOverdue] = useState(false)
   const { notify } = useToast()
 
   const loadOccupancy = async () => {
@@ -61,6 +63,18 @@ export default function ReportsPage() {
     }
   }
 
+  const loadOverdue = async (cursor?: string) => {
+    setLoadingOverdue(true)
+    try {
+      const page = await api.overdueReport(cursor)
+      setOverdue((prev) => (cursor && prev ? { ...page, rentals: [...prev.rentals, ...page.rentals] } : page))
+    } catch {
+      notify('Unable to load overdue report', 'danger')
+    } finally {
+      setLoadingOverdue(false)
+    }
+  }
+
   const occupancySummary = useMemo(() => {
     const total = occupancy.length
     const available = occupancy.filter((row) => row.status === 'AVAILABLE').length
@@ -212,6 +226,63 @@ export default function ReportsPage() {
             </>
           )}
         </div>
+        <div className="card form">
+          <h2 className="section-title">Overdue exposure</h2>
+          <div className="form-actions">
+            <Button variant="secondary" onClick={() => loadOverdue()}>
+              Load report
+            </Button>
+            <Button variant="ghost" onClick={() => exportCsv('overdue.csv', overdue?.rentals ?? [])}>
+              Export CSV
+            </Button>
+          </div>
+          {loadingOverdue && <Spinner label="Loading overdue report" />}
+          {!loadingOverdue && overdue && overdue.rentals.length === 0 && (
+            <EmptyState title="No overdue rentals" description="Late fees are accrued by the nightly overdue scan." />
+          )}
+          {overdue && overdue.rentals.length > 0 && (
+            <>
+              <Alert tone="info" title="Accrued late fees">
+                ${overdue.accrued_total} across {overdue.rentals_count} rental(s)
+              </Alert>
+              <Table caption="Overdue table">
+                <thead>
+                  <tr>
+                    <th scope="col">Rental</th>
+                    <th scope="col">Car</th>
+                    <th scope="col">Customer</th>
+                    <th scope="col">Due</th>
+                    <th scope="col">Days late</th>
+                    <th scope="col">Accrued</th>
+                  </tr>
+                </thead>
+                <tbody>
+                  {overdue.rentals.map((row) => (
+                    <tr key={row.rental_id}>
+                      <td>{row.rental_id}</td>
+                      <td>{row.car}</td>
+                      <td>{row.customer_email}</td>
+                      <td>{row.expected_return_date}</td>
+                      <td>{row.days_late}</td>
+                      <td>${row.accrued_fee}</td>
+                    </tr>
+                  ))}
+                </tbody>
+              </Table>
+              {overdue.next && (
+                <div className="filters-actions">
+                  <Button
+                    variant="secondary"
+                    onClick={() => loadOverdue(cursorFrom(overdue.next) ?? undefined)}
+                    disabled={loadingOverdue}
+                  >
+                    {loadingOverdue ? 'Loading…' : 'Load more'}
+                  </Button>
+                </div>
+              )}
+            </>
+          )}
+        </div>
       </div>
     </section>
   )
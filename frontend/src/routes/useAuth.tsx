@@ -31,6 +31,7 @@ export const AuthProvider = ({ children }: { children: React.ReactNode }) => {
   }, [])
 
   const logout = () => {
+    api.logout().catch(() => undefined)
     tokenStorage.clear()
     setUser(null)
   }